@@ -5,24 +5,34 @@ from datetime import datetime, timedelta
 from typing import Optional, Literal
 
 from fastapi import APIRouter, Depends, HTTPException, status, Query
-from sqlalchemy import select, func, and_, or_
+from sqlalchemy import select, func, and_, or_, false
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
 
 from app.core.deps import get_db
+from app.core.security import password_hasher
+from app.db.pagination import page_count, paginate
+from app.db.pool_metrics import pool_stats
 from app.models.user import User
 from app.models.post import Post
 from app.models.comment import Comment
 from app.models.category import Category
 from app.models.tag import Tag
-from app.api.v1.users import get_current_user
+from app.models.loading import POST_ADMIN_ROW
+from app.search import COMMENT, POST, USER, search_backend
+from app.services.comment_service import CommentService
+from app.services.post_service import PostService
+from app.services.user_service import UserService
+from app.services.response_cache import CATEGORIES, TAGS, response_cache
+from app.services.principal_cache import Principal, principal_cache
+from app.api.v1.users import get_current_principal
 
 router = APIRouter(prefix="/admin", tags=["Admin"])
 
 
 # --- Admin Authentication Dependency ---
 
-async def require_admin(current_user: User = Depends(get_current_user)) -> User:
+async def require_admin(current_user: Principal = Depends(get_current_principal)) -> Principal:
     """Require admin role."""
     if current_user.role != "admin":
         raise HTTPException(
@@ -37,7 +47,7 @@ async def require_admin(current_user: User = Depends(get_current_user)) -> User:
 @router.get("/stats")
 async def get_dashboard_stats(
     db: AsyncSession = Depends(get_db),
-    _: User = Depends(require_admin),
+    _: Principal = Depends(require_admin),
 ):
     """Get dashboard statistics."""
     # User stats
@@ -89,27 +99,49 @@ async def get_dashboard_stats(
     }
 
 
+@router.get("/stats/password-hashing")
+async def get_password_hashing_stats(
+    _: Principal = Depends(require_admin),
+):
+    """Get password hashing pool queueing metrics for this worker."""
+    return password_hasher.stats()
+
+
+@router.get("/stats/database")
+async def get_database_pool_stats(
+    _: Principal = Depends(require_admin),
+):
+    """Get connection pool gauges and counters for this worker, per engine."""
+    return pool_stats()
+
+
 # --- User Management ---
 
 @router.get("/users")
 async def list_users(
     page: int = Query(default=1, ge=1),
     size: int = Query(default=20, ge=1, le=100),
+    after: Optional[str] = None,
+    before: Optional[str] = None,
+    with_total: bool = True,
     search: Optional[str] = None,
     role: Optional[str] = None,
     is_active: Optional[bool] = None,
     db: AsyncSession = Depends(get_db),
-    _: User = Depends(require_admin),
+    _: Principal = Depends(require_admin),
 ):
     """List all users with filtering."""
-    query = select(User).order_by(User.created_at.desc())
+    query = select(User)
     
     if search:
+        # Substrings of username, nickname or email through the search
+        # index; prefixes also match terms too short for it
+        matches = search_backend.matches(USER, search)
         query = query.where(
             or_(
-                User.username.ilike(f"%{search}%"),
-                User.email.ilike(f"%{search}%"),
-                User.nickname.ilike(f"%{search}%"),
+                User.id.in_(select(matches.c.doc_id)) if matches is not None else false(),
+                User.username.startswith(search, autoescape=True),
+                User.email.startswith(search, autoescape=True),
             )
         )
     if role:
@@ -117,14 +149,18 @@ async def list_users(
     if is_active is not None:
         query = query.where(User.is_active == is_active)
     
-    # Count
-    count_query = select(func.count()).select_from(query.subquery())
-    total = await db.scalar(count_query) or 0
-    
-    # Paginate
-    offset = (page - 1) * size
-    result = await db.execute(query.offset(offset).limit(size))
-    users = result.scalars().all()
+    result = await paginate(
+        db,
+        query,
+        User.created_at,
+        User.id,
+        size=size,
+        page=page,
+        after=after,
+        before=before,
+        with_total=with_total,
+    )
+    users = result.items
     
     return {
         "items": [
@@ -140,10 +176,12 @@ async def list_users(
             }
             for u in users
         ],
-        "total": total,
+        "total": result.total,
         "page": page,
         "size": size,
-        "pages": (total + size - 1) // size,
+        "pages": page_count(result.total, size),
+        "next_cursor": result.next_cursor,
+        "prev_cursor": result.prev_cursor,
     }
 
 
@@ -153,7 +191,7 @@ async def update_user(
     role: Optional[str] = None,
     is_active: Optional[bool] = None,
     db: AsyncSession = Depends(get_db),
-    admin: User = Depends(require_admin),
+    admin: Principal = Depends(require_admin),
 ):
     """Update user role or status."""
     result = await db.execute(select(User).where(User.id == user_id))
@@ -171,6 +209,9 @@ async def update_user(
         user.is_active = is_active
     
     await db.commit()
+    await principal_cache.invalidate(user.id)
+    if is_active is False:
+        await UserService(db).revoke_sessions(user.id)
     return {"message": "User updated"}
 
 
@@ -180,24 +221,27 @@ async def update_user(
 async def list_posts(
     page: int = Query(default=1, ge=1),
     size: int = Query(default=20, ge=1, le=100),
+    after: Optional[str] = None,
+    before: Optional[str] = None,
+    with_total: bool = True,
     search: Optional[str] = None,
     status: Optional[str] = None,
     author_id: Optional[int] = None,
     db: AsyncSession = Depends(get_db),
-    _: User = Depends(require_admin),
+    _: Principal = Depends(require_admin),
 ):
     """List all posts with filtering."""
     query = (
         select(Post)
-        .options(selectinload(Post.user), selectinload(Post.category))
-        .order_by(Post.created_at.desc())
+        .options(*POST_ADMIN_ROW)
     )
     
     if search:
+        matches = search_backend.matches(POST, search)
         query = query.where(
             or_(
-                Post.title.ilike(f"%{search}%"),
-                Post.slug.ilike(f"%{search}%"),
+                Post.id.in_(select(matches.c.doc_id)) if matches is not None else false(),
+                Post.slug.startswith(search, autoescape=True),
             )
         )
     if status:
@@ -205,14 +249,18 @@ async def list_posts(
     if author_id:
         query = query.where(Post.user_id == author_id)
     
-    # Count
-    count_query = select(func.count()).select_from(query.subquery())
-    total = await db.scalar(count_query) or 0
-    
-    # Paginate
-    offset = (page - 1) * size
-    result = await db.execute(query.offset(offset).limit(size))
-    posts = result.scalars().all()
+    result = await paginate(
+        db,
+        query,
+        Post.created_at,
+        Post.id,
+        size=size,
+        page=page,
+        after=after,
+        before=before,
+        with_total=with_total,
+    )
+    posts = result.items
     
     return {
         "items": [
@@ -237,10 +285,12 @@ async def list_posts(
             }
             for p in posts
         ],
-        "total": total,
+        "total": result.total,
         "page": page,
         "size": size,
-        "pages": (total + size - 1) // size,
+        "pages": page_count(result.total, size),
+        "next_cursor": result.next_cursor,
+        "prev_cursor": result.prev_cursor,
     }
 
 
@@ -249,7 +299,7 @@ async def update_post_status(
     post_id: int,
     status: Literal["published", "draft", "archived"],
     db: AsyncSession = Depends(get_db),
-    _: User = Depends(require_admin),
+    _: Principal = Depends(require_admin),
 ):
     """Update post status (publish/archive/draft)."""
     result = await db.execute(select(Post).where(Post.id == post_id))
@@ -258,11 +308,7 @@ async def update_post_status(
     if not post:
         raise HTTPException(status_code=404, detail="Post not found")
     
-    post.status = status
-    if status == "published" and not post.published_at:
-        post.published_at = datetime.utcnow()
-    
-    await db.commit()
+    await PostService(db).set_status(post, status)
     return {"message": "Post updated"}
 
 
@@ -270,7 +316,7 @@ async def update_post_status(
 async def delete_post(
     post_id: int,
     db: AsyncSession = Depends(get_db),
-    _: User = Depends(require_admin),
+    _: Principal = Depends(require_admin),
 ):
     """Delete a post."""
     result = await db.execute(select(Post).where(Post.id == post_id))
@@ -279,8 +325,7 @@ async def delete_post(
     if not post:
         raise HTTPException(status_code=404, detail="Post not found")
     
-    await db.delete(post)
-    await db.commit()
+    await PostService(db).delete(post)
     return {"message": "Post deleted"}
 
 
@@ -290,17 +335,23 @@ async def delete_post(
 async def list_comments(
     page: int = Query(default=1, ge=1),
     size: int = Query(default=20, ge=1, le=100),
+    after: Optional[str] = None,
+    before: Optional[str] = None,
+    with_total: bool = True,
     post_id: Optional[int] = None,
     user_id: Optional[int] = None,
     is_deleted: Optional[bool] = None,
+    search: Optional[str] = None,
     db: AsyncSession = Depends(get_db),
-    _: User = Depends(require_admin),
+    _: Principal = Depends(require_admin),
 ):
     """List all comments with filtering."""
     query = (
         select(Comment)
-        .options(selectinload(Comment.user), selectinload(Comment.post))
-        .order_by(Comment.created_at.desc())
+        .options(
+            selectinload(Comment.user),
+            selectinload(Comment.post).load_only(Post.id, Post.title),
+        )
     )
     
     if post_id:
@@ -309,15 +360,24 @@ async def list_comments(
         query = query.where(Comment.user_id == user_id)
     if is_deleted is not None:
         query = query.where(Comment.is_deleted == is_deleted)
+    if search:
+        matches = search_backend.matches(COMMENT, search)
+        query = query.where(
+            Comment.id.in_(select(matches.c.doc_id)) if matches is not None else false()
+        )
     
-    # Count
-    count_query = select(func.count()).select_from(query.subquery())
-    total = await db.scalar(count_query) or 0
-    
-    # Paginate
-    offset = (page - 1) * size
-    result = await db.execute(query.offset(offset).limit(size))
-    comments = result.scalars().all()
+    result = await paginate(
+        db,
+        query,
+        Comment.created_at,
+        Comment.id,
+        size=size,
+        page=page,
+        after=after,
+        before=before,
+        with_total=with_total,
+    )
+    comments = result.items
     
     return {
         "items": [
@@ -339,10 +399,12 @@ async def list_comments(
             }
             for c in comments
         ],
-        "total": total,
+        "total": result.total,
         "page": page,
         "size": size,
-        "pages": (total + size - 1) // size,
+        "pages": page_count(result.total, size),
+        "next_cursor": result.next_cursor,
+        "prev_cursor": result.prev_cursor,
     }
 
 
@@ -351,7 +413,7 @@ async def delete_comment(
     comment_id: int,
     hard: bool = Query(default=False),
     db: AsyncSession = Depends(get_db),
-    _: User = Depends(require_admin),
+    _: Principal = Depends(require_admin),
 ):
     """Delete a comment (soft or hard delete)."""
     result = await db.execute(select(Comment).where(Comment.id == comment_id))
@@ -361,11 +423,12 @@ async def delete_comment(
         raise HTTPException(status_code=404, detail="Comment not found")
     
     if hard:
-        await db.delete(comment)
+        # Keeps the post's and parent's counts and the search index in step
+        await CommentService(db).delete(comment, soft=False)
     else:
         comment.is_deleted = True
+        await db.commit()
     
-    await db.commit()
     return {"message": "Comment deleted"}
 
 
@@ -373,7 +436,7 @@ async def delete_comment(
 async def restore_comment(
     comment_id: int,
     db: AsyncSession = Depends(get_db),
-    _: User = Depends(require_admin),
+    _: Principal = Depends(require_admin),
 ):
     """Restore a soft-deleted comment."""
     result = await db.execute(select(Comment).where(Comment.id == comment_id))
@@ -396,7 +459,7 @@ async def create_category(
     description: Optional[str] = None,
     parent_id: Optional[int] = None,
     db: AsyncSession = Depends(get_db),
-    _: User = Depends(require_admin),
+    _: Principal = Depends(require_admin),
 ):
     """Create a category."""
     # Check if slug exists
@@ -412,6 +475,7 @@ async def create_category(
     )
     db.add(category)
     await db.commit()
+    await response_cache.invalidate(CATEGORIES)
     await db.refresh(category)
     
     return {
@@ -428,7 +492,7 @@ async def update_category(
     slug: Optional[str] = None,
     description: Optional[str] = None,
     db: AsyncSession = Depends(get_db),
-    _: User = Depends(require_admin),
+    _: Principal = Depends(require_admin),
 ):
     """Update a category."""
     result = await db.execute(select(Category).where(Category.id == category_id))
@@ -451,6 +515,7 @@ async def update_category(
         category.description = description
     
     await db.commit()
+    await response_cache.invalidate(CATEGORIES)
     return {"message": "Category updated"}
 
 
@@ -458,7 +523,7 @@ async def update_category(
 async def delete_category(
     category_id: int,
     db: AsyncSession = Depends(get_db),
-    _: User = Depends(require_admin),
+    _: Principal = Depends(require_admin),
 ):
     """Delete a category."""
     result = await db.execute(select(Category).where(Category.id == category_id))
@@ -479,6 +544,7 @@ async def delete_category(
     
     await db.delete(category)
     await db.commit()
+    await response_cache.invalidate(CATEGORIES)
     return {"message": "Category deleted"}
 
 
@@ -488,24 +554,31 @@ async def delete_category(
 async def list_tags(
     page: int = Query(default=1, ge=1),
     size: int = Query(default=50, ge=1, le=100),
+    after: Optional[str] = None,
+    before: Optional[str] = None,
+    with_total: bool = True,
     search: Optional[str] = None,
     db: AsyncSession = Depends(get_db),
-    _: User = Depends(require_admin),
+    _: Principal = Depends(require_admin),
 ):
     """List all tags."""
-    query = select(Tag).order_by(Tag.created_at.desc())
+    query = select(Tag)
     
     if search:
         query = query.where(Tag.name.ilike(f"%{search}%"))
     
-    # Count
-    count_query = select(func.count()).select_from(query.subquery())
-    total = await db.scalar(count_query) or 0
-    
-    # Paginate
-    offset = (page - 1) * size
-    result = await db.execute(query.offset(offset).limit(size))
-    tags = result.scalars().all()
+    result = await paginate(
+        db,
+        query,
+        Tag.created_at,
+        Tag.id,
+        size=size,
+        page=page,
+        after=after,
+        before=before,
+        with_total=with_total,
+    )
+    tags = result.items
     
     return {
         "items": [
@@ -517,10 +590,12 @@ async def list_tags(
             }
             for t in tags
         ],
-        "total": total,
+        "total": result.total,
         "page": page,
         "size": size,
-        "pages": (total + size - 1) // size,
+        "pages": page_count(result.total, size),
+        "next_cursor": result.next_cursor,
+        "prev_cursor": result.prev_cursor,
     }
 
 
@@ -530,7 +605,7 @@ async def update_tag(
     name: Optional[str] = None,
     slug: Optional[str] = None,
     db: AsyncSession = Depends(get_db),
-    _: User = Depends(require_admin),
+    _: Principal = Depends(require_admin),
 ):
     """Update a tag."""
     result = await db.execute(select(Tag).where(Tag.id == tag_id))
@@ -545,6 +620,7 @@ async def update_tag(
         tag.slug = slug
     
     await db.commit()
+    await response_cache.invalidate(TAGS)
     return {"message": "Tag updated"}
 
 
@@ -552,7 +628,7 @@ async def update_tag(
 async def delete_tag(
     tag_id: int,
     db: AsyncSession = Depends(get_db),
-    _: User = Depends(require_admin),
+    _: Principal = Depends(require_admin),
 ):
     """Delete a tag."""
     result = await db.execute(select(Tag).where(Tag.id == tag_id))
@@ -563,6 +639,7 @@ async def delete_tag(
     
     await db.delete(tag)
     await db.commit()
+    await response_cache.invalidate(TAGS)
     return {"message": "Tag deleted"}
 
 
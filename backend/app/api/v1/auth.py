@@ -1,12 +1,16 @@
 """
 Authentication API endpoints.
 """
+from typing import Optional
+
 from fastapi import APIRouter, Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordRequestForm
+from redis.exceptions import RedisError
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.core.deps import get_db, get_current_user_id
+from app.core.deps import get_db, get_current_user_id, get_redis, oauth2_scheme
 from app.core.security import create_access_token
+from app.core.tokens import revoke_token, token_verifier
 from app.schemas.token import Token
 from app.schemas.user import UserCreate, UserResponse, UserLogin
 from app.services.user_service import UserService
@@ -102,12 +106,22 @@ async def login_json(
 
 
 @router.post("/logout")
-async def logout():
+async def logout(
+    token: Optional[str] = Depends(oauth2_scheme),
+):
     """
     Logout current user.
-    Note: JWT tokens are stateless, so logout is handled client-side.
-    This endpoint is provided for API consistency.
+    The presented token is revoked until it expires.
     """
+    verified = token_verifier.verify(token) if token else None
+    if verified is not None:
+        try:
+            await revoke_token(await get_redis(), verified)
+        except RedisError:
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Logout is temporarily unavailable",
+            )
     return {"message": "Successfully logged out"}
 
 
@@ -1,58 +1,48 @@
 """
 Category API endpoints.
 """
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, status
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.orm import selectinload
 
-from app.core.deps import get_db
+from app.core.deps import get_read_db
+from app.db.routing import wrote_recently
 from app.models.category import Category
 from app.schemas.category import CategoryResponse, CategoryListResponse
+from app.services.response_cache import CATEGORIES, POSTS, cached_response
 
 router = APIRouter(prefix="/categories", tags=["Categories"])
 
 
 @router.get("", response_model=list[CategoryListResponse])
-async def get_categories(
-    db: AsyncSession = Depends(get_db),
-):
+async def get_categories(request: Request):
     """
     Get all categories.
     """
-    result = await db.execute(
-        select(Category)
-        .options(selectinload(Category.posts))
-        .order_by(Category.sort_order.asc(), Category.name.asc())
-    )
-    categories = result.scalars().all()
-    
-    # Convert to response with post_count
-    return [
-        CategoryListResponse(
-            id=cat.id,
-            name=cat.name,
-            name_en=cat.name_en,
-            slug=cat.slug,
-            icon=cat.icon,
-            post_count=len([p for p in cat.posts if p.status == "published"]),
+    async def load(db: AsyncSession) -> list[CategoryListResponse]:
+        result = await db.execute(
+            select(Category)
+            .order_by(Category.sort_order.asc(), Category.name.asc())
         )
-        for cat in categories
-    ]
+        categories = result.scalars().all()
+        
+        return [CategoryListResponse.model_validate(cat) for cat in categories]
+    
+    return await cached_response(
+        "categories:list", {}, [CATEGORIES, POSTS], load, bypass=wrote_recently(request)
+    )
 
 
 @router.get("/{slug}", response_model=CategoryResponse)
 async def get_category_by_slug(
     slug: str,
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
 ):
     """
     Get category by slug.
     """
     result = await db.execute(
-        select(Category)
-        .options(selectinload(Category.posts))
-        .where(Category.slug == slug)
+        select(Category).where(Category.slug == slug)
     )
     category = result.scalar_one_or_none()
     
@@ -70,7 +60,7 @@ async def get_category_by_slug(
         icon=category.icon,
         description=category.description,
         sort_order=category.sort_order,
-        post_count=len([p for p in category.posts if p.status == "published"]),
+        post_count=category.post_count,
         created_at=category.created_at,
     )
 
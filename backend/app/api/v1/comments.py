@@ -1,13 +1,17 @@
 """
 Comment API endpoints.
 """
-from typing import Optional
+from typing import Optional, Sequence, Union
 
 from fastapi import APIRouter, Depends, HTTPException, status, Query
+from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.core.deps import get_db, get_current_user_id, get_current_user_id_optional
-from app.models.user import User
+from app.core.deps import get_db, get_read_db, get_current_user_id, get_current_user_id_optional
+from app.db.pagination import page_count
+from app.events import CommentCreated, dispatcher
+from app.models.comment import MAX_COMMENT_DEPTH
+from app.models.post import Post
 from app.schemas.comment import (
     CommentCreate,
     CommentUpdate,
@@ -17,46 +21,74 @@ from app.schemas.comment import (
     CommentListResponse,
 )
 from app.services.comment_service import CommentService
-from app.api.v1.users import get_current_user
+from app.services.interaction_service import InteractionService
+from app.services.principal_cache import Principal
+from app.api.v1.users import get_current_principal
 
 router = APIRouter(prefix="/comments", tags=["Comments"])
 
 
+async def _add_viewer_state(
+    db: AsyncSession,
+    user_id: Optional[int],
+    comments: Sequence[Union[CommentResponse, CommentWithReplies]],
+) -> None:
+    """Set viewer_state on each comment response from one query."""
+    states = await InteractionService(db).get_viewer_state(
+        user_id, [("comment", comment.id) for comment in comments]
+    )
+    for comment in comments:
+        comment.viewer_state = states[("comment", comment.id)]
+
+
 @router.get("/post/{post_id}", response_model=CommentTreeResponse)
 async def get_comments_by_post(
     post_id: int,
-    db: AsyncSession = Depends(get_db),
+    page: int = Query(default=1, ge=1),
+    size: int = Query(default=20, ge=1, le=100, description="Root comments per page"),
+    after: Optional[str] = Query(None),
+    before: Optional[str] = Query(None),
+    with_total: bool = Query(default=False, description="Count root comments for pages"),
+    replies: int = Query(default=10, ge=0, le=50, description="Replies nested per root"),
+    with_viewer_state: bool = Query(default=False, description="Embed the current user's like state"),
+    current_user_id: Optional[int] = Depends(get_current_user_id_optional),
+    db: AsyncSession = Depends(get_read_db),
 ):
     """
     Get comment tree for a post.
-    Returns nested structure with all replies.
+    Returns a page of root comments with their first replies nested; a
+    root's replies_cursor loads the rest from /comments/{id}/replies.
     """
     comment_service = CommentService(db)
-    comments = await comment_service.get_by_post_tree(post_id)
-    
-    # Convert to response model
-    def to_response(comment) -> CommentWithReplies:
-        return CommentWithReplies(
-            id=comment.id,
-            content=comment.content,
-            content_text=comment.content_text,
-            post_id=comment.post_id,
-            user_id=comment.user_id,
-            parent_id=comment.parent_id,
-            depth=comment.depth,
-            path=comment.path,
-            like_count=comment.like_count,
-            reply_count=comment.reply_count,
-            is_deleted=comment.is_deleted,
-            created_at=comment.created_at,
-            updated_at=comment.updated_at,
-            user=comment.user,
-            replies=[to_response(r) for r in getattr(comment, 'replies', [])],
-        )
+    result = await comment_service.get_tree(
+        post_id,
+        page,
+        size,
+        after=after,
+        before=before,
+        with_total=with_total,
+        replies=replies,
+    )
+    total = await db.scalar(select(Post.comment_count).where(Post.id == post_id))
+    
+    if with_viewer_state:
+        nodes = list(result.items)
+        stack = list(result.items)
+        while stack:
+            node = stack.pop()
+            nodes.extend(node.replies)
+            stack.extend(node.replies)
+        await _add_viewer_state(db, current_user_id, nodes)
     
     return CommentTreeResponse(
-        comments=[to_response(c) for c in comments],
-        total=sum(1 + len(getattr(c, 'replies', [])) for c in comments),
+        comments=result.items,
+        total=total or 0,
+        page=page,
+        size=size,
+        root_total=result.total,
+        pages=page_count(result.total, size),
+        next_cursor=result.next_cursor,
+        prev_cursor=result.prev_cursor,
     )
 
 
@@ -65,30 +97,35 @@ async def get_comments_flat(
     post_id: int,
     page: int = Query(default=1, ge=1),
     size: int = Query(default=50, ge=1, le=100),
-    db: AsyncSession = Depends(get_db),
+    after: Optional[str] = Query(None),
+    before: Optional[str] = Query(None),
+    with_total: bool = Query(default=True),
+    db: AsyncSession = Depends(get_read_db),
 ):
     """
     Get flat list of comments for a post (paginated).
     Useful for large comment sections.
     """
     comment_service = CommentService(db)
-    comments, total = await comment_service.get_by_post_flat(post_id, page, size)
-    
-    pages = (total + size - 1) // size
+    result = await comment_service.get_by_post_flat(
+        post_id, page, size, after=after, before=before, with_total=with_total
+    )
     
     return CommentListResponse(
-        items=[CommentResponse.model_validate(c) for c in comments],
-        total=total,
+        items=[CommentResponse.model_validate(c) for c in result.items],
+        total=result.total,
         page=page,
         size=size,
-        pages=pages,
+        pages=page_count(result.total, size),
+        next_cursor=result.next_cursor,
+        prev_cursor=result.prev_cursor,
     )
 
 
 @router.get("/{comment_id}", response_model=CommentResponse)
 async def get_comment(
     comment_id: int,
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
 ):
     """
     Get a single comment by ID.
@@ -105,10 +142,52 @@ async def get_comment(
     return CommentResponse.model_validate(comment)
 
 
+@router.get("/{comment_id}/replies", response_model=CommentListResponse)
+async def get_comment_replies(
+    comment_id: int,
+    size: int = Query(default=20, ge=1, le=100),
+    after: Optional[str] = Query(None),
+    before: Optional[str] = Query(None),
+    with_total: bool = Query(default=False),
+    with_viewer_state: bool = Query(default=False, description="Embed the current user's like state"),
+    current_user_id: Optional[int] = Depends(get_current_user_id_optional),
+    db: AsyncSession = Depends(get_read_db),
+):
+    """
+    Get replies below a comment, at any depth, in thread order.
+    Pass a tree root's replies_cursor as ``after`` to continue its thread.
+    """
+    comment_service = CommentService(db)
+    comment = await comment_service.get_by_id(comment_id)
+    
+    if not comment:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Comment not found",
+        )
+    
+    result = await comment_service.get_replies(
+        comment, size, after=after, before=before, with_total=with_total
+    )
+    items = [CommentResponse.model_validate(c) for c in result.items]
+    if with_viewer_state:
+        await _add_viewer_state(db, current_user_id, items)
+    
+    return CommentListResponse(
+        items=items,
+        total=result.total,
+        page=1,
+        size=size,
+        pages=page_count(result.total, size),
+        next_cursor=result.next_cursor,
+        prev_cursor=result.prev_cursor,
+    )
+
+
 @router.post("", response_model=CommentResponse, status_code=status.HTTP_201_CREATED)
 async def create_comment(
     comment_create: CommentCreate,
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_principal),
     db: AsyncSession = Depends(get_db),
 ):
     """
@@ -131,8 +210,19 @@ async def create_comment(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="Parent comment belongs to a different post",
             )
+        if parent.depth >= MAX_COMMENT_DEPTH:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Comment thread is nested too deeply",
+            )
     
     comment = await comment_service.create(current_user.id, comment_create)
+    dispatcher.emit(CommentCreated(
+        comment_id=comment.id,
+        post_id=comment.post_id,
+        actor_id=current_user.id,
+        parent_id=comment.parent_id,
+    ))
     return CommentResponse.model_validate(comment)
 
 
@@ -140,7 +230,7 @@ async def create_comment(
 async def update_comment(
     comment_id: int,
     comment_update: CommentUpdate,
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_principal),
     db: AsyncSession = Depends(get_db),
 ):
     """
@@ -176,7 +266,7 @@ async def update_comment(
 async def delete_comment(
     comment_id: int,
     hard: bool = Query(default=False, description="Hard delete (admin only)"),
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_principal),
     db: AsyncSession = Depends(get_db),
 ):
     """
@@ -214,22 +304,27 @@ async def get_user_comments(
     user_id: int,
     page: int = Query(default=1, ge=1),
     size: int = Query(default=20, ge=1, le=100),
-    db: AsyncSession = Depends(get_db),
+    after: Optional[str] = Query(None),
+    before: Optional[str] = Query(None),
+    with_total: bool = Query(default=True),
+    db: AsyncSession = Depends(get_read_db),
 ):
     """
     Get comments by a user.
     """
     comment_service = CommentService(db)
-    comments, total = await comment_service.get_user_comments(user_id, page, size)
-    
-    pages = (total + size - 1) // size
+    result = await comment_service.get_user_comments(
+        user_id, page, size, after=after, before=before, with_total=with_total
+    )
     
     return CommentListResponse(
-        items=[CommentResponse.model_validate(c) for c in comments],
-        total=total,
+        items=[CommentResponse.model_validate(c) for c in result.items],
+        total=result.total,
         page=page,
         size=size,
-        pages=pages,
+        pages=page_count(result.total, size),
+        next_cursor=result.next_cursor,
+        prev_cursor=result.prev_cursor,
     )
 
 
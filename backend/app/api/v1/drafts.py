@@ -6,17 +6,17 @@ from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.deps import get_db
-from app.models.user import User
 from app.models.draft import Draft
 from app.schemas.draft import DraftCreate, DraftUpdate, DraftResponse
-from app.api.v1.users import get_current_user
+from app.services.principal_cache import Principal
+from app.api.v1.users import get_current_principal
 
 router = APIRouter(prefix="/drafts", tags=["Drafts"])
 
 
 @router.get("", response_model=list[DraftResponse])
 async def get_drafts(
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_principal),
     db: AsyncSession = Depends(get_db),
 ):
     """
@@ -34,7 +34,7 @@ async def get_drafts(
 @router.get("/{draft_id}", response_model=DraftResponse)
 async def get_draft(
     draft_id: int,
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_principal),
     db: AsyncSession = Depends(get_db),
 ):
     """
@@ -60,7 +60,7 @@ async def get_draft(
 @router.post("", response_model=DraftResponse, status_code=status.HTTP_201_CREATED)
 async def create_draft(
     draft_create: DraftCreate,
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_principal),
     db: AsyncSession = Depends(get_db),
 ):
     """
@@ -100,7 +100,7 @@ async def create_draft(
 async def update_draft(
     draft_id: int,
     draft_update: DraftUpdate,
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_principal),
     db: AsyncSession = Depends(get_db),
 ):
     """
@@ -132,7 +132,7 @@ async def update_draft(
 @router.delete("/{draft_id}", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_draft(
     draft_id: int,
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_principal),
     db: AsyncSession = Depends(get_db),
 ):
     """
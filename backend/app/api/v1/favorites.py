@@ -4,12 +4,12 @@ Favorite API endpoints.
 from fastapi import APIRouter, Depends, HTTPException, status, Query
 from sqlalchemy import select, func
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.orm import selectinload
 
 from app.core.deps import get_db, get_current_user_id_optional
-from app.models.user import User
+from app.events import PostFavorited, dispatcher
 from app.models.post import Post
 from app.models.interaction import Favorite
+from app.models.loading import FAVORITE_LIST_ROW
 from app.schemas.interaction import (
     FavoriteCreate,
     FavoriteUpdate,
@@ -17,7 +17,8 @@ from app.schemas.interaction import (
     FavoriteStatusResponse,
     FavoriteListResponse,
 )
-from app.api.v1.users import get_current_user
+from app.services.principal_cache import Principal
+from app.api.v1.users import get_current_principal
 
 router = APIRouter(prefix="/favorites", tags=["Favorites"])
 
@@ -26,7 +27,7 @@ router = APIRouter(prefix="/favorites", tags=["Favorites"])
 async def get_my_favorites(
     page: int = Query(default=1, ge=1),
     size: int = Query(default=20, ge=1, le=100),
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_principal),
     db: AsyncSession = Depends(get_db),
 ):
     """
@@ -42,7 +43,7 @@ async def get_my_favorites(
     offset = (page - 1) * size
     result = await db.execute(
         select(Favorite)
-        .options(selectinload(Favorite.post))
+        .options(*FAVORITE_LIST_ROW)
         .where(Favorite.user_id == current_user.id)
         .order_by(Favorite.created_at.desc())
         .offset(offset)
@@ -64,7 +65,7 @@ async def get_my_favorites(
 @router.post("", response_model=FavoriteResponse, status_code=status.HTTP_201_CREATED)
 async def create_favorite(
     favorite_create: FavoriteCreate,
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_principal),
     db: AsyncSession = Depends(get_db),
 ):
     """
@@ -105,11 +106,12 @@ async def create_favorite(
     )
     db.add(favorite)
     await db.commit()
+    dispatcher.emit(PostFavorited(post_id=favorite.post_id, actor_id=current_user.id))
     
     # Reload with post
     result = await db.execute(
         select(Favorite)
-        .options(selectinload(Favorite.post))
+        .options(*FAVORITE_LIST_ROW)
         .where(Favorite.id == favorite.id)
     )
     favorite = result.scalar_one()
@@ -121,7 +123,7 @@ async def create_favorite(
 async def update_favorite(
     favorite_id: int,
     favorite_update: FavoriteUpdate,
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_principal),
     db: AsyncSession = Depends(get_db),
 ):
     """
@@ -129,7 +131,7 @@ async def update_favorite(
     """
     result = await db.execute(
         select(Favorite)
-        .options(selectinload(Favorite.post))
+        .options(*FAVORITE_LIST_ROW)
         .where(Favorite.id == favorite_id)
     )
     favorite = result.scalar_one_or_none()
@@ -156,7 +158,7 @@ async def update_favorite(
 @router.delete("/{favorite_id}", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_favorite(
     favorite_id: int,
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_principal),
     db: AsyncSession = Depends(get_db),
 ):
     """
@@ -186,7 +188,7 @@ async def delete_favorite(
 @router.delete("/post/{post_id}", status_code=status.HTTP_204_NO_CONTENT)
 async def unfavorite_post(
     post_id: int,
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_principal),
     db: AsyncSession = Depends(get_db),
 ):
     """
@@ -0,0 +1,33 @@
+"""
+Interaction status API endpoints.
+"""
+from typing import Optional
+
+from fastapi import APIRouter, Depends
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.deps import get_db, get_current_user_id_optional
+from app.schemas.interaction import InteractionStatusRequest, InteractionStatusResponse
+from app.services.interaction_service import InteractionService
+
+router = APIRouter(prefix="/interactions", tags=["Interactions"])
+
+
+@router.post("/status", response_model=InteractionStatusResponse)
+async def get_interaction_status(
+    request: InteractionStatusRequest,
+    current_user_id: Optional[int] = Depends(get_current_user_id_optional),
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    Get like counts and the current user's likes/favorites for many posts
+    and comments at once (up to 200 targets).
+    Replaces per-item calls to /likes/status, /likes/count and
+    /favorites/status.
+    """
+    interaction_service = InteractionService(db)
+    items = await interaction_service.get_status(
+        current_user_id,
+        [(target.target_type, target.target_id) for target in request.targets],
+    )
+    return InteractionStatusResponse(items=items)
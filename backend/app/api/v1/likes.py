@@ -1,22 +1,24 @@
 """
 Like API endpoints.
 """
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy import select, func, update
+from typing import Literal
+
+from fastapi import APIRouter, Depends, HTTPException, Response, status
+from sqlalchemy import select, func
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.deps import get_db, get_current_user_id, get_current_user_id_optional
-from app.models.user import User
+from app.events import Liked, dispatcher
 from app.models.interaction import Like
-from app.models.post import Post
-from app.models.comment import Comment
 from app.schemas.interaction import (
     LikeCreate,
     LikeResponse,
     LikeStatusResponse,
     LikeCountResponse,
 )
-from app.api.v1.users import get_current_user
+from app.services.like_service import LikeService
+from app.services.principal_cache import Principal
+from app.api.v1.users import get_current_principal
 
 router = APIRouter(prefix="/likes", tags=["Likes"])
 
@@ -24,77 +26,69 @@ router = APIRouter(prefix="/likes", tags=["Likes"])
 @router.post("", response_model=LikeResponse, status_code=status.HTTP_201_CREATED)
 async def create_like(
     like_create: LikeCreate,
-    current_user: User = Depends(get_current_user),
+    response: Response,
+    current_user: Principal = Depends(get_current_principal),
     db: AsyncSession = Depends(get_db),
 ):
     """
     Like a post or comment.
+    Liking a target again returns the existing like with status 200.
     """
-    # Check if already liked
-    result = await db.execute(
-        select(Like).where(
-            Like.user_id == current_user.id,
-            Like.target_type == like_create.target_type,
-            Like.target_id == like_create.target_id,
-        )
+    like_service = LikeService(db)
+    result = await like_service.like(
+        current_user.id, like_create.target_type, like_create.target_id
     )
-    existing = result.scalar_one_or_none()
     
-    if existing:
+    if result is None:
         raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Already liked",
-        )
-    
-    # Verify target exists
-    if like_create.target_type == "post":
-        post_result = await db.execute(
-            select(Post).where(Post.id == like_create.target_id)
-        )
-        if not post_result.scalar_one_or_none():
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail="Post not found",
-            )
-        # Update post like_count
-        await db.execute(
-            update(Post)
-            .where(Post.id == like_create.target_id)
-            .values(like_count=Post.like_count + 1)
-        )
-    elif like_create.target_type == "comment":
-        comment_result = await db.execute(
-            select(Comment).where(Comment.id == like_create.target_id)
-        )
-        if not comment_result.scalar_one_or_none():
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail="Comment not found",
-            )
-        # Update comment like_count
-        await db.execute(
-            update(Comment)
-            .where(Comment.id == like_create.target_id)
-            .values(like_count=Comment.like_count + 1)
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"{like_create.target_type.capitalize()} not found",
         )
     
-    # Create like
-    like = Like(
-        user_id=current_user.id,
-        target_type=like_create.target_type,
-        target_id=like_create.target_id,
+    if result.created:
+        dispatcher.emit(Liked(
+            target_type=like_create.target_type,
+            target_id=like_create.target_id,
+            actor_id=current_user.id,
+        ))
+    else:
+        response.status_code = status.HTTP_200_OK
+    return result.like
+
+
+@router.post("/toggle", response_model=LikeStatusResponse)
+async def toggle_like(
+    like_create: LikeCreate,
+    current_user: Principal = Depends(get_current_principal),
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    Like a post or comment, or remove the like if it is already liked.
+    """
+    like_service = LikeService(db)
+    result = await like_service.toggle(
+        current_user.id, like_create.target_type, like_create.target_id
     )
-    db.add(like)
-    await db.commit()
-    await db.refresh(like)
     
-    return LikeResponse.model_validate(like)
+    if result is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"{like_create.target_type.capitalize()} not found",
+        )
+    
+    if result.liked:
+        dispatcher.emit(Liked(
+            target_type=like_create.target_type,
+            target_id=like_create.target_id,
+            actor_id=current_user.id,
+        ))
+    return result
 
 
 @router.delete("/{like_id}", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_like(
     like_id: int,
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_principal),
     db: AsyncSession = Depends(get_db),
 ):
     """
@@ -117,65 +111,23 @@ async def delete_like(
             detail="Not authorized",
         )
     
-    # Update target like_count
-    if like.target_type == "post":
-        await db.execute(
-            update(Post)
-            .where(Post.id == like.target_id)
-            .values(like_count=Post.like_count - 1)
-        )
-    elif like.target_type == "comment":
-        await db.execute(
-            update(Comment)
-            .where(Comment.id == like.target_id)
-            .values(like_count=Comment.like_count - 1)
-        )
-    
-    await db.delete(like)
-    await db.commit()
+    like_service = LikeService(db)
+    await like_service.unlike(like.user_id, like.target_type, like.target_id)
 
 
 @router.delete("/target/{target_type}/{target_id}", status_code=status.HTTP_204_NO_CONTENT)
 async def unlike_target(
-    target_type: str,
+    target_type: Literal["post", "comment"],
     target_id: int,
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_principal),
     db: AsyncSession = Depends(get_db),
 ):
     """
     Unlike a post or comment by target.
+    Succeeds whether or not the target was liked.
     """
-    result = await db.execute(
-        select(Like).where(
-            Like.user_id == current_user.id,
-            Like.target_type == target_type,
-            Like.target_id == target_id,
-        )
-    )
-    like = result.scalar_one_or_none()
-    
-    if not like:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Like not found",
-        )
-    
-    # Update target like_count
-    if target_type == "post":
-        await db.execute(
-            update(Post)
-            .where(Post.id == target_id)
-            .values(like_count=Post.like_count - 1)
-        )
-    elif target_type == "comment":
-        await db.execute(
-            update(Comment)
-            .where(Comment.id == target_id)
-            .values(like_count=Comment.like_count - 1)
-        )
-    
-    await db.delete(like)
-    await db.commit()
+    like_service = LikeService(db)
+    await like_service.unlike(current_user.id, target_type, target_id)
 
 
 @router.get("/status/{target_type}/{target_id}", response_model=LikeStatusResponse)
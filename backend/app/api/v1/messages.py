@@ -1,11 +1,14 @@
 """
 Message API endpoints.
 """
+from typing import Optional
+
 from fastapi import APIRouter, Depends, HTTPException, status, Query
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.deps import get_db
-from app.models.user import User
+from app.db.pagination import page_count
+from app.events import MessageSent, dispatcher
 from app.schemas.message import (
     MessageCreate,
     MessageResponse,
@@ -16,7 +19,8 @@ from app.schemas.message import (
     UserBrief,
 )
 from app.services.message_service import MessageService
-from app.api.v1.users import get_current_user
+from app.services.principal_cache import Principal
+from app.api.v1.users import get_current_principal
 
 router = APIRouter(prefix="/messages", tags=["Messages"])
 
@@ -25,37 +29,45 @@ router = APIRouter(prefix="/messages", tags=["Messages"])
 async def get_conversations(
     page: int = Query(default=1, ge=1),
     size: int = Query(default=20, ge=1, le=100),
-    current_user: User = Depends(get_current_user),
+    after: Optional[str] = Query(None),
+    before: Optional[str] = Query(None),
+    with_total: bool = Query(default=True),
+    current_user: Principal = Depends(get_current_principal),
     db: AsyncSession = Depends(get_db),
 ):
     """
-    Get current user's conversations.
+    Get current user's conversations, most recent first.
     """
     message_service = MessageService(db)
-    conversations, total, unread_counts = await message_service.get_conversations(
-        current_user.id, page, size
+    result = await message_service.get_conversations(
+        current_user.id,
+        page,
+        size,
+        after=after,
+        before=before,
+        with_total=with_total,
     )
     
-    pages = (total + size - 1) // size
-    
-    items = []
-    for conv in conversations:
-        other_user = conv.get_other_user(current_user.id)
-        items.append(ConversationResponse(
-            id=conv.id,
-            other_user=UserBrief.model_validate(other_user),
-            last_message_at=conv.last_message_at,
-            last_message_preview=conv.last_message_preview,
-            unread_count=unread_counts.get(conv.id, 0),
-            created_at=conv.created_at,
-        ))
+    items = [
+        ConversationResponse(
+            id=entry.conversation_id,
+            other_user=UserBrief.model_validate(entry.other_user),
+            last_message_at=entry.last_message_at,
+            last_message_preview=entry.conversation.last_message_preview,
+            unread_count=entry.unread_count,
+            created_at=entry.conversation.created_at,
+        )
+        for entry in result.items
+    ]
     
     return ConversationListResponse(
         items=items,
-        total=total,
+        total=result.total,
         page=page,
         size=size,
-        pages=pages,
+        pages=page_count(result.total, size),
+        next_cursor=result.next_cursor,
+        prev_cursor=result.prev_cursor,
     )
 
 
@@ -64,39 +76,49 @@ async def get_conversation_messages(
     conversation_id: int,
     page: int = Query(default=1, ge=1),
     size: int = Query(default=50, ge=1, le=100),
-    current_user: User = Depends(get_current_user),
+    after: Optional[str] = Query(None),
+    before: Optional[str] = Query(None),
+    with_total: bool = Query(default=True),
+    current_user: Principal = Depends(get_current_principal),
     db: AsyncSession = Depends(get_db),
 ):
     """
-    Get messages in a conversation.
+    Get messages in a conversation, newest first.
+    Use next_cursor as ``after`` to load older messages.
     """
     message_service = MessageService(db)
-    messages, total = await message_service.get_messages(
-        conversation_id, current_user.id, page, size
+    result = await message_service.get_messages(
+        conversation_id,
+        current_user.id,
+        page,
+        size,
+        after=after,
+        before=before,
+        with_total=with_total,
     )
     
-    if not messages and total == 0:
+    if result is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Conversation not found or access denied",
         )
     
-    pages = (total + size - 1) // size
-    
     return MessageListResponse(
-        items=[MessageResponse.model_validate(m) for m in messages],
-        total=total,
+        items=[MessageResponse.model_validate(m) for m in result.items],
+        total=result.total,
         page=page,
         size=size,
-        pages=pages,
-        has_more=page < pages,
+        pages=page_count(result.total, size),
+        has_more=result.next_cursor is not None,
+        next_cursor=result.next_cursor,
+        prev_cursor=result.prev_cursor,
     )
 
 
 @router.post("", response_model=MessageResponse, status_code=status.HTTP_201_CREATED)
 async def send_message(
     message_create: MessageCreate,
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_principal),
     db: AsyncSession = Depends(get_db),
 ):
     """
@@ -115,13 +137,18 @@ async def send_message(
         message_create.content,
     )
     
-    return MessageResponse.model_validate(message)
+    response = MessageResponse.model_validate(message)
+    dispatcher.emit(MessageSent(
+        recipient_id=message_create.recipient_id,
+        message=response.model_dump(mode="json"),
+    ))
+    return response
 
 
 @router.post("/conversations/{conversation_id}/read")
 async def mark_conversation_read(
     conversation_id: int,
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_principal),
     db: AsyncSession = Depends(get_db),
 ):
     """
@@ -134,7 +161,7 @@ async def mark_conversation_read(
 
 @router.get("/unread-count", response_model=UnreadCountResponse)
 async def get_unread_count(
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_principal),
     db: AsyncSession = Depends(get_db),
 ):
     """
@@ -1,11 +1,13 @@
 """
 Notification API endpoints.
 """
+from typing import Optional
+
 from fastapi import APIRouter, Depends, HTTPException, status, Query
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.deps import get_db
-from app.models.user import User
+from app.db.pagination import page_count
 from app.schemas.notification import (
     NotificationResponse,
     NotificationListResponse,
@@ -13,7 +15,8 @@ from app.schemas.notification import (
     MarkReadRequest,
 )
 from app.services.notification_service import NotificationService
-from app.api.v1.users import get_current_user
+from app.services.principal_cache import Principal
+from app.api.v1.users import get_current_principal
 
 router = APIRouter(prefix="/notifications", tags=["Notifications"])
 
@@ -23,32 +26,41 @@ async def get_notifications(
     page: int = Query(default=1, ge=1),
     size: int = Query(default=20, ge=1, le=100),
     unread_only: bool = Query(default=False),
-    current_user: User = Depends(get_current_user),
+    after: Optional[str] = Query(None),
+    before: Optional[str] = Query(None),
+    with_total: bool = Query(default=True),
+    current_user: Principal = Depends(get_current_principal),
     db: AsyncSession = Depends(get_db),
 ):
     """
     Get current user's notifications.
     """
     notification_service = NotificationService(db)
-    notifications, total, unread_count = await notification_service.get_list(
-        current_user.id, page, size, unread_only
+    result, unread_count = await notification_service.get_list(
+        current_user.id,
+        page,
+        size,
+        unread_only,
+        after=after,
+        before=before,
+        with_total=with_total,
     )
     
-    pages = (total + size - 1) // size
-    
     return NotificationListResponse(
-        items=[NotificationResponse.model_validate(n) for n in notifications],
-        total=total,
+        items=[NotificationResponse.model_validate(n) for n in result.items],
+        total=result.total,
         page=page,
         size=size,
-        pages=pages,
+        pages=page_count(result.total, size),
+        next_cursor=result.next_cursor,
+        prev_cursor=result.prev_cursor,
         unread_count=unread_count,
     )
 
 
 @router.get("/unread-count", response_model=UnreadCountResponse)
 async def get_unread_count(
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_principal),
     db: AsyncSession = Depends(get_db),
 ):
     """
@@ -62,7 +74,7 @@ async def get_unread_count(
 @router.post("/read")
 async def mark_as_read(
     request: MarkReadRequest,
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_principal),
     db: AsyncSession = Depends(get_db),
 ):
     """
@@ -80,7 +92,7 @@ async def mark_as_read(
 @router.delete("/{notification_id}", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_notification(
     notification_id: int,
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_principal),
     db: AsyncSession = Depends(get_db),
 ):
     """
@@ -107,7 +119,7 @@ async def delete_notification(
 @router.delete("/cleanup")
 async def cleanup_old_notifications(
     days: int = Query(default=30, ge=7, le=365),
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_principal),
     db: AsyncSession = Depends(get_db),
 ):
     """
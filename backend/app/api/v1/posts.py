@@ -1,13 +1,19 @@
 """
 Post API endpoints.
 """
+import json
 from typing import Optional
 
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status, Query
+from redis import asyncio as aioredis
+from redis.exceptions import RedisError
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.core.deps import get_db, get_current_user_id, get_current_user_id_optional
-from app.models.user import User
+from app.core.deps import get_db, get_read_db, get_redis, get_current_user_id, get_current_user_id_optional
+from app.core.logging import get_logger
+from app.db.pagination import page_count
+from app.db.routing import wrote_recently
+from app.db.session import async_session_maker
 from app.schemas.post import (
     PostCreate,
     PostUpdate,
@@ -16,26 +22,69 @@ from app.schemas.post import (
     PostPaginatedResponse,
     PostSearchParams,
 )
+from app.services.interaction_service import InteractionService
 from app.services.post_service import PostService
-from app.api.v1.users import get_current_user
+from app.services.response_cache import (
+    CATEGORIES,
+    POSTS,
+    TAGS,
+    cached_response,
+    render,
+    response_cache,
+)
+from app.services.view_counter import ViewCounter
+from app.services.principal_cache import Principal
+from app.api.v1.users import get_current_principal
 
 router = APIRouter(prefix="/posts", tags=["Posts"])
+logger = get_logger("posts")
+
+
+async def _record_view(
+    post_id: int,
+    request: Request,
+    user_id: Optional[int],
+    redis: aioredis.Redis,
+) -> int:
+    """Count a post view, returning views not yet written to view_count."""
+    if user_id:
+        viewer = f"user:{user_id}"
+    else:
+        viewer = f"ip:{request.client.host if request.client else 'unknown'}"
+    
+    try:
+        return await ViewCounter(redis).record(post_id, viewer)
+    except RedisError as e:
+        # Without Redis, fall back to counting straight into the row
+        # (on the primary: the request's own session may read a replica)
+        logger.warning(f"View buffer unavailable, writing through: {e}")
+        async with async_session_maker() as db:
+            await PostService(db).increment_view_count(post_id)
+        return 1
 
 
 @router.get("", response_model=PostPaginatedResponse)
 async def get_posts(
+    request: Request,
     q: Optional[str] = Query(None),
     category_id: Optional[int] = Query(None),
     tag_id: Optional[int] = Query(None),
     is_featured: Optional[bool] = Query(None),
     page: int = Query(default=1, ge=1),
     size: int = Query(default=10, ge=1, le=100),
-    sort_by: str = Query(default="created_at"),
+    sort_by: Optional[str] = Query(None, description="Defaults to relevance when q is given"),
     sort_order: str = Query(default="desc"),
-    db: AsyncSession = Depends(get_db),
+    after: Optional[str] = Query(None, description="Cursor from next_cursor"),
+    before: Optional[str] = Query(None, description="Cursor from prev_cursor"),
+    with_total: bool = Query(default=True),
+    with_viewer_state: bool = Query(default=False, description="Embed the current user's like/favorite state"),
+    current_user_id: Optional[int] = Depends(get_current_user_id_optional),
+    db: AsyncSession = Depends(get_read_db),
 ):
     """
     Get paginated list of published posts.
+    Pass after/before cursors (and with_total=false) for constant-time
+    infinite scrolling.
     """
     params = PostSearchParams(
         q=q,
@@ -46,33 +95,58 @@ async def get_posts(
         size=size,
         sort_by=sort_by,
         sort_order=sort_order,
+        after=after,
+        before=before,
+        with_total=with_total,
     )
     
-    post_service = PostService(db)
-    posts, total = await post_service.get_list(params, published_only=True)
+    async def load(cache_db: AsyncSession) -> PostPaginatedResponse:
+        result = await PostService(cache_db).get_list(params, published_only=True)
+        return PostPaginatedResponse(
+            items=result.items,
+            total=result.total,
+            page=page,
+            size=size,
+            pages=page_count(result.total, size),
+            next_cursor=result.next_cursor,
+            prev_cursor=result.prev_cursor,
+        )
     
-    pages = (total + size - 1) // size
+    body = await response_cache.get_or_set(
+        "posts:list",
+        params.model_dump(),
+        [POSTS, CATEGORIES, TAGS],
+        load,
+        bypass=wrote_recently(request),
+    )
+    if not with_viewer_state:
+        return Response(content=body, media_type="application/json")
     
-    return PostPaginatedResponse(
-        items=[PostListResponse.model_validate(p) for p in posts],
-        total=total,
-        page=page,
-        size=size,
-        pages=pages,
+    # The cached page is shared by all viewers; add this viewer's state to a copy
+    data = json.loads(body)
+    states = await InteractionService(db).get_viewer_state(
+        current_user_id, [("post", item["id"]) for item in data["items"]]
     )
+    for item in data["items"]:
+        item["viewer_state"] = states[("post", item["id"])].model_dump()
+    return Response(content=render(data), media_type="application/json")
 
 
 @router.get("/featured", response_model=list[PostListResponse])
 async def get_featured_posts(
+    request: Request,
     limit: int = Query(default=5, ge=1, le=20),
-    db: AsyncSession = Depends(get_db),
 ):
     """
     Get featured posts.
     """
-    post_service = PostService(db)
-    posts = await post_service.get_featured(limit=limit)
-    return [PostListResponse.model_validate(p) for p in posts]
+    return await cached_response(
+        "posts:featured",
+        {"limit": limit},
+        [POSTS, CATEGORIES, TAGS],
+        lambda db: PostService(db).get_featured(limit=limit),
+        bypass=wrote_recently(request),
+    )
 
 
 @router.get("/my", response_model=PostPaginatedResponse)
@@ -80,7 +154,10 @@ async def get_my_posts(
     status: Optional[str] = Query(None),
     page: int = Query(default=1, ge=1),
     size: int = Query(default=10, ge=1, le=100),
-    current_user: User = Depends(get_current_user),
+    after: Optional[str] = Query(None),
+    before: Optional[str] = Query(None),
+    with_total: bool = Query(default=True),
+    current_user: Principal = Depends(get_current_principal),
     db: AsyncSession = Depends(get_db),
 ):
     """
@@ -91,27 +168,32 @@ async def get_my_posts(
         status=status,
         page=page,
         size=size,
+        after=after,
+        before=before,
+        with_total=with_total,
     )
     
     post_service = PostService(db)
-    posts, total = await post_service.get_list(params, published_only=False)
-    
-    pages = (total + size - 1) // size
+    result = await post_service.get_list(params, published_only=False)
     
     return PostPaginatedResponse(
-        items=[PostListResponse.model_validate(p) for p in posts],
-        total=total,
+        items=result.items,
+        total=result.total,
         page=page,
         size=size,
-        pages=pages,
+        pages=page_count(result.total, size),
+        next_cursor=result.next_cursor,
+        prev_cursor=result.prev_cursor,
     )
 
 
 @router.get("/{post_id}", response_model=PostResponse)
 async def get_post(
     post_id: int,
+    request: Request,
     current_user_id: Optional[int] = Depends(get_current_user_id_optional),
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
+    redis: aioredis.Redis = Depends(get_redis),
 ):
     """
     Get post by ID.
@@ -133,20 +215,24 @@ async def get_post(
                 detail="Post not found",
             )
     
-    # Increment view count for published posts
+    response = PostResponse.model_validate(post)
+    
+    # Count views of published posts; the buffered delta is shown right away
     if post.status == "published":
-        post = await post_service.increment_view_count(post)
-        # Reload with all relationships
-        post = await post_service.get_by_id(post.id)
+        response.view_count += await _record_view(
+            post.id, request, current_user_id, redis
+        )
     
-    return PostResponse.model_validate(post)
+    return response
 
 
 @router.get("/slug/{slug}", response_model=PostResponse)
 async def get_post_by_slug(
     slug: str,
+    request: Request,
     current_user_id: Optional[int] = Depends(get_current_user_id_optional),
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
+    redis: aioredis.Redis = Depends(get_redis),
 ):
     """
     Get post by slug.
@@ -168,19 +254,21 @@ async def get_post_by_slug(
                 detail="Post not found",
             )
     
-    # Increment view count for published posts
+    response = PostResponse.model_validate(post)
+    
+    # Count views of published posts; the buffered delta is shown right away
     if post.status == "published":
-        post = await post_service.increment_view_count(post)
-        # Reload with all relationships
-        post = await post_service.get_by_id(post.id)
+        response.view_count += await _record_view(
+            post.id, request, current_user_id, redis
+        )
     
-    return PostResponse.model_validate(post)
+    return response
 
 
 @router.post("", response_model=PostResponse, status_code=status.HTTP_201_CREATED)
 async def create_post(
     post_create: PostCreate,
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_principal),
     db: AsyncSession = Depends(get_db),
 ):
     """
@@ -195,7 +283,7 @@ async def create_post(
 async def update_post(
     post_id: int,
     post_update: PostUpdate,
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_principal),
     db: AsyncSession = Depends(get_db),
 ):
     """
@@ -224,7 +312,7 @@ async def update_post(
 @router.delete("/{post_id}", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_post(
     post_id: int,
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_principal),
     db: AsyncSession = Depends(get_db),
 ):
     """
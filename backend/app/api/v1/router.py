@@ -13,6 +13,7 @@ from app.api.v1.uploads import router as uploads_router
 from app.api.v1.comments import router as comments_router
 from app.api.v1.likes import router as likes_router
 from app.api.v1.favorites import router as favorites_router
+from app.api.v1.interactions import router as interactions_router
 from app.api.v1.messages import router as messages_router
 from app.api.v1.notifications import router as notifications_router
 from app.api.v1.admin import router as admin_router
@@ -32,6 +33,7 @@ api_router.include_router(uploads_router)
 api_router.include_router(comments_router)
 api_router.include_router(likes_router)
 api_router.include_router(favorites_router)
+api_router.include_router(interactions_router)
 api_router.include_router(messages_router)
 api_router.include_router(notifications_router)
 api_router.include_router(admin_router)
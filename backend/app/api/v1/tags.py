@@ -1,89 +1,65 @@
 """
 Tag API endpoints.
 """
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi import APIRouter, Depends, HTTPException, Request, status, Query
 from sqlalchemy import select, func
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.orm import selectinload
 
-from app.core.deps import get_db
+from app.core.deps import get_read_db
+from app.db.routing import wrote_recently
 from app.models.tag import Tag
 from app.schemas.tag import TagResponse, TagListResponse
+from app.services.response_cache import POSTS, TAGS, cached_response
 
 router = APIRouter(prefix="/tags", tags=["Tags"])
 
 
 @router.get("", response_model=list[TagListResponse])
-async def get_tags(
-    db: AsyncSession = Depends(get_db),
-):
+async def get_tags(request: Request):
     """
     Get all tags.
     """
-    result = await db.execute(
-        select(Tag)
-        .options(selectinload(Tag.posts))
-        .order_by(Tag.name.asc())
-    )
-    tags = result.scalars().all()
+    async def load(db: AsyncSession) -> list[TagListResponse]:
+        result = await db.execute(select(Tag).order_by(Tag.name.asc()))
+        return [TagListResponse.model_validate(tag) for tag in result.scalars().all()]
     
-    return [
-        TagListResponse(
-            id=tag.id,
-            name=tag.name,
-            name_en=tag.name_en,
-            slug=tag.slug,
-            post_count=len([p for p in tag.posts if p.status == "published"]),
-        )
-        for tag in tags
-    ]
+    return await cached_response(
+        "tags:list", {}, [TAGS, POSTS], load, bypass=wrote_recently(request)
+    )
 
 
 @router.get("/popular", response_model=list[TagListResponse])
 async def get_popular_tags(
+    request: Request,
     limit: int = Query(default=20, ge=1, le=100),
-    db: AsyncSession = Depends(get_db),
 ):
     """
     Get popular tags (by post count).
     """
-    result = await db.execute(
-        select(Tag)
-        .options(selectinload(Tag.posts))
-        .order_by(Tag.name.asc())
-    )
-    tags = result.scalars().all()
-    
-    # Calculate post counts and sort
-    tag_list = [
-        TagListResponse(
-            id=tag.id,
-            name=tag.name,
-            name_en=tag.name_en,
-            slug=tag.slug,
-            post_count=len([p for p in tag.posts if p.status == "published"]),
+    async def load(db: AsyncSession) -> list[TagListResponse]:
+        # Largest first from the post_count index, ties by name
+        result = await db.execute(
+            select(Tag)
+            .order_by(Tag.post_count.desc(), Tag.name.asc())
+            .limit(limit)
         )
-        for tag in tags
-    ]
+        return [TagListResponse.model_validate(tag) for tag in result.scalars().all()]
     
-    # Sort by post_count descending
-    tag_list.sort(key=lambda x: x.post_count, reverse=True)
-    
-    return tag_list[:limit]
+    return await cached_response(
+        "tags:popular", {"limit": limit}, [TAGS, POSTS], load, bypass=wrote_recently(request)
+    )
 
 
 @router.get("/{slug}", response_model=TagResponse)
 async def get_tag_by_slug(
     slug: str,
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
 ):
     """
     Get tag by slug.
     """
     result = await db.execute(
-        select(Tag)
-        .options(selectinload(Tag.posts))
-        .where(Tag.slug == slug)
+        select(Tag).where(Tag.slug == slug)
     )
     tag = result.scalar_one_or_none()
     
@@ -98,7 +74,7 @@ async def get_tag_by_slug(
         name=tag.name,
         name_en=tag.name_en,
         slug=tag.slug,
-        post_count=len([p for p in tag.posts if p.status == "published"]),
+        post_count=tag.post_count,
         created_at=tag.created_at,
     )
 
@@ -10,34 +10,57 @@ from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.config import settings
-from app.core.deps import get_db, get_current_user_id
+from app.core.deps import get_db, get_read_db, get_current_user_id
 from app.models.user import User
 from app.schemas.user import UserResponse, UserUpdate, UserPublicResponse, UserUpdatePassword
+from app.services.principal_cache import Principal, principal_cache
 from app.services.user_service import UserService
 
 router = APIRouter(prefix="/users", tags=["Users"])
 
 
-async def get_current_user(
+async def get_current_principal(
     user_id: int = Depends(get_current_user_id),
     db: AsyncSession = Depends(get_db),
-) -> User:
-    """Get current authenticated user."""
-    user_service = UserService(db)
-    user = await user_service.get_by_id(user_id)
+) -> Principal:
+    """
+    Get the current authenticated principal (id, role, active flag).
+    Served from the principal cache; use get_current_user when the
+    endpoint needs the full user row.
+    """
+    principal = await principal_cache.get(
+        user_id, lambda: UserService(db).get_principal(user_id)
+    )
     
-    if not user:
+    if not principal:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="User not found",
         )
     
-    if not user.is_active:
+    if not principal.is_active:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="User is deactivated",
         )
     
+    return principal
+
+
+async def get_current_user(
+    principal: Principal = Depends(get_current_principal),
+    db: AsyncSession = Depends(get_db),
+) -> User:
+    """Get current authenticated user."""
+    user_service = UserService(db)
+    user = await user_service.get_by_id(principal.id)
+    
+    if not user:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="User not found",
+        )
+    
     return user
 
 
@@ -144,7 +167,7 @@ async def update_avatar(
 @router.get("/{user_id}", response_model=UserPublicResponse)
 async def get_user_by_id(
     user_id: int,
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
 ):
     """
     Get public user information by ID.
@@ -164,7 +187,7 @@ async def get_user_by_id(
 @router.get("/username/{username}", response_model=UserPublicResponse)
 async def get_user_by_username(
     username: str,
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
 ):
     """
     Get public user information by username.
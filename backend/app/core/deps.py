@@ -3,14 +3,20 @@ Dependency injection utilities for FastAPI.
 """
 from typing import AsyncGenerator, Optional
 
-from fastapi import Depends, HTTPException, status
+from fastapi import Depends, HTTPException, Request, status
 from fastapi.security import OAuth2PasswordBearer
 from redis import asyncio as aioredis
+from redis.exceptions import RedisError
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.config import settings
-from app.core.security import verify_token
-from app.db.session import async_session_maker
+from app.core.logging import get_logger
+from app.core.metrics import InstrumentedRedis
+from app.core.tokens import VerifiedToken, is_revoked, token_verifier
+from app.db.routing import reads_from_primary
+from app.db.session import async_session_maker, replica_session_maker
+
+logger = get_logger("deps")
 
 # OAuth2 scheme for token authentication
 oauth2_scheme = OAuth2PasswordBearer(
@@ -40,6 +46,25 @@ async def get_db() -> AsyncGenerator[AsyncSession, None]:
             raise
 
 
+async def get_read_db(request: Request) -> AsyncGenerator[AsyncSession, None]:
+    """
+    Dependency that provides a session for read-only endpoints.
+    
+    Reads go to the replica, unless the client wrote recently (see
+    app.db.routing) or no replica is configured. Never write with it.
+    
+    Yields:
+        AsyncSession: Database session
+    """
+    session_maker = async_session_maker if reads_from_primary(request) else replica_session_maker
+    async with session_maker() as session:
+        try:
+            yield session
+        except Exception:
+            await session.rollback()
+            raise
+
+
 # Redis connection pool
 _redis_pool: Optional[aioredis.Redis] = None
 
@@ -53,7 +78,7 @@ async def get_redis() -> aioredis.Redis:
     """
     global _redis_pool
     if _redis_pool is None:
-        _redis_pool = aioredis.from_url(
+        _redis_pool = InstrumentedRedis.from_url(
             settings.REDIS_URL,
             encoding="utf-8",
             decode_responses=True,
@@ -69,6 +94,29 @@ async def close_redis() -> None:
         _redis_pool = None
 
 
+async def authenticate_token(token: str) -> Optional[VerifiedToken]:
+    """
+    Verify an access token and check that it has not been revoked.
+    
+    Args:
+        token: Encoded JWT
+    
+    Returns:
+        The verified token, or None if invalid, expired or revoked
+    """
+    verified = token_verifier.verify(token)
+    if verified is None:
+        return None
+    try:
+        redis = await get_redis()
+        if await is_revoked(redis, verified):
+            return None
+    except RedisError as e:
+        # Expiry still bounds the token; the principal check still applies
+        logger.warning(f"Token revocation check skipped: {e}")
+    return verified
+
+
 async def get_current_user_id(
     token: Optional[str] = Depends(oauth2_scheme),
 ) -> int:
@@ -91,23 +139,15 @@ async def get_current_user_id(
             headers={"WWW-Authenticate": "Bearer"},
         )
     
-    payload = verify_token(token)
-    if payload is None:
+    verified = await authenticate_token(token)
+    if verified is None:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid or expired token",
             headers={"WWW-Authenticate": "Bearer"},
         )
     
-    user_id = payload.get("sub")
-    if user_id is None:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Invalid token payload",
-            headers={"WWW-Authenticate": "Bearer"},
-        )
-    
-    return int(user_id)
+    return verified.user_id
 
 
 async def get_current_user_id_optional(
@@ -127,15 +167,11 @@ async def get_current_user_id_optional(
     if not token:
         return None
     
-    payload = verify_token(token)
-    if payload is None:
-        return None
-    
-    user_id = payload.get("sub")
-    if user_id is None:
+    verified = await authenticate_token(token)
+    if verified is None:
         return None
     
-    return int(user_id)
+    return verified.user_id
 
 
 # Note: get_current_user and get_current_admin will be added in M3
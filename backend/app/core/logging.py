@@ -14,6 +14,7 @@ from fastapi import Request, Response
 from starlette.middleware.base import BaseHTTPMiddleware
 
 from app.core.config import settings, BACKEND_DIR
+from app.core.profiling import current_profile, end_profile, exposes_profile, start_profile
 
 
 # Create logs directory if it doesn't exist
@@ -148,7 +149,7 @@ def get_logger(name: str = "app") -> logging.Logger:
     
     Args:
         name: Logger name, will be prefixed with 'app.' if not already
-        
+    
     Returns:
         Logger instance
     """
@@ -182,11 +183,18 @@ class RequestLoggingMiddleware(BaseHTTPMiddleware):
         
         # Record start time
         start_time = time.time()
+        profile_token = start_profile()
         
         # Process request
         try:
             response = await call_next(request)
             status_code = response.status_code
+            
+            # The handler has finished; only the body is left to stream
+            profile = current_profile()
+            if profile is not None and exposes_profile(request):
+                response.headers["Server-Timing"] = profile.server_timing()
+                response.headers["X-Query-Count"] = str(profile.statements)
         except Exception as e:
             status_code = 500
             # Log error
@@ -218,6 +226,7 @@ class RequestLoggingMiddleware(BaseHTTPMiddleware):
                 level = logging.INFO
             
             access_logger.log(level, "", extra=extra)
+            end_profile(profile_token)
         
         # Add request ID to response headers
         response.headers["X-Request-ID"] = request_id
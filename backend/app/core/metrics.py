@@ -0,0 +1,178 @@
+"""
+Prometheus metrics.
+
+With several uvicorn workers, each process keeps its own samples; set
+PROMETHEUS_MULTIPROC_DIR (an empty directory, wiped before every start) so
+that ``/metrics`` on any worker reports the sum over all of them. Without
+it, ``/metrics`` reports the answering worker only.
+
+HTTP requests are labelled by route template ("/api/v1/posts/{post_id}"),
+never by raw path, to keep the number of series bounded.
+"""
+import os
+import time
+from typing import Optional
+
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    generate_latest,
+    multiprocess,
+)
+from redis import asyncio as aioredis
+from redis.asyncio.client import Pipeline
+from sqlalchemy.ext.asyncio import AsyncEngine
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.profiling import current_profile, profile_queries
+
+MULTIPROCESS = bool(os.environ.get("PROMETHEUS_MULTIPROC_DIR"))
+
+# Route label for requests that matched no route (404s, static mounts)
+UNMATCHED_ROUTE = "<unmatched>"
+
+QUERY_COUNT_BUCKETS = (0, 1, 2, 3, 5, 8, 13, 21, 34, 55, 89, float("inf"))
+
+HTTP_REQUESTS = Counter(
+    "http_requests_total",
+    "HTTP requests by route template and status",
+    ["method", "route", "status"],
+)
+HTTP_REQUEST_SECONDS = Histogram(
+    "http_request_duration_seconds",
+    "HTTP request latency by route template",
+    ["method", "route"],
+)
+HTTP_IN_PROGRESS = Gauge(
+    "http_requests_in_progress",
+    "HTTP requests being handled",
+    ["method"],
+    multiprocess_mode="livesum",
+)
+HTTP_REQUEST_DB_STATEMENTS = Histogram(
+    "http_request_db_statements",
+    "SQL statements executed per HTTP request",
+    ["route"],
+    buckets=QUERY_COUNT_BUCKETS,
+)
+HTTP_REQUEST_DB_SECONDS = Histogram(
+    "http_request_db_seconds",
+    "Time spent executing SQL per HTTP request",
+    ["route"],
+)
+DB_STATEMENT_SECONDS = Histogram(
+    "db_statement_duration_seconds",
+    "SQL statement latency by engine",
+    ["engine"],
+)
+REDIS_COMMAND_SECONDS = Histogram(
+    "redis_command_duration_seconds",
+    "Redis command latency (PIPELINE for a whole pipeline)",
+    ["command"],
+)
+WEBSOCKET_CONNECTIONS = Gauge(
+    "websocket_connections",
+    "Open WebSocket connections",
+    multiprocess_mode="livesum",
+)
+AI_UPSTREAM_SECONDS = Histogram(
+    "ai_upstream_duration_seconds",
+    "AI provider request latency by operation and outcome",
+    ["operation", "outcome"],
+    buckets=(0.1, 0.25, 0.5, 1, 2.5, 5, 10, 20, 30, 60, 120, float("inf")),
+)
+
+
+def observe_queries(engine: AsyncEngine, name: str) -> None:
+    """Time every statement ``engine`` executes, per engine and per request."""
+    profile_queries(engine, DB_STATEMENT_SECONDS.labels(name).observe)
+
+
+class InstrumentedRedis(aioredis.Redis):
+    """Redis client that times each command and pipeline round trip."""
+    
+    async def execute_command(self, *args, **options):
+        started = time.perf_counter()
+        try:
+            return await super().execute_command(*args, **options)
+        finally:
+            command = str(args[0]).upper() if args else "UNKNOWN"
+            REDIS_COMMAND_SECONDS.labels(command).observe(time.perf_counter() - started)
+    
+    def pipeline(self, transaction: bool = True, shard_hint: Optional[str] = None) -> Pipeline:
+        return InstrumentedPipeline(
+            self.connection_pool, self.response_callbacks, transaction, shard_hint
+        )
+
+
+class InstrumentedPipeline(Pipeline):
+    """Pipeline timed as one PIPELINE round trip."""
+    
+    async def execute(self, raise_on_error: bool = True):
+        started = time.perf_counter()
+        try:
+            return await super().execute(raise_on_error)
+        finally:
+            REDIS_COMMAND_SECONDS.labels("PIPELINE").observe(time.perf_counter() - started)
+
+
+def route_template(scope: Scope) -> str:
+    """The path template of the route that handled the request."""
+    route = scope.get("route")
+    return getattr(route, "path", None) or UNMATCHED_ROUTE
+
+
+class MetricsMiddleware:
+    """Records latency, status, in-flight count and SQL work of each request."""
+    
+    def __init__(self, app: ASGIApp):
+        self.app = app
+    
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        
+        method = scope["method"]
+        status = 500
+        in_progress = HTTP_IN_PROGRESS.labels(method)
+        in_progress.inc()
+        started = time.perf_counter()
+        
+        async def send_with_status(message: Message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+        
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            duration = time.perf_counter() - started
+            in_progress.dec()
+            route = route_template(scope)
+            HTTP_REQUESTS.labels(method, route, str(status)).inc()
+            HTTP_REQUEST_SECONDS.labels(method, route).observe(duration)
+            # Started by RequestLoggingMiddleware (absent for unlogged paths)
+            profile = current_profile()
+            if profile is not None:
+                HTTP_REQUEST_DB_STATEMENTS.labels(route).observe(profile.statements)
+                HTTP_REQUEST_DB_SECONDS.labels(route).observe(profile.db_seconds)
+
+
+def render_metrics() -> tuple[bytes, str]:
+    """Exposition of all metrics (of every worker in multiprocess mode)."""
+    if MULTIPROCESS:
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        return generate_latest(registry), CONTENT_TYPE_LATEST
+    return generate_latest(), CONTENT_TYPE_LATEST
+
+
+def mark_worker_exited() -> None:
+    """Drop this worker's live gauges from the multiprocess totals."""
+    if MULTIPROCESS:
+        multiprocess.mark_process_dead(os.getpid())
@@ -0,0 +1,193 @@
+"""
+Per-request profiling.
+
+RequestLoggingMiddleware starts a RequestProfile for every request. SQL
+statement hooks, and the route wrappers installed by ``profile_routes``,
+add to the profile of the request they run for. The profile is sent back as
+``Server-Timing`` and ``X-Query-Count`` headers (visible in the browser's
+devtools) in debug mode, or when the request carries an ``X-Profile-Token``
+header matching PROFILING_TOKEN.
+
+Rows are counted from the driver's rowcount for statements that return
+rows; MySQL drivers report it, SQLite does not.
+"""
+import asyncio
+import functools
+import hmac
+import time
+from contextvars import ContextVar, Token
+from typing import Any, Callable, Optional
+
+from fastapi import FastAPI
+from fastapi.routing import APIRoute
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+from starlette.requests import Request
+from starlette.routing import request_response
+
+from app.core.config import settings
+
+PROFILE_TOKEN_HEADER = "X-Profile-Token"
+
+
+class RequestProfile:
+    """Where the time of one request went."""
+    
+    __slots__ = (
+        "started_at",
+        "statements",
+        "rows",
+        "db_seconds",
+        "route_started_at",
+        "handler_started_at",
+        "handler_ended_at",
+        "route_ended_at",
+    )
+    
+    def __init__(self):
+        self.started_at = time.perf_counter()
+        self.statements = 0
+        self.rows = 0
+        self.db_seconds = 0.0
+        self.route_started_at: Optional[float] = None
+        self.handler_started_at: Optional[float] = None
+        self.handler_ended_at: Optional[float] = None
+        self.route_ended_at: Optional[float] = None
+    
+    def server_timing(self) -> str:
+        """The profile as a Server-Timing header value (durations in ms)."""
+        metrics = [
+            f'db;dur={self.db_seconds * 1000:.1f};desc="{self.statements} queries, {self.rows} rows"'
+        ]
+        if self.route_started_at is not None and self.handler_started_at is not None:
+            metrics.append(f"deps;dur={(self.handler_started_at - self.route_started_at) * 1000:.1f}")
+        if self.handler_started_at is not None and self.handler_ended_at is not None:
+            metrics.append(f"handler;dur={(self.handler_ended_at - self.handler_started_at) * 1000:.1f}")
+        if self.handler_ended_at is not None and self.route_ended_at is not None:
+            metrics.append(f"serialize;dur={(self.route_ended_at - self.handler_ended_at) * 1000:.1f}")
+        metrics.append(f"total;dur={(time.perf_counter() - self.started_at) * 1000:.1f}")
+        return ", ".join(metrics)
+
+
+_current_profile: ContextVar[Optional[RequestProfile]] = ContextVar("request_profile", default=None)
+
+
+def start_profile() -> Token:
+    """Start profiling the current request; pass the token to ``end_profile``."""
+    return _current_profile.set(RequestProfile())
+
+
+def end_profile(token: Token) -> None:
+    _current_profile.reset(token)
+
+
+def current_profile() -> Optional[RequestProfile]:
+    """Profile of the request being handled, if any."""
+    return _current_profile.get()
+
+
+def exposes_profile(request: Request) -> bool:
+    """Whether the profile may be sent back to this client."""
+    if settings.DEBUG:
+        return True
+    token = request.headers.get(PROFILE_TOKEN_HEADER)
+    return bool(
+        token
+        and settings.PROFILING_TOKEN
+        and hmac.compare_digest(token, settings.PROFILING_TOKEN)
+    )
+
+
+def profile_queries(
+    engine: AsyncEngine,
+    on_statement: Optional[Callable[[float], None]] = None,
+) -> None:
+    """
+    Time every statement ``engine`` executes into the current profile.
+    
+    Args:
+        engine: Engine to watch
+        on_statement: Also called with each statement's duration in seconds
+    """
+    @event.listens_for(engine.sync_engine, "before_cursor_execute")
+    def _before(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_started_at", []).append(time.perf_counter())
+    
+    @event.listens_for(engine.sync_engine, "after_cursor_execute")
+    def _after(conn, cursor, statement, parameters, context, executemany):
+        rows = cursor.rowcount if cursor.description is not None else 0
+        _record(conn, max(rows, 0))
+    
+    @event.listens_for(engine.sync_engine, "handle_error")
+    def _failed(context):
+        # Errors before the statement ran leave nothing to record
+        if context.connection is not None:
+            _record(context.connection, 0)
+    
+    def _record(conn, rows: int) -> None:
+        started = conn.info.get("query_started_at")
+        if not started:
+            return
+        seconds = time.perf_counter() - started.pop()
+        if on_statement is not None:
+            on_statement(seconds)
+        profile = _current_profile.get()
+        if profile is not None:
+            profile.statements += 1
+            profile.rows += rows
+            profile.db_seconds += seconds
+
+
+def _timed_endpoint(call: Callable[..., Any]) -> Callable[..., Any]:
+    """Wrap an endpoint function to record when it starts and ends."""
+    if asyncio.iscoroutinefunction(call):
+        @functools.wraps(call)
+        async def timed(*args, **kwargs):
+            profile = _current_profile.get()
+            if profile is not None:
+                profile.handler_started_at = time.perf_counter()
+            try:
+                return await call(*args, **kwargs)
+            finally:
+                if profile is not None:
+                    profile.handler_ended_at = time.perf_counter()
+    else:
+        @functools.wraps(call)
+        def timed(*args, **kwargs):
+            profile = _current_profile.get()
+            if profile is not None:
+                profile.handler_started_at = time.perf_counter()
+            try:
+                return call(*args, **kwargs)
+            finally:
+                if profile is not None:
+                    profile.handler_ended_at = time.perf_counter()
+    return timed
+
+
+def _timed_route(handler: Callable[[Request], Any]) -> Callable[[Request], Any]:
+    """Wrap a route handler (dependencies, endpoint, serialization)."""
+    @functools.wraps(handler)
+    async def timed(request: Request):
+        profile = _current_profile.get()
+        if profile is not None:
+            profile.route_started_at = time.perf_counter()
+        try:
+            return await handler(request)
+        finally:
+            if profile is not None:
+                profile.route_ended_at = time.perf_counter()
+    return timed
+
+
+def profile_routes(app: FastAPI) -> None:
+    """
+    Split each API route's time into dependencies, endpoint and serialization.
+    
+    Call once, after all routers are included.
+    """
+    for route in app.routes:
+        if not isinstance(route, APIRoute) or route.dependant.call is None:
+            continue
+        route.dependant.call = _timed_endpoint(route.dependant.call)
+        route.app = request_response(_timed_route(route.get_route_handler()))
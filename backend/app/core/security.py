@@ -1,13 +1,26 @@
 """
 Security utilities for authentication and authorization.
 """
+import asyncio
+import re
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta, timezone
-from typing import Any, Optional
+from typing import Any, Callable, Optional, TypeVar
 
 import bcrypt
 from jose import JWTError, jwt
 
 from app.core.config import settings
+from app.core.logging import get_logger
+
+logger = get_logger("security")
+
+T = TypeVar("T")
+
+# "$2b$12$..." -> cost factor 12
+BCRYPT_COST_PATTERN = re.compile(r"^\$2[abxy]?\$(\d{2})\$")
 
 
 def create_access_token(
@@ -37,6 +50,8 @@ def create_access_token(
         "exp": expire,
         "sub": str(subject),
         "iat": datetime.now(timezone.utc),
+        # Unique per token, so revoking one never revokes an identical twin
+        "jti": uuid.uuid4().hex,
     }
     
     if extra_data:
@@ -82,7 +97,7 @@ def get_password_hash(password: str) -> str:
         Hashed password string
     """
     password_bytes = password.encode("utf-8")
-    salt = bcrypt.gensalt()
+    salt = bcrypt.gensalt(rounds=settings.BCRYPT_ROUNDS)
     hashed = bcrypt.hashpw(password_bytes, salt)
     return hashed.decode("utf-8")
 
@@ -102,3 +117,111 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
     hashed_bytes = hashed_password.encode("utf-8")
     return bcrypt.checkpw(password_bytes, hashed_bytes)
 
+
+
+def password_needs_rehash(hashed_password: str) -> bool:
+    """
+    Check whether a hash was made with a different cost than BCRYPT_ROUNDS.
+    
+    Args:
+        hashed_password: Stored password hash
+    
+    Returns:
+        True if the password should be hashed again on the next login
+    """
+    match = BCRYPT_COST_PATTERN.match(hashed_password)
+    return match is None or int(match.group(1)) != settings.BCRYPT_ROUNDS
+
+
+class PasswordHasherBusy(Exception):
+    """Raised when too many password hashes are already waiting."""
+
+
+class PasswordHasher:
+    """
+    Runs bcrypt on a dedicated, bounded thread pool.
+    
+    bcrypt releases the GIL while hashing, so a few threads keep the event
+    loop free without a process pool. At most PASSWORD_HASH_WORKERS hashes
+    run at once; up to PASSWORD_HASH_MAX_QUEUE more wait their turn, and
+    further requests fail fast with PasswordHasherBusy instead of piling up
+    behind a login flood.
+    """
+    
+    def __init__(self):
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._slots: Optional[asyncio.Semaphore] = None
+        self.active = 0
+        self.queued = 0
+        self.completed = 0
+        self.rejected = 0
+        self.wait_seconds_total = 0.0
+        self.wait_seconds_max = 0.0
+        self.run_seconds_total = 0.0
+    
+    async def hash(self, password: str) -> str:
+        """Hash a password with the configured cost off the event loop."""
+        return await self._run(get_password_hash, password)
+    
+    async def verify(self, plain_password: str, hashed_password: str) -> bool:
+        """Verify a password against its hash off the event loop."""
+        return await self._run(verify_password, plain_password, hashed_password)
+    
+    def stats(self) -> dict[str, Any]:
+        """Queueing metrics since startup."""
+        return {
+            "workers": settings.PASSWORD_HASH_WORKERS,
+            "rounds": settings.BCRYPT_ROUNDS,
+            "active": self.active,
+            "queued": self.queued,
+            "completed": self.completed,
+            "rejected": self.rejected,
+            "wait_seconds_total": round(self.wait_seconds_total, 6),
+            "wait_seconds_max": round(self.wait_seconds_max, 6),
+            "run_seconds_total": round(self.run_seconds_total, 6),
+        }
+    
+    def shutdown(self) -> None:
+        """Stop the worker threads (on application shutdown)."""
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+        self._slots = None
+    
+    async def _run(self, func: Callable[..., T], *args: Any) -> T:
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=settings.PASSWORD_HASH_WORKERS,
+                thread_name_prefix="password-hash",
+            )
+            self._slots = asyncio.Semaphore(settings.PASSWORD_HASH_WORKERS)
+        
+        if self._slots.locked() and self.queued >= settings.PASSWORD_HASH_MAX_QUEUE:
+            self.rejected += 1
+            logger.warning(f"Password hashing queue full ({self.queued} waiting)")
+            raise PasswordHasherBusy("Too many password operations in progress")
+        
+        queued_at = time.perf_counter()
+        self.queued += 1
+        try:
+            await self._slots.acquire()
+        finally:
+            self.queued -= 1
+        
+        started_at = time.perf_counter()
+        wait = started_at - queued_at
+        self.wait_seconds_total += wait
+        self.wait_seconds_max = max(self.wait_seconds_max, wait)
+        self.active += 1
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._executor, func, *args)
+        finally:
+            self.active -= 1
+            self.completed += 1
+            self.run_seconds_total += time.perf_counter() - started_at
+            self._slots.release()
+
+
+# Global hasher instance
+password_hasher = PasswordHasher()
@@ -0,0 +1,129 @@
+"""
+Access token verification cache and revocation list.
+
+Verifying an HS256 token on every request is avoidable work: a token that
+verified once stays valid until its ``exp``, unless revoked. Verified
+tokens are kept in a bounded in-process LRU keyed by the token's SHA-256
+digest, so the raw token is never stored.
+
+Revocation lives in Redis and costs one MGET per request:
+
+- ``revoked:token:<digest>``: a single token (logout), kept until it expires
+- ``revoked:user:<user_id>``: every token of the user issued before the
+  stored timestamp (deactivation), kept for the token lifetime
+"""
+import hashlib
+import time
+from collections import OrderedDict
+from typing import NamedTuple, Optional
+
+from redis import asyncio as aioredis
+
+from app.core.config import settings
+from app.core.security import verify_token
+
+TOKEN_KEY_PREFIX = "revoked:token:"
+USER_KEY_PREFIX = "revoked:user:"
+
+
+class VerifiedToken(NamedTuple):
+    """The parts of a verified access token authentication needs."""
+    digest: str
+    user_id: int
+    issued_at: int
+    expires_at: Optional[int]
+
+
+def token_digest(token: str) -> str:
+    """SHA-256 hex digest a token is cached and revoked under."""
+    return hashlib.sha256(token.encode("utf-8")).hexdigest()
+
+
+class TokenVerifier:
+    """Verifies access tokens, remembering valid ones until they expire."""
+    
+    def __init__(self):
+        self._verified: OrderedDict[str, VerifiedToken] = OrderedDict()
+    
+    def verify(self, token: str) -> Optional[VerifiedToken]:
+        """
+        Verify a token's signature and expiry, from cache when possible.
+        
+        Args:
+            token: Encoded JWT
+        
+        Returns:
+            The verified token, or None if invalid or expired
+        """
+        digest = token_digest(token)
+        verified = self._verified.get(digest)
+        if verified is not None:
+            if verified.expires_at > time.time():
+                self._verified.move_to_end(digest)
+                return verified
+            del self._verified[digest]
+        
+        payload = verify_token(token)
+        if payload is None:
+            return None
+        try:
+            user_id = int(payload["sub"])
+        except (KeyError, TypeError, ValueError):
+            return None
+        expires_at = payload.get("exp")
+        verified = VerifiedToken(
+            digest=digest,
+            user_id=user_id,
+            issued_at=int(payload.get("iat") or 0),
+            expires_at=expires_at if isinstance(expires_at, int) else None,
+        )
+        
+        # Tokens without an expiry are re-verified every time
+        if verified.expires_at is not None:
+            self._verified[digest] = verified
+            while len(self._verified) > settings.TOKEN_CACHE_MAX_ENTRIES:
+                self._verified.popitem(last=False)
+        return verified
+    
+    def forget(self, digest: str) -> None:
+        """Drop a token from this worker's cache."""
+        self._verified.pop(digest, None)
+    
+    def clear(self) -> None:
+        """Drop all cached tokens."""
+        self._verified.clear()
+
+
+async def is_revoked(redis: aioredis.Redis, token: VerifiedToken) -> bool:
+    """Check the token and its user against the revocation list."""
+    revoked_token, revoked_before = await redis.mget(
+        f"{TOKEN_KEY_PREFIX}{token.digest}",
+        f"{USER_KEY_PREFIX}{token.user_id}",
+    )
+    if revoked_token is not None:
+        return True
+    return revoked_before is not None and token.issued_at < int(revoked_before)
+
+
+async def revoke_token(redis: aioredis.Redis, token: VerifiedToken) -> None:
+    """Revoke a single token until it would have expired anyway."""
+    ttl = settings.ACCESS_TOKEN_EXPIRE_MINUTES * 60
+    if token.expires_at is not None:
+        ttl = int(token.expires_at - time.time()) + 1
+    if ttl > 0:
+        await redis.set(f"{TOKEN_KEY_PREFIX}{token.digest}", 1, ex=ttl)
+    token_verifier.forget(token.digest)
+
+
+async def revoke_user_tokens(redis: aioredis.Redis, user_id: int) -> None:
+    """Revoke every token issued to a user up to now."""
+    # iat has second precision: include tokens issued during this second
+    await redis.set(
+        f"{USER_KEY_PREFIX}{user_id}",
+        int(time.time()) + 1,
+        ex=settings.ACCESS_TOKEN_EXPIRE_MINUTES * 60,
+    )
+
+
+# Global verifier instance
+token_verifier = TokenVerifier()
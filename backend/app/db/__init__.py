@@ -1,6 +1,5 @@
 # Database module - Session, Base
 from app.db.base import Base
-from app.db.session import async_session_maker, engine
-
-__all__ = ["Base", "async_session_maker", "engine"]
+from app.db.session import async_session_maker, engine, replica_engine, replica_session_maker
 
+__all__ = ["Base", "async_session_maker", "engine", "replica_engine", "replica_session_maker"]
@@ -0,0 +1,200 @@
+"""
+Offset and keyset (cursor) pagination helpers.
+
+Every page is ordered by ``(sort_column, id)`` so rows with equal sort values
+keep a stable order. Clients can keep using ``page`` or switch to the opaque
+``after`` / ``before`` cursors returned with each page; cursor pages seek
+straight to the key instead of scanning and discarding ``OFFSET`` rows.
+
+NULL sort values order below every other value, as they do on MySQL and
+SQLite, and the seek conditions follow that order.
+"""
+import base64
+import json
+from datetime import datetime
+from typing import Any, NamedTuple, Optional
+
+from sqlalchemy import Select, and_, func, or_, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import InstrumentedAttribute
+
+
+class InvalidCursorError(ValueError):
+    """Raised when a pagination cursor cannot be decoded."""
+
+
+class Page(NamedTuple):
+    """One page of results."""
+    items: list
+    total: Optional[int]
+    next_cursor: Optional[str]
+    prev_cursor: Optional[str]
+
+
+def encode_cursor(sort_value: Any, row_id: int) -> str:
+    """Encode a ``(sort_value, id)`` key as an opaque URL-safe cursor."""
+    if isinstance(sort_value, datetime):
+        key = ["d", sort_value.isoformat(), row_id]
+    else:
+        key = ["v", sort_value, row_id]
+    raw = json.dumps(key, separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> tuple[Any, int]:
+    """Decode a cursor produced by encode_cursor."""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        kind, sort_value, row_id = json.loads(raw)
+        if kind == "d":
+            sort_value = datetime.fromisoformat(sort_value)
+        elif kind != "v" or isinstance(sort_value, bool) or not (
+            sort_value is None or isinstance(sort_value, (str, int, float))
+        ):
+            raise ValueError("Unsupported cursor sort value")
+        if isinstance(row_id, bool) or not isinstance(row_id, int):
+            raise ValueError("Unsupported cursor id")
+        return sort_value, row_id
+    except (ValueError, TypeError) as e:
+        raise InvalidCursorError("Invalid pagination cursor") from e
+
+
+def page_count(total: Optional[int], size: int) -> Optional[int]:
+    """Number of pages for ``total`` rows, or None if the total was not counted."""
+    if total is None:
+        return None
+    return (total + size - 1) // size
+
+
+def _check_sort_value(column: Any, sort_value: Any) -> None:
+    """Reject a cursor whose sort value cannot be compared with the column."""
+    if sort_value is None:
+        return
+    try:
+        python_type = getattr(column, "expression", column).type.python_type
+    except (AttributeError, NotImplementedError):
+        return
+    accepted = (int, float) if python_type is float else (python_type,)
+    if python_type in (datetime, int, float, str) and not isinstance(sort_value, accepted):
+        raise InvalidCursorError("Invalid pagination cursor")
+
+
+def _nullable(column: Any) -> bool:
+    """Whether a sort column may hold NULL (assumed so if unknown)."""
+    return getattr(getattr(column, "expression", column), "nullable", True)
+
+
+def _seek_condition(
+    sort_column: InstrumentedAttribute,
+    id_column: InstrumentedAttribute,
+    sort_value: Any,
+    last_id: int,
+    descending: bool,
+):
+    """Rows past the ``(sort_value, last_id)`` key, with NULL sorting lowest."""
+    if sort_value is None:
+        if descending:
+            # Only NULLs follow a NULL key
+            return and_(sort_column.is_(None), id_column < last_id)
+        return or_(
+            sort_column.is_not(None),
+            and_(sort_column.is_(None), id_column > last_id),
+        )
+    if descending:
+        condition = or_(
+            sort_column < sort_value,
+            and_(sort_column == sort_value, id_column < last_id),
+        )
+        if _nullable(sort_column):
+            condition = or_(condition, sort_column.is_(None))
+        return condition
+    return or_(
+        sort_column > sort_value,
+        and_(sort_column == sort_value, id_column > last_id),
+    )
+
+
+async def paginate(
+    db: AsyncSession,
+    query: Select,
+    sort_column: InstrumentedAttribute,
+    id_column: InstrumentedAttribute,
+    *,
+    size: int,
+    page: int = 1,
+    after: Optional[str] = None,
+    before: Optional[str] = None,
+    descending: bool = True,
+    with_total: bool = True,
+    count_query: Optional[Select] = None,
+    scalars: bool = True,
+) -> Page:
+    """
+    Execute ``query`` as one page.
+    
+    Args:
+        db: Database session
+        query: Filtered, unordered select
+        sort_column: Primary sort column
+        id_column: Unique tiebreaker column (usually the primary key)
+        size: Page size
+        page: 1-based page number, ignored when a cursor is given
+        after: Return rows after this cursor
+        before: Return rows before this cursor
+        descending: Sort direction of the list
+        with_total: Run the COUNT query
+        count_query: Select to count instead of ``query``
+        scalars: Return the first entity of each row instead of the row
+    
+    Returns:
+        Page with items, total (None if not counted) and cursors
+    
+    Raises:
+        InvalidCursorError: If the cursor cannot be decoded
+    """
+    cursor = after or before
+    backwards = after is None and before is not None
+    key = decode_cursor(cursor) if cursor else None
+    
+    total = None
+    if with_total:
+        count_source = count_query if count_query is not None else query
+        total = await db.scalar(
+            select(func.count()).select_from(count_source.order_by(None).subquery())
+        ) or 0
+    
+    # Walking backwards flips the order; the rows are reversed afterwards
+    seek_desc = descending != backwards
+    if key is not None:
+        _check_sort_value(sort_column, key[0])
+        query = query.where(_seek_condition(sort_column, id_column, *key, seek_desc))
+    
+    if seek_desc:
+        query = query.order_by(sort_column.desc(), id_column.desc())
+    else:
+        query = query.order_by(sort_column.asc(), id_column.asc())
+    
+    # Fetch one extra row to know whether another page follows
+    query = query.limit(size + 1)
+    if not cursor:
+        query = query.offset((page - 1) * size)
+    
+    result = await db.execute(query)
+    rows = list(result.scalars().all() if scalars else result.all())
+    has_more = len(rows) > size
+    rows = rows[:size]
+    if backwards:
+        rows.reverse()
+    
+    def cursor_for(row: Any) -> str:
+        return encode_cursor(getattr(row, sort_column.key), getattr(row, id_column.key))
+    
+    next_cursor = None
+    prev_cursor = None
+    if rows:
+        if has_more or backwards:
+            next_cursor = cursor_for(rows[-1])
+        if (backwards and has_more) or (not backwards and (cursor or page > 1)):
+            prev_cursor = cursor_for(rows[0])
+    
+    return Page(rows, total, next_cursor, prev_cursor)
@@ -0,0 +1,129 @@
+"""
+Connection pool instrumentation.
+
+Counts how long requests wait to check out a connection, how many are in
+use and in overflow, and how often connections are opened, closed and
+invalidated, per engine. Read with ``pool_stats()``.
+"""
+import time
+from typing import Any, Dict
+
+from sqlalchemy import event, exc
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+
+
+class PoolMetrics:
+    """Counters and gauges of one engine's pool."""
+    
+    def __init__(self, name: str):
+        self.name = name
+        self.checkouts = 0
+        self.checkins = 0
+        self.in_use = 0
+        self.in_use_max = 0
+        self.checkout_wait_seconds_total = 0.0
+        self.checkout_wait_seconds_max = 0.0
+        self.checkout_timeouts = 0
+        self.connects = 0
+        self.closes = 0
+        self.invalidations = 0
+    
+    def record_wait(self, seconds: float) -> None:
+        self.checkout_wait_seconds_total += seconds
+        self.checkout_wait_seconds_max = max(self.checkout_wait_seconds_max, seconds)
+
+
+class InstrumentedQueuePool(AsyncAdaptedQueuePool):
+    """Queue pool that times every checkout, including time spent queued."""
+    
+    metrics: PoolMetrics
+    
+    def _do_get(self):
+        started_at = time.perf_counter()
+        try:
+            return super()._do_get()
+        except exc.TimeoutError:
+            self.metrics.checkout_timeouts += 1
+            raise
+        finally:
+            self.metrics.record_wait(time.perf_counter() - started_at)
+    
+    def recreate(self) -> "InstrumentedQueuePool":
+        pool = super().recreate()
+        pool.metrics = self.metrics
+        return pool
+
+
+# Metrics by engine name ("primary", "replica")
+pool_metrics: Dict[str, PoolMetrics] = {}
+
+# Engines by name, for the live pool gauges
+_engines: Dict[str, AsyncEngine] = {}
+
+
+def instrument(engine: AsyncEngine, name: str) -> PoolMetrics:
+    """Start collecting pool metrics for ``engine`` under ``name``."""
+    metrics = PoolMetrics(name)
+    pool_metrics[name] = metrics
+    _engines[name] = engine
+    if isinstance(engine.pool, InstrumentedQueuePool):
+        engine.pool.metrics = metrics
+    
+    sync_engine = engine.sync_engine
+    
+    @event.listens_for(sync_engine, "connect")
+    def _on_connect(dbapi_connection, connection_record):
+        metrics.connects += 1
+    
+    @event.listens_for(sync_engine, "close")
+    def _on_close(dbapi_connection, connection_record):
+        metrics.closes += 1
+    
+    @event.listens_for(sync_engine, "invalidate")
+    def _on_invalidate(dbapi_connection, connection_record, exception):
+        metrics.invalidations += 1
+    
+    @event.listens_for(sync_engine, "checkout")
+    def _on_checkout(dbapi_connection, connection_record, connection_proxy):
+        metrics.checkouts += 1
+        metrics.in_use += 1
+        metrics.in_use_max = max(metrics.in_use_max, metrics.in_use)
+    
+    @event.listens_for(sync_engine, "checkin")
+    def _on_checkin(dbapi_connection, connection_record):
+        metrics.checkins += 1
+        metrics.in_use = max(metrics.in_use - 1, 0)
+    
+    return metrics
+
+
+def pool_stats() -> Dict[str, Dict[str, Any]]:
+    """Current pool gauges and counters of every instrumented engine."""
+    stats = {}
+    for name, metrics in pool_metrics.items():
+        pool = _engines[name].pool
+        entry: Dict[str, Any] = {
+            "pool": type(pool).__name__,
+            "in_use": metrics.in_use,
+            "in_use_max": metrics.in_use_max,
+            "checkouts": metrics.checkouts,
+            "checkins": metrics.checkins,
+            "checkout_wait_seconds_total": round(metrics.checkout_wait_seconds_total, 6),
+            "checkout_wait_seconds_max": round(metrics.checkout_wait_seconds_max, 6),
+            "checkout_timeouts": metrics.checkout_timeouts,
+            "connects": metrics.connects,
+            "closes": metrics.closes,
+            "invalidations": metrics.invalidations,
+        }
+        if isinstance(pool, QueuePool):
+            entry.update(
+                size=pool.size(),
+                idle=pool.checkedin(),
+                checked_out=pool.checkedout(),
+                overflow=max(pool.overflow(), 0),
+                max_overflow=pool._max_overflow,
+                timeout=pool.timeout(),
+            )
+        stats[name] = entry
+    return stats
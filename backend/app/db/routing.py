@@ -0,0 +1,71 @@
+"""
+Read-your-writes routing between the primary and the read replica.
+
+A replica lags behind the primary, so a client that just wrote must not
+read from it for a while or its own change may seem to vanish. After a
+successful write request, the response sets a short-lived cookie; while
+the client presents it, read-only endpoints use the primary as well.
+The cookie is only set when a replica is configured.
+
+Cached responses are shared by every client and may be a few seconds old
+in another worker's memory, so cached endpoints skip the response cache
+for such a client too (see app.services.response_cache).
+"""
+import time
+
+from starlette.requests import Request
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.config import settings
+from app.db.session import replica_engine
+
+PRIMARY_COOKIE = "db_primary_until"
+
+SAFE_METHODS = {"GET", "HEAD", "OPTIONS"}
+
+
+def wrote_recently(request: Request) -> bool:
+    """Whether the client presents a read-your-writes cookie that is still valid."""
+    until = request.cookies.get(PRIMARY_COOKIE)
+    if not until:
+        return False
+    try:
+        return float(until) > time.time()
+    except ValueError:
+        return False
+
+
+def reads_from_primary(request: Request) -> bool:
+    """Whether this request's reads must see the client's recent writes."""
+    return replica_engine is None or wrote_recently(request)
+
+
+class ReadYourWritesMiddleware:
+    """Marks clients that just wrote so their next reads use the primary."""
+    
+    def __init__(self, app: ASGIApp):
+        self.app = app
+    
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if (
+            replica_engine is None
+            or scope["type"] != "http"
+            or scope["method"] in SAFE_METHODS
+        ):
+            await self.app(scope, receive, send)
+            return
+        
+        async def send_with_cookie(message: Message) -> None:
+            if message["type"] == "http.response.start" and message["status"] < 400:
+                window = settings.DATABASE_READ_YOUR_WRITES_SECONDS
+                cookie = (
+                    f"{PRIMARY_COOKIE}={time.time() + window:.3f}; Max-Age={window}; "
+                    f"Path=/; HttpOnly; SameSite=Lax"
+                )
+                message["headers"] = [
+                    *message.get("headers", []),
+                    (b"set-cookie", cookie.encode("latin-1")),
+                ]
+            await send(message)
+        
+        await self.app(scope, receive, send_with_cookie)
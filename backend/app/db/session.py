@@ -1,25 +1,90 @@
 """
 Database session configuration.
+
+Writes and anything that must see them use the primary engine
+(``async_session_maker``). Read-only request handlers may use the replica
+engine (``replica_session_maker``) when DATABASE_REPLICA_URL is set; without
+it, replica sessions are primary sessions.
 """
-from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from typing import Optional
+
+from sqlalchemy import event, make_url
+from sqlalchemy.ext.asyncio import (
+    AsyncEngine,
+    AsyncSession,
+    async_sessionmaker,
+    create_async_engine,
+)
 
 from app.core.config import settings
+from app.core.metrics import observe_queries
+from app.db.pool_metrics import InstrumentedQueuePool, instrument
+
+
+def _create_engine(url: str, name: str) -> AsyncEngine:
+    options = {}
+    if make_url(url).get_backend_name() != "sqlite":
+        # SQLite keeps its own pool (NullPool/StaticPool), which takes no sizing
+        options.update(
+            poolclass=InstrumentedQueuePool,
+            pool_size=settings.DATABASE_POOL_SIZE,
+            max_overflow=settings.DATABASE_MAX_OVERFLOW,
+            pool_timeout=settings.DATABASE_POOL_TIMEOUT,
+        )
+    engine = create_async_engine(
+        url,
+        echo=settings.DEBUG,
+        pool_pre_ping=True,
+        pool_recycle=settings.DATABASE_POOL_RECYCLE,
+        **options,
+    )
+    instrument(engine, name)
+    observe_queries(engine, name)
+    
+    # Bound every SELECT on the server (MySQL only counts SELECTs)
+    if engine.dialect.name == "mysql" and settings.DATABASE_STATEMENT_TIMEOUT_MS:
+        @event.listens_for(engine.sync_engine, "connect")
+        def _set_statement_timeout(dbapi_connection, connection_record):
+            cursor = dbapi_connection.cursor()
+            cursor.execute(
+                f"SET SESSION max_execution_time = {int(settings.DATABASE_STATEMENT_TIMEOUT_MS)}"
+            )
+            cursor.close()
+    
+    # Relationships rely on ON DELETE CASCADE (passive_deletes), which SQLite
+    # only enforces when foreign keys are switched on per connection.
+    if engine.dialect.name == "sqlite":
+        @event.listens_for(engine.sync_engine, "connect")
+        def _enable_sqlite_foreign_keys(dbapi_connection, connection_record):
+            cursor = dbapi_connection.cursor()
+            cursor.execute("PRAGMA foreign_keys=ON")
+            cursor.close()
+    
+    return engine
+
+
+def _create_session_maker(engine: AsyncEngine) -> async_sessionmaker[AsyncSession]:
+    return async_sessionmaker(
+        engine,
+        class_=AsyncSession,
+        expire_on_commit=False,
+        autocommit=False,
+        autoflush=False,
+    )
+
 
-# Create async engine
-engine = create_async_engine(
-    settings.DATABASE_URL,
-    echo=settings.DEBUG,
-    pool_pre_ping=True,
-    pool_recycle=3600,
+# Create async engines
+engine = _create_engine(settings.DATABASE_URL, "primary")
+replica_engine: Optional[AsyncEngine] = (
+    _create_engine(settings.DATABASE_REPLICA_URL, "replica")
+    if settings.DATABASE_REPLICA_URL
+    else None
 )
 
-# Create async session factory
-async_session_maker = async_sessionmaker(
-    engine,
-    class_=AsyncSession,
-    expire_on_commit=False,
-    autocommit=False,
-    autoflush=False,
+# Create async session factories
+async_session_maker = _create_session_maker(engine)
+replica_session_maker = (
+    _create_session_maker(replica_engine) if replica_engine is not None else async_session_maker
 )
 
 
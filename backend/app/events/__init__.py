@@ -0,0 +1,13 @@
+# Domain events module
+from app.events.dispatcher import EventDispatcher, dispatcher
+from app.events.types import CommentCreated, DomainEvent, Liked, MessageSent, PostFavorited
+
+__all__ = [
+    "EventDispatcher",
+    "dispatcher",
+    "CommentCreated",
+    "DomainEvent",
+    "Liked",
+    "MessageSent",
+    "PostFavorited",
+]
@@ -0,0 +1,107 @@
+"""
+In-process domain event dispatcher.
+
+Endpoints emit events after committing and return immediately; a background
+task collects events into batches and hands each batch to the subscribed
+handlers.
+"""
+import asyncio
+from typing import Awaitable, Callable, List, Optional
+
+from app.core.config import settings
+from app.core.logging import get_logger
+from app.events.types import DomainEvent
+
+logger = get_logger("events")
+
+BatchHandler = Callable[[List[DomainEvent]], Awaitable[None]]
+
+
+class EventDispatcher:
+    """Bounded event queue with a batching consumer."""
+    
+    def __init__(
+        self,
+        max_queue: Optional[int] = None,
+        batch_size: Optional[int] = None,
+        batch_wait: Optional[float] = None,
+    ):
+        self.batch_size = batch_size or settings.EVENT_BATCH_SIZE
+        self.batch_wait = batch_wait if batch_wait is not None else settings.EVENT_BATCH_WAIT
+        self._queue: asyncio.Queue = asyncio.Queue(maxsize=max_queue or settings.EVENT_QUEUE_SIZE)
+        self._handlers: List[BatchHandler] = []
+        self._consumer: Optional[asyncio.Task] = None
+        self._in_flight: Optional[asyncio.Task] = None
+        self._collecting: List[DomainEvent] = []
+    
+    def subscribe(self, handler: BatchHandler) -> None:
+        """Register a handler that receives every batch."""
+        self._handlers.append(handler)
+    
+    def emit(self, event: DomainEvent) -> None:
+        """Queue an event without waiting; drops it if the queue is full."""
+        try:
+            self._queue.put_nowait(event)
+        except asyncio.QueueFull:
+            logger.warning(f"Event queue full, dropping {type(event).__name__}")
+    
+    async def start(self) -> None:
+        """Start the consumer task."""
+        if self._consumer is None:
+            self._consumer = asyncio.create_task(self._consume())
+    
+    async def stop(self) -> None:
+        """Stop the consumer and process whatever is still queued."""
+        if self._consumer is not None:
+            self._consumer.cancel()
+            try:
+                await self._consumer
+            except asyncio.CancelledError:
+                pass
+            self._consumer = None
+        if self._in_flight is not None:
+            await self._in_flight
+            self._in_flight = None
+        
+        # Events taken off the queue by a batch that never got dispatched
+        if self._collecting:
+            batch, self._collecting = self._collecting, []
+            await self._dispatch(batch)
+        while not self._queue.empty():
+            batch = []
+            while not self._queue.empty() and len(batch) < self.batch_size:
+                batch.append(self._queue.get_nowait())
+            await self._dispatch(batch)
+    
+    async def _consume(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = self._collecting
+            batch.append(await self._queue.get())
+            
+            # Give related events a moment to arrive so they share one batch
+            deadline = loop.time() + self.batch_wait
+            while len(batch) < self.batch_size:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+            
+            # Shielded so stop() lets the current batch finish
+            self._collecting = []
+            self._in_flight = asyncio.create_task(self._dispatch(batch))
+            await asyncio.shield(self._in_flight)
+    
+    async def _dispatch(self, batch: List[DomainEvent]) -> None:
+        for handler in self._handlers:
+            try:
+                await handler(batch)
+            except Exception:
+                logger.exception(f"Event handler {handler.__name__} failed")
+
+
+# Global dispatcher instance
+dispatcher = EventDispatcher()
@@ -0,0 +1,131 @@
+"""
+Event handlers that turn domain events into notifications and WebSocket pushes.
+"""
+from typing import Dict, List, Set, Tuple
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.db.session import async_session_maker
+from app.events.types import CommentCreated, DomainEvent, Liked, MessageSent, PostFavorited
+from app.models.comment import Comment
+from app.models.post import Post
+from app.schemas.notification import NotificationCreate, NotificationResponse
+from app.services.message_service import MessageService
+from app.services.notification_service import (
+    NotificationService,
+    comment_notification,
+    favorite_notification,
+    like_notification,
+    reply_notification,
+)
+from app.websocket.manager import send_message_notification, send_notification, send_unread_count
+
+
+async def _load_targets(
+    db: AsyncSession,
+    events: List[DomainEvent],
+) -> Tuple[Dict[int, Tuple[int, str]], Dict[int, int]]:
+    """Fetch authors of every post and comment the events refer to, two queries at most."""
+    post_ids: Set[int] = set()
+    comment_ids: Set[int] = set()
+    for event in events:
+        if isinstance(event, CommentCreated):
+            post_ids.add(event.post_id)
+            if event.parent_id:
+                comment_ids.add(event.parent_id)
+        elif isinstance(event, Liked):
+            (post_ids if event.target_type == "post" else comment_ids).add(event.target_id)
+        elif isinstance(event, PostFavorited):
+            post_ids.add(event.post_id)
+    
+    posts: Dict[int, Tuple[int, str]] = {}
+    if post_ids:
+        result = await db.execute(
+            select(Post.id, Post.user_id, Post.title).where(Post.id.in_(post_ids))
+        )
+        posts = {row.id: (row.user_id, row.title) for row in result}
+    
+    comment_authors: Dict[int, int] = {}
+    if comment_ids:
+        result = await db.execute(
+            select(Comment.id, Comment.user_id).where(Comment.id.in_(comment_ids))
+        )
+        comment_authors = {row.id: row.user_id for row in result}
+    
+    return posts, comment_authors
+
+
+def _build_notifications(
+    events: List[DomainEvent],
+    posts: Dict[int, Tuple[int, str]],
+    comment_authors: Dict[int, int],
+) -> List[NotificationCreate]:
+    notifications = []
+    for event in events:
+        if isinstance(event, CommentCreated) and event.post_id in posts:
+            post_author_id, post_title = posts[event.post_id]
+            parent_author_id = comment_authors.get(event.parent_id) if event.parent_id else None
+            if parent_author_id is not None:
+                notifications.append(reply_notification(
+                    parent_author_id, event.actor_id, event.post_id, event.comment_id
+                ))
+            # The post author hears about replies too, unless they were replied to
+            if parent_author_id != post_author_id:
+                notifications.append(comment_notification(
+                    post_author_id, event.actor_id, event.post_id, post_title
+                ))
+        elif isinstance(event, Liked):
+            if event.target_type == "post" and event.target_id in posts:
+                author_id = posts[event.target_id][0]
+            elif event.target_type == "comment" and event.target_id in comment_authors:
+                author_id = comment_authors[event.target_id]
+            else:
+                continue
+            notifications.append(like_notification(
+                author_id, event.actor_id, event.target_type, event.target_id
+            ))
+        elif isinstance(event, PostFavorited) and event.post_id in posts:
+            post_author_id, post_title = posts[event.post_id]
+            notifications.append(favorite_notification(
+                post_author_id, event.actor_id, event.post_id, post_title
+            ))
+    return [n for n in notifications if n is not None]
+
+
+async def handle_notification_events(events: List[DomainEvent]) -> None:
+    """
+    Create the notifications for a batch of events and push them.
+    
+    One batch costs a fixed number of queries: author lookups, one insert,
+    one reload, and one grouped unread count per counter.
+    """
+    messages = [e for e in events if isinstance(e, MessageSent)]
+    
+    async with async_session_maker() as db:
+        posts, comment_authors = await _load_targets(db, events)
+        to_create = _build_notifications(events, posts, comment_authors)
+        
+        notifications = []
+        if to_create:
+            notifications = await NotificationService(db).create_many(to_create)
+        
+        recipients = {n.user_id for n in notifications} | {m.recipient_id for m in messages}
+        if not recipients:
+            return
+        notification_counts = await NotificationService(db).get_unread_counts(recipients)
+        message_counts = await MessageService(db).get_unread_counts(recipients)
+    
+    for notification in notifications:
+        await send_notification(
+            notification.user_id,
+            NotificationResponse.model_validate(notification).model_dump(mode="json"),
+        )
+    for event in messages:
+        await send_message_notification(event.recipient_id, event.message)
+    for user_id in recipients:
+        await send_unread_count(
+            user_id,
+            notifications=notification_counts.get(user_id, 0),
+            messages=message_counts.get(user_id, 0),
+        )
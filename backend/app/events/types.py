@@ -0,0 +1,39 @@
+"""
+Domain events emitted by the API after a change is committed.
+"""
+from dataclasses import dataclass
+from typing import Optional
+
+
+@dataclass(frozen=True)
+class CommentCreated:
+    """A comment (or reply, if parent_id is set) was posted."""
+    comment_id: int
+    post_id: int
+    actor_id: int
+    parent_id: Optional[int] = None
+
+
+@dataclass(frozen=True)
+class Liked:
+    """A post or comment was liked."""
+    target_type: str
+    target_id: int
+    actor_id: int
+
+
+@dataclass(frozen=True)
+class PostFavorited:
+    """A post was added to someone's favorites."""
+    post_id: int
+    actor_id: int
+
+
+@dataclass(frozen=True)
+class MessageSent:
+    """A private message was sent; ``message`` is the serialized MessageResponse."""
+    recipient_id: int
+    message: dict
+
+
+DomainEvent = CommentCreated | Liked | PostFavorited | MessageSent
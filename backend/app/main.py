@@ -1,17 +1,32 @@
 """
 FastAPI application entry point.
 """
-from contextlib import asynccontextmanager
+import asyncio
+from contextlib import asynccontextmanager, suppress
 from typing import AsyncGenerator
 
 from fastapi import FastAPI, Request, status
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, Response
 from fastapi.staticfiles import StaticFiles
+from redis.exceptions import RedisError
+from sqlalchemy.exc import SQLAlchemyError
 
 from app.core.config import settings
-from app.core.deps import close_redis
+from app.core.deps import close_redis, get_redis
 from app.core.logging import setup_logging, get_logger, RequestLoggingMiddleware
+from app.core.metrics import MetricsMiddleware, mark_worker_exited, render_metrics
+from app.core.profiling import profile_routes
+from app.core.security import PasswordHasherBusy, password_hasher
+from app.db.pagination import InvalidCursorError
+from app.db.routing import ReadYourWritesMiddleware
+from app.events import dispatcher
+from app.events.notifications import handle_notification_events
+from app.search import setup_search
+from app.services.unread_counter import run_unread_reconciler
+from app.services.view_counter import ViewCounter, run_view_flusher
+from app.websocket.broker import RedisBroker
+from app.websocket.manager import manager
 
 
 # Initialize logging before anything else
@@ -29,12 +44,48 @@ async def lifespan(app: FastAPI) -> AsyncGenerator:
     logger.info(f"Starting {settings.PROJECT_NAME}...")
     logger.info(f"API docs available at /docs")
     logger.info(f"Debug mode: {settings.DEBUG}")
+    await setup_search()
+    redis = await get_redis()
+    view_flusher = asyncio.create_task(run_view_flusher(redis))
+    unread_reconciler = asyncio.create_task(run_unread_reconciler())
+    if settings.WS_BROKER == "redis":
+        try:
+            await manager.start(RedisBroker(redis))
+        except RedisError as e:
+            logger.warning(f"Redis unavailable, WebSocket fan-out is local only: {e}")
+            await manager.start()
+    else:
+        await manager.start()
+    dispatcher.subscribe(handle_notification_events)
+    await dispatcher.start()
     
     yield
     
     # Shutdown
     logger.info(f"Shutting down {settings.PROJECT_NAME}...")
+    await dispatcher.stop()
+    await manager.close()
+    for task in (view_flusher, unread_reconciler):
+        task.cancel()
+        with suppress(asyncio.CancelledError):
+            await task
+    view_counter = ViewCounter(redis)
+    try:
+        await view_counter.flush()
+    except RedisError as e:
+        logger.warning(f"Final view count flush skipped: {e}")
+    except SQLAlchemyError as e:
+        # The deltas stay in Redis; the next start's flusher retries them
+        try:
+            unflushed = await view_counter.pending_views()
+        except RedisError:
+            unflushed = "unknown number of"
+        logger.error(
+            f"Final view count flush failed, {unflushed} views will be flushed on the next start: {e}"
+        )
     await close_redis()
+    password_hasher.shutdown()
+    mark_worker_exited()
 
 
 # Create FastAPI application
@@ -48,6 +99,12 @@ app = FastAPI(
     lifespan=lifespan,
 )
 
+# Keep clients that just wrote on the primary database for their reads
+app.add_middleware(ReadYourWritesMiddleware)
+
+# Record request metrics (inside request logging, which starts the profile)
+app.add_middleware(MetricsMiddleware)
+
 # Add request logging middleware (must be added before CORS)
 app.add_middleware(RequestLoggingMiddleware)
 
@@ -68,6 +125,25 @@ app.mount(
 )
 
 
+@app.exception_handler(InvalidCursorError)
+async def invalid_cursor_handler(request: Request, exc: InvalidCursorError):
+    """Reject malformed pagination cursors as a client error."""
+    return JSONResponse(
+        status_code=status.HTTP_400_BAD_REQUEST,
+        content={"detail": str(exc)},
+    )
+
+
+@app.exception_handler(PasswordHasherBusy)
+async def password_hasher_busy_handler(request: Request, exc: PasswordHasherBusy):
+    """Shed password checks the hashing pool cannot take on right now."""
+    return JSONResponse(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        content={"detail": "Server busy, please retry"},
+        headers={"Retry-After": "1"},
+    )
+
+
 # Global exception handler
 @app.exception_handler(Exception)
 async def global_exception_handler(request: Request, exc: Exception):
@@ -99,6 +175,14 @@ async def health_check():
     return {"status": "healthy", "service": settings.PROJECT_NAME}
 
 
+# Prometheus metrics (not proxied by nginx; scrape the backend directly)
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    """Prometheus metrics endpoint."""
+    content, media_type = render_metrics()
+    return Response(content=content, media_type=media_type)
+
+
 # Root endpoint
 @app.get("/", tags=["Root"])
 async def root():
@@ -118,3 +202,6 @@ app.include_router(api_router, prefix=settings.API_V1_STR)
 # WebSocket routes
 from app.websocket.handlers import websocket_endpoint
 app.websocket("/ws/notifications")(websocket_endpoint)
+
+# Time dependencies, handler and serialization of every route
+profile_routes(app)
@@ -6,8 +6,9 @@ from app.models.post import Post
 from app.models.draft import Draft
 from app.models.comment import Comment
 from app.models.interaction import Like, Favorite
-from app.models.message import Conversation, Message
+from app.models.message import Conversation, ConversationParticipant, Message
 from app.models.notification import Notification
+from app.models.search import SearchDocument
 
 __all__ = [
     "User",
@@ -20,6 +21,8 @@ __all__ = [
     "Like",
     "Favorite",
     "Conversation",
+    "ConversationParticipant",
     "Message",
     "Notification",
+    "SearchDocument",
 ]
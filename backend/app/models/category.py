@@ -59,6 +59,14 @@ class Category(Base):
         nullable=True,
     )
     
+    # Published posts (denormalized, kept current by PostService)
+    post_count: Mapped[int] = mapped_column(
+        Integer,
+        default=0,
+        server_default="0",
+        nullable=False,
+    )
+    
     # Timestamps
     created_at: Mapped[datetime] = mapped_column(
         default=func.now(),
@@ -68,13 +76,6 @@ class Category(Base):
     # Relationships
     posts: Mapped[List["Post"]] = relationship(
         back_populates="category",
-        lazy="selectin",
+        lazy="raise",
+        passive_deletes=True,
     )
-    
-    @property
-    def post_count(self) -> int:
-        """Get the number of posts in this category."""
-        return len(self.posts) if self.posts else 0
-
-
-
@@ -4,7 +4,8 @@ Comment model for nested comments.
 from datetime import datetime
 from typing import TYPE_CHECKING, Optional
 
-from sqlalchemy import ForeignKey, String, JSON, Text, func
+from sqlalchemy import ColumnElement, ForeignKey, Index, String, JSON, Text, func
+from sqlalchemy.dialects import mysql
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.db.base import Base
@@ -13,6 +14,26 @@ if TYPE_CHECKING:
     from app.models.user import User
     from app.models.post import Post
 
+# Materialized path: one fixed-width base-36 segment per level, the
+# comment's own id last. Fixed width makes string order equal tree order
+# (parents first, siblings by id) and a subtree one prefix range. Lowercase
+# base 36 sorts the same under case-insensitive collations.
+PATH_ALPHABET = "0123456789abcdefghijklmnopqrstuvwxyz"
+PATH_SEGMENT_WIDTH = 6  # ids up to 36**6 - 1 (about 2.1 billion)
+PATH_MAX_LENGTH = 600
+MAX_COMMENT_DEPTH = PATH_MAX_LENGTH // PATH_SEGMENT_WIDTH - 1  # root is depth 0
+
+
+def path_segment(comment_id: int) -> str:
+    """Encode a comment id as one fixed-width path segment."""
+    if not 0 < comment_id < len(PATH_ALPHABET) ** PATH_SEGMENT_WIDTH:
+        raise ValueError(f"Comment id {comment_id} does not fit a path segment")
+    digits = []
+    while comment_id:
+        comment_id, digit = divmod(comment_id, len(PATH_ALPHABET))
+        digits.append(PATH_ALPHABET[digit])
+    return "".join(reversed(digits)).rjust(PATH_SEGMENT_WIDTH, "0")
+
 
 class Comment(Base):
     """
@@ -20,7 +41,12 @@ class Comment(Base):
     Uses path-based hierarchy for efficient tree queries.
     """
     __tablename__ = "comments"
-
+    
+    __table_args__ = (
+        # Flat thread order of a post
+        Index('ix_comments_post_path', 'post_id', 'path'),
+    )
+    
     id: Mapped[int] = mapped_column(primary_key=True, index=True)
     
     # Content - supports rich text JSON from TipTap
@@ -49,10 +75,13 @@ class Comment(Base):
     # Hierarchy tracking
     depth: Mapped[int] = mapped_column(default=0)
     path: Mapped[str] = mapped_column(
-        String(255),
+        String(PATH_MAX_LENGTH).with_variant(
+            mysql.VARCHAR(PATH_MAX_LENGTH, charset="ascii", collation="ascii_bin"),
+            "mysql",
+        ),
         default="",
         index=True,
-        comment="Materialized path like '1.3.7' for tree queries",
+        comment="Materialized path of fixed-width base-36 ids, see path_segment",
     )
     
     # Stats
@@ -82,19 +111,27 @@ class Comment(Base):
     post: Mapped["Post"] = relationship(
         "Post",
         back_populates="comments",
+        lazy="raise",
     )
     parent: Mapped[Optional["Comment"]] = relationship(
         "Comment",
         remote_side=[id],
         back_populates="replies",
+        lazy="raise",
     )
     replies: Mapped[list["Comment"]] = relationship(
         "Comment",
         back_populates="parent",
-        lazy="selectin",
+        lazy="raise",
+        passive_deletes=True,
     )
     
     def __repr__(self) -> str:
         return f"<Comment(id={self.id}, post_id={self.post_id}, depth={self.depth})>"
 
 
+def descendants_of(path: str) -> ColumnElement[bool]:
+    """Condition matching every comment below ``path``, as one index range scan."""
+    return Comment.path.like(f"{path}_%")
+
+
@@ -79,7 +79,7 @@ class Draft(Base):
     )
     
     # Relationships
-    user: Mapped["User"] = relationship(lazy="selectin")
+    user: Mapped["User"] = relationship(lazy="raise")
 
 
 
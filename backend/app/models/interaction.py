@@ -57,7 +57,7 @@ class Like(Base):
     user: Mapped["User"] = relationship(
         "User",
         back_populates="likes",
-        lazy="joined",
+        lazy="raise",
     )
     
     def __repr__(self) -> str:
@@ -106,12 +106,12 @@ class Favorite(Base):
     user: Mapped["User"] = relationship(
         "User",
         back_populates="favorites",
-        lazy="joined",
+        lazy="raise",
     )
     post: Mapped["Post"] = relationship(
         "Post",
         back_populates="favorites",
-        lazy="joined",
+        lazy="raise",
     )
     
     def __repr__(self) -> str:
@@ -0,0 +1,52 @@
+"""
+Named eager-loading profiles.
+
+Relationships on the models default to lazy="raise", so a query has to
+declare which related rows it needs. Each profile below matches one response
+shape; pass it to ``select(...).options(*PROFILE)``. Public post lists do
+not load entities at all, see PostService.get_list.
+"""
+from sqlalchemy.orm import joinedload, load_only, selectinload
+
+from app.models.category import Category
+from app.models.interaction import Favorite
+from app.models.post import Post
+from app.models.user import User
+
+
+# Full post page (PostResponse).
+POST_DETAIL = (
+    selectinload(Post.user),
+    selectinload(Post.category),
+    selectinload(Post.tags),
+)
+
+# Row in the admin post table: counters plus author and category names.
+POST_ADMIN_ROW = (
+    load_only(
+        Post.id,
+        Post.title,
+        Post.slug,
+        Post.status,
+        Post.view_count,
+        Post.like_count,
+        Post.comment_count,
+        Post.created_at,
+        raiseload=True,
+    ),
+    joinedload(Post.user).load_only(User.id, User.username, User.nickname),
+    joinedload(Post.category).load_only(Category.id, Category.name),
+)
+
+# Favorite with the post summary shown in the favorites list (FavoriteResponse).
+FAVORITE_LIST_ROW = (
+    joinedload(Favorite.post).load_only(
+        Post.id,
+        Post.title,
+        Post.slug,
+        Post.excerpt,
+        Post.auto_excerpt,
+        Post.cover_image,
+        raiseload=True,
+    ),
+)
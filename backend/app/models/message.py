@@ -4,7 +4,7 @@ Message model for private messaging.
 from datetime import datetime
 from typing import TYPE_CHECKING, Optional
 
-from sqlalchemy import ForeignKey, String, Text, Boolean, func, Index
+from sqlalchemy import ForeignKey, String, Text, Boolean, func, Index, UniqueConstraint
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.db.base import Base
@@ -22,7 +22,7 @@ class Conversation(Base):
     __table_args__ = (
         Index('ix_conversation_users', 'user1_id', 'user2_id'),
     )
-
+    
     id: Mapped[int] = mapped_column(primary_key=True, index=True)
     
     # Participants (user1_id < user2_id to ensure uniqueness)
@@ -65,9 +65,16 @@ class Conversation(Base):
     messages: Mapped[list["Message"]] = relationship(
         "Message",
         back_populates="conversation",
-        lazy="selectin",
+        lazy="raise",
+        passive_deletes=True,
         order_by="Message.created_at.desc()",
     )
+    participants: Mapped[list["ConversationParticipant"]] = relationship(
+        "ConversationParticipant",
+        back_populates="conversation",
+        lazy="raise",
+        passive_deletes=True,
+    )
     
     def get_other_user(self, user_id: int) -> "User":
         """Get the other participant in the conversation."""
@@ -77,12 +84,75 @@ class Conversation(Base):
         return f"<Conversation(id={self.id}, users={self.user1_id},{self.user2_id})>"
 
 
+class ConversationParticipant(Base):
+    """
+    One participant's view of a conversation (their inbox entry).
+    
+    Each conversation has one row per participant, so a user's inbox is a
+    range scan of ``(user_id, last_message_at)`` that already carries the
+    other participant and the unread count.
+    """
+    __tablename__ = "conversation_participants"
+    
+    __table_args__ = (
+        UniqueConstraint('conversation_id', 'user_id', name='uq_conversation_participant'),
+        Index('ix_conversation_participant_inbox', 'user_id', 'last_message_at'),
+    )
+    
+    id: Mapped[int] = mapped_column(primary_key=True)
+    
+    conversation_id: Mapped[int] = mapped_column(
+        ForeignKey("conversations.id", ondelete="CASCADE"),
+        nullable=False,
+    )
+    
+    # Owner of this inbox entry and the person they are talking to
+    user_id: Mapped[int] = mapped_column(
+        ForeignKey("users.id", ondelete="CASCADE"),
+        nullable=False,
+    )
+    other_user_id: Mapped[int] = mapped_column(
+        ForeignKey("users.id", ondelete="CASCADE"),
+        nullable=False,
+    )
+    
+    # Read state
+    unread_count: Mapped[int] = mapped_column(
+        default=0,
+        nullable=False,
+    )
+    last_read_message_id: Mapped[Optional[int]] = mapped_column(
+        nullable=True,
+    )
+    
+    # Copy of Conversation.last_message_at for sorting the inbox
+    last_message_at: Mapped[datetime] = mapped_column(
+        default=func.now(),
+        nullable=False,
+    )
+    
+    # Relationships
+    conversation: Mapped["Conversation"] = relationship(
+        "Conversation",
+        back_populates="participants",
+        lazy="raise",
+    )
+    other_user: Mapped["User"] = relationship(
+        "User",
+        foreign_keys=[other_user_id],
+        lazy="joined",
+    )
+    
+    def __repr__(self) -> str:
+        return f"<ConversationParticipant(conversation={self.conversation_id}, user={self.user_id})>"
+
+
 class Message(Base):
     """
     Message model for private messages.
     """
     __tablename__ = "messages"
-
+    
     id: Mapped[int] = mapped_column(primary_key=True, index=True)
     
     # Conversation
@@ -125,6 +195,7 @@ class Message(Base):
     conversation: Mapped["Conversation"] = relationship(
         "Conversation",
         back_populates="messages",
+        lazy="raise",
     )
     sender: Mapped["User"] = relationship(
         "User",
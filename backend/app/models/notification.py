@@ -22,6 +22,7 @@ class Notification(Base):
     - reply: Someone replied to your comment
     - like_post: Someone liked your post
     - like_comment: Someone liked your comment
+    - favorite: Someone favorited your post
     - follow: Someone followed you
     - mention: Someone mentioned you
     - system: System notification
@@ -97,6 +98,7 @@ class Notification(Base):
         "User",
         foreign_keys=[user_id],
         back_populates="notifications",
+        lazy="raise",
     )
     actor: Mapped[Optional["User"]] = relationship(
         "User",
@@ -1,6 +1,7 @@
 """
 Post model definition.
 """
+import math
 from datetime import datetime
 from typing import TYPE_CHECKING, List, Optional
 
@@ -17,6 +18,14 @@ if TYPE_CHECKING:
     from app.models.comment import Comment
     from app.models.interaction import Favorite
 
+# Reading speed for reading_time; CJK characters count as one word each
+WORDS_PER_MINUTE = 250
+
+
+def reading_time(word_count: int) -> int:
+    """Minutes needed to read ``word_count`` words, at least one."""
+    return max(1, math.ceil(word_count / WORDS_PER_MINUTE))
+
 
 class Post(Base):
     """Post model for articles/blog posts."""
@@ -63,6 +72,34 @@ class Post(Base):
         nullable=True,
     )
     
+    # Derived from content on save (see app.services.post_text); NULL until
+    # an older post has been backfilled
+    content_text: Mapped[str | None] = mapped_column(
+        Text,
+        nullable=True,
+    )
+    content_text_en: Mapped[str | None] = mapped_column(
+        Text,
+        nullable=True,
+    )
+    word_count: Mapped[int] = mapped_column(
+        Integer,
+        default=0,
+        server_default="0",
+        nullable=False,
+    )
+    char_count: Mapped[int] = mapped_column(
+        Integer,
+        default=0,
+        server_default="0",
+        nullable=False,
+    )
+    # Shown when the author wrote no excerpt
+    auto_excerpt: Mapped[str | None] = mapped_column(
+        String(500),
+        nullable=True,
+    )
+    
     # Cover image URL
     cover_image: Mapped[str | None] = mapped_column(
         String(255),
@@ -134,28 +171,33 @@ class Post(Base):
     )
     
     # Relationships
+    # All relationships default to lazy="raise": queries must pick a loading
+    # profile from app.models.loading instead of relying on implicit loads.
     user: Mapped["User"] = relationship(
         back_populates="posts",
-        lazy="selectin",
+        lazy="raise",
     )
     category: Mapped[Optional["Category"]] = relationship(
         back_populates="posts",
-        lazy="selectin",
+        lazy="raise",
     )
     tags: Mapped[List["Tag"]] = relationship(
         secondary=post_tags,
         back_populates="posts",
-        lazy="selectin",
+        lazy="raise",
+        passive_deletes=True,
     )
     comments: Mapped[List["Comment"]] = relationship(
         back_populates="post",
-        lazy="selectin",
+        lazy="raise",
         cascade="all, delete-orphan",
+        passive_deletes=True,
     )
     favorites: Mapped[List["Favorite"]] = relationship(
         back_populates="post",
-        lazy="selectin",
+        lazy="raise",
         cascade="all, delete-orphan",
+        passive_deletes=True,
     )
     
     @property
@@ -167,5 +209,15 @@ class Post(Base):
     def is_draft(self) -> bool:
         """Check if post is a draft."""
         return self.status == "draft"
+    
+    @property
+    def summary(self) -> str | None:
+        """Author's excerpt, or the one generated from the content."""
+        return self.excerpt or self.auto_excerpt
+    
+    @property
+    def reading_time(self) -> int:
+        """Estimated reading time in minutes."""
+        return reading_time(self.word_count or 0)
 
 
@@ -0,0 +1,70 @@
+"""
+Search document model backing full-text search.
+"""
+from datetime import datetime
+
+from sqlalchemy import String, Text, Index, UniqueConstraint, func
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.db.base import Base
+
+
+class SearchDocument(Base):
+    """
+    Plain-text copy of a searchable row (a post or a comment).
+    
+    Posts and comments store TipTap JSON, which cannot be indexed; their
+    extracted text is kept here so a single full-text index covers both.
+    On MySQL ``title`` and ``body`` carry a FULLTEXT index with the ngram
+    parser so CJK text is tokenized; other databases use the search
+    backend's own structures (see app.search).
+    
+    Types:
+    - post: title holds title and title_en, body the excerpt and content
+    - comment: body holds the comment text
+    """
+    __tablename__ = "search_documents"
+    
+    __table_args__ = (
+        UniqueConstraint('doc_type', 'doc_id', name='uq_search_document'),
+        Index(
+            'ix_search_documents_fulltext',
+            'title',
+            'body',
+            mysql_prefix='FULLTEXT',
+            mysql_with_parser='ngram',
+        ).ddl_if(dialect='mysql'),
+    )
+    
+    id: Mapped[int] = mapped_column(primary_key=True)
+    
+    # Indexed row
+    doc_type: Mapped[str] = mapped_column(
+        String(20),
+        nullable=False,
+    )
+    doc_id: Mapped[int] = mapped_column(
+        nullable=False,
+    )
+    
+    # Plain text
+    title: Mapped[str] = mapped_column(
+        Text,
+        default="",
+        nullable=False,
+    )
+    body: Mapped[str] = mapped_column(
+        Text,
+        default="",
+        nullable=False,
+    )
+    
+    # Timestamps
+    updated_at: Mapped[datetime] = mapped_column(
+        default=func.now(),
+        onupdate=func.now(),
+        nullable=False,
+    )
+    
+    def __repr__(self) -> str:
+        return f"<SearchDocument({self.doc_type}={self.doc_id})>"
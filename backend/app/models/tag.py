@@ -49,6 +49,15 @@ class Tag(Base):
         nullable=False,
     )
     
+    # Published posts (denormalized, kept current by PostService)
+    post_count: Mapped[int] = mapped_column(
+        Integer,
+        default=0,
+        server_default="0",
+        nullable=False,
+        index=True,
+    )
+    
     # Timestamps
     created_at: Mapped[datetime] = mapped_column(
         default=func.now(),
@@ -59,13 +68,6 @@ class Tag(Base):
     posts: Mapped[List["Post"]] = relationship(
         secondary=post_tags,
         back_populates="tags",
-        lazy="selectin",
+        lazy="raise",
+        passive_deletes=True,
     )
-    
-    @property
-    def post_count(self) -> int:
-        """Get the number of posts with this tag."""
-        return len(self.posts) if self.posts else 0
-
-
-
@@ -89,28 +89,33 @@ class User(Base):
         nullable=False,
     )
     
-    # Relationships
+    # Relationships (lazy="raise": load explicitly when needed)
     posts: Mapped[list["Post"]] = relationship(
         back_populates="user",
-        lazy="selectin",
+        lazy="raise",
+        passive_deletes=True,
     )
     comments: Mapped[list["Comment"]] = relationship(
         back_populates="user",
-        lazy="selectin",
+        lazy="raise",
+        passive_deletes=True,
     )
     likes: Mapped[list["Like"]] = relationship(
         back_populates="user",
-        lazy="selectin",
+        lazy="raise",
+        passive_deletes=True,
     )
     favorites: Mapped[list["Favorite"]] = relationship(
         back_populates="user",
-        lazy="selectin",
+        lazy="raise",
+        passive_deletes=True,
     )
     notifications: Mapped[list["Notification"]] = relationship(
         "Notification",
         foreign_keys="Notification.user_id",
         back_populates="user",
-        lazy="selectin",
+        lazy="raise",
+        passive_deletes=True,
     )
     
     @property
@@ -6,6 +6,8 @@ from typing import Optional, List, ForwardRef
 
 from pydantic import BaseModel, Field
 
+from app.schemas.interaction import ViewerState
+
 
 class CommentAuthor(BaseModel):
     """Schema for comment author info."""
@@ -50,6 +52,8 @@ class CommentResponse(BaseModel):
     updated_at: datetime
     
     user: CommentAuthor
+    # Only set with with_viewer_state
+    viewer_state: Optional[ViewerState] = None
     
     model_config = {"from_attributes": True}
 
@@ -76,6 +80,10 @@ class CommentWithReplies(BaseModel):
     
     user: CommentAuthor
     replies: List['CommentWithReplies'] = []
+    # Set on a root whose thread has more replies than were nested
+    replies_cursor: Optional[str] = None
+    # Only set with with_viewer_state
+    viewer_state: Optional[ViewerState] = None
     
     model_config = {"from_attributes": True}
 
@@ -85,17 +93,25 @@ CommentWithReplies.model_rebuild()
 
 
 class CommentTreeResponse(BaseModel):
-    """Schema for comment tree response."""
+    """Schema for one page of the comment tree."""
     comments: List[CommentWithReplies]
-    total: int
+    total: int  # comments on the post, replies included
+    page: int
+    size: int
+    root_total: Optional[int] = None  # root comments, when counted
+    pages: Optional[int] = None  # pages of root comments (root_total / size)
+    next_cursor: Optional[str] = None
+    prev_cursor: Optional[str] = None
 
 
 class CommentListResponse(BaseModel):
     """Schema for flat comment list with pagination."""
     items: List[CommentResponse]
-    total: int
+    total: Optional[int] = None
     page: int
     size: int
-    pages: int
+    pages: Optional[int] = None
+    next_cursor: Optional[str] = None
+    prev_cursor: Optional[str] = None
 
 
@@ -56,7 +56,8 @@ class FavoritePostInfo(BaseModel):
     id: int
     title: str
     slug: str
-    excerpt: Optional[str] = None
+    # Post.summary: the author's excerpt or the generated one
+    excerpt: Optional[str] = Field(None, validation_alias="summary")
     cover_image: Optional[str] = None
     
     model_config = {"from_attributes": True}
@@ -89,3 +90,36 @@ class FavoriteListResponse(BaseModel):
     pages: int
 
 
+# ============ Batch Status Schemas ============
+
+class InteractionTarget(BaseModel):
+    """A post or comment to report interaction status for."""
+    target_type: Literal["post", "comment"]
+    target_id: int
+
+
+class InteractionStatusRequest(BaseModel):
+    """Schema for batch interaction status request."""
+    targets: list[InteractionTarget] = Field(..., max_length=200)
+
+
+class InteractionStatus(BaseModel):
+    """Like count and the viewer's like/favorite of one target."""
+    target_type: str
+    target_id: int
+    like_count: int
+    liked: bool = False
+    like_id: Optional[int] = None
+    favorited: bool = False  # posts only
+    favorite_id: Optional[int] = None
+
+
+class InteractionStatusResponse(BaseModel):
+    """Schema for batch interaction status (targets that do not exist are left out)."""
+    items: list[InteractionStatus]
+
+
+class ViewerState(BaseModel):
+    """The viewer's like/favorite of an item, embedded in lists."""
+    liked: bool = False
+    favorited: bool = False
@@ -61,20 +61,24 @@ class ConversationDetailResponse(BaseModel):
 class ConversationListResponse(BaseModel):
     """Schema for paginated conversation list."""
     items: List[ConversationResponse]
-    total: int
+    total: Optional[int] = None
     page: int
     size: int
-    pages: int
+    pages: Optional[int] = None
+    next_cursor: Optional[str] = None
+    prev_cursor: Optional[str] = None
 
 
 class MessageListResponse(BaseModel):
     """Schema for paginated message list."""
     items: List[MessageResponse]
-    total: int
+    total: Optional[int] = None
     page: int
     size: int
-    pages: int
+    pages: Optional[int] = None
     has_more: bool = False
+    next_cursor: Optional[str] = None
+    prev_cursor: Optional[str] = None
 
 
 class UnreadCountResponse(BaseModel):
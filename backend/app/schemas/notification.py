@@ -49,10 +49,12 @@ class NotificationResponse(BaseModel):
 class NotificationListResponse(BaseModel):
     """Schema for paginated notification list."""
     items: List[NotificationResponse]
-    total: int
+    total: Optional[int] = None
     page: int
     size: int
-    pages: int
+    pages: Optional[int] = None
+    next_cursor: Optional[str] = None
+    prev_cursor: Optional[str] = None
     unread_count: int = 0
 
 
@@ -72,6 +74,7 @@ class NotificationSettings(BaseModel):
     reply: bool = True
     like_post: bool = True
     like_comment: bool = True
+    favorite: bool = True
     follow: bool = True
     mention: bool = True
     system: bool = True
@@ -7,6 +7,7 @@ from typing import Optional, Any
 from pydantic import BaseModel, Field
 
 from app.schemas.category import CategorySimple
+from app.schemas.interaction import ViewerState
 from app.schemas.tag import TagListResponse
 
 
@@ -65,6 +66,9 @@ class PostResponse(BaseModel):
     view_count: int
     like_count: int
     comment_count: int
+    word_count: int = 0
+    char_count: int = 0
+    reading_time: int = 1  # minutes
     created_at: datetime
     updated_at: datetime
     published_at: Optional[datetime] = None
@@ -76,19 +80,27 @@ class PostResponse(BaseModel):
     model_config = {"from_attributes": True}
 
 
+class SearchHighlight(BaseModel):
+    """Search terms marked with <mark> in otherwise HTML-escaped text."""
+    title: str
+    snippet: str
+
+
 class PostListResponse(BaseModel):
     """Schema for post list item."""
     id: int
     title: str
     title_en: Optional[str] = None
     slug: str
-    excerpt: Optional[str] = None
+    excerpt: Optional[str] = None  # falls back to one generated from the content
     cover_image: Optional[str] = None
     status: str
     is_featured: bool
     view_count: int
     like_count: int
     comment_count: int
+    word_count: int = 0
+    reading_time: int = 1  # minutes
     created_at: datetime
     published_at: Optional[datetime] = None
     
@@ -96,16 +108,23 @@ class PostListResponse(BaseModel):
     category: Optional[CategorySimple] = None
     tags: list[TagListResponse] = []
     
+    # Only set on search results
+    highlight: Optional[SearchHighlight] = None
+    # Only set with with_viewer_state
+    viewer_state: Optional[ViewerState] = None
+    
     model_config = {"from_attributes": True}
 
 
 class PostPaginatedResponse(BaseModel):
     """Schema for paginated post list."""
     items: list[PostListResponse]
-    total: int
+    total: Optional[int] = None
     page: int
     size: int
-    pages: int
+    pages: Optional[int] = None
+    next_cursor: Optional[str] = None
+    prev_cursor: Optional[str] = None
 
 
 class PostSearchParams(BaseModel):
@@ -120,7 +139,11 @@ class PostSearchParams(BaseModel):
     is_featured: Optional[bool] = None
     page: int = Field(default=1, ge=1)
     size: int = Field(default=10, ge=1, le=100)
-    sort_by: str = Field(default="created_at", pattern=r"^(created_at|updated_at|view_count|like_count)$")
+    after: Optional[str] = None
+    before: Optional[str] = None
+    with_total: bool = True
+    # Defaults to relevance when q is given, created_at otherwise
+    sort_by: Optional[str] = Field(None, pattern=r"^(created_at|updated_at|view_count|like_count|relevance)$")
     sort_order: str = Field(default="desc", pattern=r"^(asc|desc)$")
 
 
@@ -0,0 +1,38 @@
+# Full-text search module
+from app.db.session import engine
+from app.search.backends import (
+    COMMENT,
+    POST,
+    USER,
+    LikeSearchBackend,
+    MySQLFulltextBackend,
+    SearchBackend,
+    SQLiteFTS5Backend,
+    create_search_backend,
+)
+from app.search.text import highlight, query_terms
+
+# Backend for the configured database
+search_backend = create_search_backend(engine.dialect.name)
+
+
+async def setup_search() -> None:
+    """Create the search backend's auxiliary structures if missing."""
+    async with engine.begin() as conn:
+        await search_backend.setup(conn)
+
+
+__all__ = [
+    "COMMENT",
+    "POST",
+    "USER",
+    "LikeSearchBackend",
+    "MySQLFulltextBackend",
+    "SearchBackend",
+    "SQLiteFTS5Backend",
+    "create_search_backend",
+    "highlight",
+    "query_terms",
+    "search_backend",
+    "setup_search",
+]
@@ -0,0 +1,217 @@
+"""
+Pluggable full-text search backends.
+
+Every backend stores documents in the ``search_documents`` table and exposes
+matches as a subquery of ``(doc_id, score)`` that callers join to their own
+rows, so filters, ordering and pagination stay in one SQL statement.
+
+- MySQLFulltextBackend: FULLTEXT index with the ngram parser, ranked by
+  MATCH ... AGAINST relevance.
+- SQLiteFTS5Backend: a trigram FTS5 table next to ``search_documents``,
+  ranked by bm25; used for development and tests.
+- LikeSearchBackend: substring scan, for any other database.
+"""
+from abc import ABC, abstractmethod
+from typing import Iterable, Optional
+
+from sqlalchemy import (
+    Subquery,
+    bindparam,
+    case,
+    column,
+    delete,
+    func,
+    literal,
+    literal_column,
+    or_,
+    select,
+    table,
+    text,
+)
+from sqlalchemy.dialects.mysql import match
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncSession
+
+from app.core.config import settings
+from app.models.search import SearchDocument
+from app.search.text import query_terms
+
+# Document types
+POST = "post"
+COMMENT = "comment"
+USER = "user"
+
+
+class SearchBackend(ABC):
+    """Stores search documents and matches queries against them."""
+    
+    name = "base"
+    
+    async def setup(self, conn: AsyncConnection) -> None:
+        """Create any structures the backend needs besides search_documents."""
+    
+    async def index(
+        self,
+        db: AsyncSession,
+        doc_type: str,
+        doc_id: int,
+        title: str,
+        body: str,
+    ) -> None:
+        """Insert or replace one document (flushed, not committed)."""
+        result = await db.execute(
+            select(SearchDocument).where(
+                SearchDocument.doc_type == doc_type,
+                SearchDocument.doc_id == doc_id,
+            )
+        )
+        document = result.scalar_one_or_none()
+        if document is None:
+            document = SearchDocument(doc_type=doc_type, doc_id=doc_id)
+            db.add(document)
+        document.title = title or ""
+        document.body = body or ""
+        await db.flush()
+        await self._after_index(db, document)
+    
+    async def remove(self, db: AsyncSession, doc_type: str, doc_ids: Iterable[int]) -> None:
+        """Delete documents (flushed, not committed)."""
+        doc_ids = list(doc_ids)
+        if not doc_ids:
+            return
+        await self._before_remove(db, doc_type, doc_ids)
+        await db.execute(
+            delete(SearchDocument)
+            .where(
+                SearchDocument.doc_type == doc_type,
+                SearchDocument.doc_id.in_(doc_ids),
+            )
+            .execution_options(synchronize_session=False)
+        )
+    
+    @abstractmethod
+    def matches(self, doc_type: str, query: str) -> Optional[Subquery]:
+        """
+        Documents of ``doc_type`` matching ``query``.
+        
+        Returns:
+            Subquery with ``doc_id`` and ``score`` (higher is more relevant),
+            or None if the query has no searchable terms
+        """
+    
+    async def _after_index(self, db: AsyncSession, document: SearchDocument) -> None:
+        pass
+    
+    async def _before_remove(self, db: AsyncSession, doc_type: str, doc_ids: list[int]) -> None:
+        pass
+
+
+class MySQLFulltextBackend(SearchBackend):
+    """MySQL FULLTEXT (ngram parser) search."""
+    
+    name = "mysql"
+    
+    def matches(self, doc_type: str, query: str) -> Optional[Subquery]:
+        terms = query_terms(query)
+        if not terms:
+            return None
+        relevance = match(
+            SearchDocument.title,
+            SearchDocument.body,
+            against=" ".join(terms),
+        ).in_natural_language_mode()
+        return (
+            select(SearchDocument.doc_id, relevance.label("score"))
+            .where(SearchDocument.doc_type == doc_type, relevance)
+            .subquery("search_matches")
+        )
+
+
+class SQLiteFTS5Backend(SearchBackend):
+    """SQLite FTS5 (trigram tokenizer) search, keyed by search_documents.id."""
+    
+    name = "sqlite"
+    fts_table = "search_documents_fts"
+    
+    async def setup(self, conn: AsyncConnection) -> None:
+        await conn.execute(text(
+            f"CREATE VIRTUAL TABLE IF NOT EXISTS {self.fts_table} "
+            "USING fts5(title, body, tokenize='trigram')"
+        ))
+    
+    async def _after_index(self, db: AsyncSession, document: SearchDocument) -> None:
+        await db.execute(
+            text(f"DELETE FROM {self.fts_table} WHERE rowid = :id"), {"id": document.id}
+        )
+        await db.execute(
+            text(f"INSERT INTO {self.fts_table} (rowid, title, body) VALUES (:id, :title, :body)"),
+            {"id": document.id, "title": document.title, "body": document.body},
+        )
+    
+    async def _before_remove(self, db: AsyncSession, doc_type: str, doc_ids: list[int]) -> None:
+        await db.execute(
+            text(
+                f"DELETE FROM {self.fts_table} WHERE rowid IN ("
+                "SELECT id FROM search_documents WHERE doc_type = :doc_type AND doc_id IN :doc_ids)"
+            ).bindparams(bindparam("doc_ids", expanding=True)),
+            {"doc_type": doc_type, "doc_ids": doc_ids},
+        )
+    
+    def matches(self, doc_type: str, query: str) -> Optional[Subquery]:
+        # The trigram tokenizer cannot match terms shorter than three characters
+        terms = [t for t in query_terms(query) if len(t) >= 3]
+        if not terms:
+            return None
+        fts_query = " OR ".join('"' + t.replace('"', '""') + '"' for t in terms)
+        fts = table(self.fts_table, column("rowid"))
+        fts_ref = literal_column(self.fts_table)
+        return (
+            select(
+                SearchDocument.doc_id,
+                (-func.bm25(fts_ref)).label("score"),
+            )
+            .select_from(fts)
+            .join(SearchDocument, SearchDocument.id == fts.c.rowid)
+            .where(
+                fts_ref.op("MATCH")(fts_query),
+                SearchDocument.doc_type == doc_type,
+            )
+            .subquery("search_matches")
+        )
+
+
+class LikeSearchBackend(SearchBackend):
+    """Substring search without an index, ranked by matching terms."""
+    
+    name = "like"
+    
+    def matches(self, doc_type: str, query: str) -> Optional[Subquery]:
+        terms = query_terms(query)
+        if not terms:
+            return None
+        hits = [
+            or_(
+                SearchDocument.title.ilike(f"%{term}%"),
+                SearchDocument.body.ilike(f"%{term}%"),
+            )
+            for term in terms
+        ]
+        score = sum((case((hit, 1), else_=0) for hit in hits), literal(0))
+        return (
+            select(SearchDocument.doc_id, score.label("score"))
+            .where(SearchDocument.doc_type == doc_type, or_(*hits))
+            .subquery("search_matches")
+        )
+
+
+_BACKENDS = {
+    backend.name: backend
+    for backend in (MySQLFulltextBackend, SQLiteFTS5Backend, LikeSearchBackend)
+}
+
+
+def create_search_backend(dialect_name: str) -> SearchBackend:
+    """Pick the backend from SEARCH_BACKEND, or from the database dialect when "auto"."""
+    name = settings.SEARCH_BACKEND
+    if name == "auto":
+        name = dialect_name if dialect_name in _BACKENDS else "like"
+    return _BACKENDS[name]()
@@ -0,0 +1,122 @@
+"""
+Rebuild the search index from posts, comments and users.
+
+Indexes every post, every live comment and every user, and drops documents
+whose row no longer exists. Posts are indexed from their stored plain text,
+so posts created before it existed need ``python -m app.services.post_text``
+first.
+Safe to run at any time; run it once after migrating to search_documents:
+
+    python -m app.search.reindex
+"""
+import asyncio
+from typing import Dict
+
+from sqlalchemy import select
+
+from app.core.logging import get_logger, setup_logging
+from app.db.session import async_session_maker
+from app.models.comment import Comment
+from app.models.post import Post
+from app.models.search import SearchDocument
+from app.models.user import User
+from app.search import COMMENT, POST, USER, search_backend, setup_search
+from app.services.post_text import post_search_text
+from app.services.user_service import user_search_text
+
+logger = get_logger("search")
+
+
+async def reindex(batch_size: int = 500) -> Dict[str, int]:
+    """
+    Index all posts, comments and users in batches of ``batch_size`` rows.
+    
+    Returns:
+        Documents indexed and removed per type
+    """
+    await setup_search()
+    counts = {"posts": 0, "comments": 0, "users": 0, "removed": 0}
+    
+    async with async_session_maker() as db:
+        last_id = 0
+        while True:
+            result = await db.execute(
+                select(
+                    Post.id,
+                    Post.title,
+                    Post.title_en,
+                    Post.excerpt,
+                    Post.content_text,
+                    Post.content_text_en,
+                )
+                .where(Post.id > last_id)
+                .order_by(Post.id)
+                .limit(batch_size)
+            )
+            rows = result.all()
+            if not rows:
+                break
+            for row in rows:
+                await search_backend.index(db, POST, row.id, *post_search_text(row))
+            await db.commit()
+            counts["posts"] += len(rows)
+            last_id = rows[-1].id
+        
+        last_id = 0
+        while True:
+            result = await db.execute(
+                select(Comment.id, Comment.content_text)
+                .where(Comment.id > last_id, Comment.is_deleted == False)
+                .order_by(Comment.id)
+                .limit(batch_size)
+            )
+            rows = result.all()
+            if not rows:
+                break
+            for row in rows:
+                await search_backend.index(db, COMMENT, row.id, "", row.content_text or "")
+            await db.commit()
+            counts["comments"] += len(rows)
+            last_id = rows[-1].id
+        
+        last_id = 0
+        while True:
+            result = await db.execute(
+                select(User.id, User.username, User.nickname, User.email)
+                .where(User.id > last_id)
+                .order_by(User.id)
+                .limit(batch_size)
+            )
+            rows = result.all()
+            if not rows:
+                break
+            for row in rows:
+                await search_backend.index(db, USER, row.id, *user_search_text(row))
+            await db.commit()
+            counts["users"] += len(rows)
+            last_id = rows[-1].id
+        
+        # Documents of deleted posts, comments and users
+        live = {
+            POST: select(Post.id),
+            COMMENT: select(Comment.id).where(Comment.is_deleted == False),
+            USER: select(User.id),
+        }
+        for doc_type, live_ids in live.items():
+            result = await db.execute(
+                select(SearchDocument.doc_id).where(
+                    SearchDocument.doc_type == doc_type,
+                    SearchDocument.doc_id.not_in(live_ids),
+                )
+            )
+            stale = list(result.scalars().all())
+            await search_backend.remove(db, doc_type, stale)
+            counts["removed"] += len(stale)
+        await db.commit()
+    
+    return counts
+
+
+if __name__ == "__main__":
+    setup_logging()
+    logger.info(f"Search index rebuilt: {asyncio.run(reindex())}")
@@ -0,0 +1,51 @@
+"""
+Query parsing and result highlighting, shared by all search backends.
+"""
+import html
+import re
+from typing import List, Optional
+
+MAX_TERMS = 10
+
+
+def query_terms(query: str) -> List[str]:
+    """Split a search query into distinct whitespace-separated terms."""
+    terms = []
+    for term in query.split():
+        if term.lower() not in (t.lower() for t in terms):
+            terms.append(term)
+    return terms[:MAX_TERMS]
+
+
+def highlight(text: str, terms: List[str], max_length: Optional[int] = None) -> str:
+    """
+    HTML-escape ``text`` and wrap every occurrence of a term in ``<mark>``.
+    
+    With ``max_length`` the text is cut to a window around the first match,
+    with an ellipsis where it was cut.
+    """
+    if not text:
+        return ""
+    pattern = None
+    if terms:
+        # Longest first so a term containing another one wins
+        alternatives = sorted((re.escape(t) for t in terms), key=len, reverse=True)
+        pattern = re.compile("|".join(alternatives), re.IGNORECASE)
+    
+    if max_length and len(text) > max_length:
+        match = pattern.search(text) if pattern else None
+        start = max(0, match.start() - max_length // 4) if match else 0
+        end = min(len(text), start + max_length)
+        start = max(0, end - max_length)
+        text = ("…" if start > 0 else "") + text[start:end] + ("…" if end < len(text) else "")
+    
+    if pattern is None:
+        return html.escape(text)
+    parts = []
+    last = 0
+    for match in pattern.finditer(text):
+        parts.append(html.escape(text[last:match.start()]))
+        parts.append(f"<mark>{html.escape(match.group())}</mark>")
+        last = match.end()
+    parts.append(html.escape(text[last:]))
+    return "".join(parts)
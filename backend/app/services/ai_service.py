@@ -3,14 +3,17 @@ AI Service for DashScope API integration.
 Handles text-to-image generation and chat completion.
 """
 import os
+import time
 import uuid
+from contextlib import asynccontextmanager
 from datetime import datetime
-from typing import AsyncGenerator, Optional, List
+from typing import AsyncGenerator, AsyncIterator, Optional, List
 
 import aiofiles
 import httpx
 
 from app.core.config import settings
+from app.core.metrics import AI_UPSTREAM_SECONDS
 from app.schemas.ai import (
     Text2ImageRequest,
     Text2ImageTaskResponse,
@@ -22,6 +25,24 @@ from app.schemas.ai import (
 )
 
 
+@asynccontextmanager
+async def _upstream_call(operation: str) -> AsyncIterator[None]:
+    """Record the latency and outcome of one call to the AI provider."""
+    started = time.perf_counter()
+    outcome = "error"
+    try:
+        yield
+        outcome = "ok"
+    except httpx.TimeoutException:
+        outcome = "timeout"
+        raise
+    except httpx.HTTPStatusError:
+        outcome = "http_error"
+        raise
+    finally:
+        AI_UPSTREAM_SECONDS.labels(operation, outcome).observe(time.perf_counter() - started)
+
+
 class AIService:
     """Service class for AI operations using DashScope API."""
     
@@ -30,7 +51,7 @@ class AIService:
         self.base_url = settings.DASHSCOPE_BASE_URL
         self.text2image_model = settings.DASHSCOPE_TEXT2IMAGE_MODEL
         self.chat_model = settings.DASHSCOPE_CHAT_MODEL
-        
+    
     def _get_headers(self, async_mode: bool = False) -> dict:
         """Get common headers for API requests."""
         headers = {
@@ -69,7 +90,7 @@ class AIService:
         if request.negative_prompt:
             payload["input"]["negative_prompt"] = request.negative_prompt
         
-        async with httpx.AsyncClient(timeout=30.0) as client:
+        async with _upstream_call("text2image_submit"), httpx.AsyncClient(timeout=30.0) as client:
             response = await client.post(
                 url,
                 headers=self._get_headers(async_mode=True),
@@ -94,7 +115,7 @@ class AIService:
         """
         url = f"{self.base_url}/tasks/{task_id}"
         
-        async with httpx.AsyncClient(timeout=30.0) as client:
+        async with _upstream_call("text2image_status"), httpx.AsyncClient(timeout=30.0) as client:
             response = await client.get(
                 url,
                 headers=self._get_headers(),
@@ -129,7 +150,7 @@ class AIService:
         Download an image from URL and save it to the local uploads directory.
         Returns the local URL path.
         """
-        async with httpx.AsyncClient(timeout=60.0) as client:
+        async with _upstream_call("image_download"), httpx.AsyncClient(timeout=60.0) as client:
             response = await client.get(image_url)
             response.raise_for_status()
             content = response.content
@@ -208,7 +229,7 @@ class AIService:
         headers["Accept"] = "text/event-stream"
         headers["X-DashScope-SSE"] = "enable"
         
-        async with httpx.AsyncClient(timeout=120.0) as client:
+        async with _upstream_call("chat_stream"), httpx.AsyncClient(timeout=120.0) as client:
             async with client.stream(
                 "POST",
                 url,
@@ -273,7 +294,7 @@ class AIService:
             }
         }
         
-        async with httpx.AsyncClient(timeout=120.0) as client:
+        async with _upstream_call("chat"), httpx.AsyncClient(timeout=120.0) as client:
             response = await client.post(
                 url,
                 headers=self._get_headers(),
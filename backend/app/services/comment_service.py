@@ -1,16 +1,19 @@
 """
 Comment service for business logic.
 """
-from typing import Optional, Tuple, List
+from typing import Dict, Optional, List
 import re
 
-from sqlalchemy import select, func, and_, update
+from sqlalchemy import select, and_, union_all, update
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
+from sqlalchemy.orm.attributes import set_committed_value
 
-from app.models.comment import Comment
+from app.db.pagination import Page, encode_cursor, paginate
+from app.models.comment import Comment, descendants_of, path_segment
 from app.models.post import Post
-from app.schemas.comment import CommentCreate, CommentUpdate
+from app.schemas.comment import CommentCreate, CommentUpdate, CommentWithReplies
+from app.search import COMMENT, search_backend
 
 
 def extract_text_from_tiptap(content: dict) -> str:
@@ -30,6 +33,13 @@ def extract_text_from_tiptap(content: dict) -> str:
     return " ".join(text_parts)
 
 
+def _tree_node(comment: Comment) -> CommentWithReplies:
+    """Tree node for a comment, with an empty replies list to fill in."""
+    # Keep serialization from touching the lazy="raise" relationship
+    set_committed_value(comment, "replies", [])
+    return CommentWithReplies.model_validate(comment)
+
+
 class CommentService:
     """Service class for comment operations."""
     
@@ -50,68 +60,147 @@ class CommentService:
         post_id: int,
         page: int = 1,
         size: int = 50,
-    ) -> Tuple[List[Comment], int]:
+        after: Optional[str] = None,
+        before: Optional[str] = None,
+        with_total: bool = True,
+    ) -> Page:
         """Get flat list of comments for a post (for pagination)."""
-        # Count total
-        count_query = select(func.count()).where(Comment.post_id == post_id)
-        total = await self.db.scalar(count_query) or 0
-        
-        # Get comments ordered by path for tree structure
-        offset = (page - 1) * size
-        result = await self.db.execute(
+        # Comments are ordered by path for tree structure
+        return await paginate(
+            self.db,
             select(Comment)
             .options(selectinload(Comment.user))
-            .where(Comment.post_id == post_id)
-            .order_by(Comment.path.asc(), Comment.created_at.asc())
-            .offset(offset)
-            .limit(size)
+            .where(Comment.post_id == post_id),
+            Comment.path,
+            Comment.id,
+            size=size,
+            page=page,
+            after=after,
+            before=before,
+            descending=False,
+            with_total=with_total,
         )
-        comments = list(result.scalars().all())
-        
-        return comments, total
     
-    async def get_by_post_tree(self, post_id: int) -> List[Comment]:
+    async def get_tree(
+        self,
+        post_id: int,
+        page: int = 1,
+        size: int = 20,
+        after: Optional[str] = None,
+        before: Optional[str] = None,
+        with_total: bool = False,
+        replies: int = 10,
+    ) -> Page:
         """
-        Get comment tree for a post.
-        Returns root-level comments with nested replies loaded.
+        Get one page of root comments, each with its first replies nested.
+        
+        Roots are paged oldest first. Below each root, the first ``replies``
+        comments of its thread (any depth, in path order) are nested under
+        their parents; if the thread has more, the root's ``replies_cursor``
+        continues it via get_replies.
+        
+        Returns:
+            Page of CommentWithReplies
         """
-        # Get all comments for the post
-        result = await self.db.execute(
+        roots = await paginate(
+            self.db,
             select(Comment)
             .options(selectinload(Comment.user))
-            .where(Comment.post_id == post_id)
-            .order_by(Comment.path.asc(), Comment.created_at.asc())
+            .where(Comment.post_id == post_id, Comment.parent_id.is_(None)),
+            Comment.id,
+            Comment.id,
+            size=size,
+            page=page,
+            after=after,
+            before=before,
+            descending=False,
+            with_total=with_total,
         )
-        all_comments = list(result.scalars().all())
+        descendants = await self._first_descendants(roots.items, replies)
         
-        # Build tree structure
-        comment_dict = {c.id: c for c in all_comments}
-        root_comments = []
+        # Rows come in path order, so a parent always precedes its replies
+        nodes: Dict[int, CommentWithReplies] = {}
+        root_of: Dict[int, int] = {}
+        shown: Dict[int, List[Comment]] = {}
+        items = []
+        for root in roots.items:
+            nodes[root.id] = _tree_node(root)
+            root_of[root.id] = root.id
+            shown[root.id] = []
+            items.append(nodes[root.id])
+            if replies == 0 and root.reply_count > 0:
+                # Nothing nested: the thread continues from the root itself
+                nodes[root.id].replies_cursor = encode_cursor(root.path, root.id)
+        for comment in descendants:
+            root_id = root_of.get(comment.parent_id)
+            if root_id is None:
+                continue
+            thread = shown[root_id]
+            if len(thread) == replies:
+                # One row past the limit: the thread continues
+                last = thread[-1]
+                nodes[root_id].replies_cursor = encode_cursor(last.path, last.id)
+                continue
+            thread.append(comment)
+            nodes[comment.id] = _tree_node(comment)
+            root_of[comment.id] = root_id
+            nodes[comment.parent_id].replies.append(nodes[comment.id])
         
-        for comment in all_comments:
-            # Initialize replies list if not exists
-            if not hasattr(comment, '_replies'):
-                comment._replies = []
-            
-            if comment.parent_id is None:
-                root_comments.append(comment)
-            else:
-                parent = comment_dict.get(comment.parent_id)
-                if parent:
-                    if not hasattr(parent, '_replies'):
-                        parent._replies = []
-                    parent._replies.append(comment)
-        
-        # Convert _replies to replies for serialization
-        def set_replies(comment):
-            comment.replies = getattr(comment, '_replies', [])
-            for reply in comment.replies:
-                set_replies(reply)
-        
-        for comment in root_comments:
-            set_replies(comment)
-        
-        return root_comments
+        return roots._replace(items=items)
+    
+    async def _first_descendants(
+        self,
+        roots: List[Comment],
+        limit: int,
+    ) -> List[Comment]:
+        """Up to ``limit + 1`` descendants of each root, in one query, ordered by path."""
+        if not roots or limit <= 0:
+            return []
+        threads = [
+            select(Comment.id)
+            .where(descendants_of(root.path))
+            .order_by(Comment.path.asc())
+            .limit(limit + 1)
+            .subquery()
+            .select()
+            for root in roots
+        ]
+        ids = union_all(*threads).subquery()
+        result = await self.db.execute(
+            select(Comment)
+            .options(selectinload(Comment.user))
+            .where(Comment.id.in_(select(ids.c.id)))
+            .order_by(Comment.path.asc())
+        )
+        return list(result.scalars().all())
+    
+    async def get_replies(
+        self,
+        comment: Comment,
+        size: int = 20,
+        after: Optional[str] = None,
+        before: Optional[str] = None,
+        with_total: bool = False,
+    ) -> Page:
+        """
+        Page through all replies below ``comment`` (any depth) in path order.
+        
+        Cursors are the same as a tree root's ``replies_cursor``; clients nest
+        the rows by ``parent_id``.
+        """
+        return await paginate(
+            self.db,
+            select(Comment)
+            .options(selectinload(Comment.user))
+            .where(descendants_of(comment.path)),
+            Comment.path,
+            Comment.id,
+            size=size,
+            after=after,
+            before=before,
+            descending=False,
+            with_total=with_total,
+        )
     
     async def create(
         self,
@@ -128,7 +217,7 @@ class CommentService:
             parent = await self.get_by_id(comment_create.parent_id)
             if parent:
                 depth = parent.depth + 1
-                path_prefix = parent.path + "." if parent.path else ""
+                path_prefix = parent.path
         
         # Extract plain text
         content_text = extract_text_from_tiptap(comment_create.content)
@@ -148,7 +237,8 @@ class CommentService:
         await self.db.flush()  # Get the ID
         
         # Update path with the new comment's ID
-        comment.path = f"{path_prefix}{comment.id}"
+        comment.path = path_prefix + path_segment(comment.id)
+        await search_backend.index(self.db, COMMENT, comment.id, "", content_text)
         
         # Update parent's reply_count
         if parent:
@@ -175,6 +265,7 @@ class CommentService:
         """Update a comment."""
         comment.content = comment_update.content
         comment.content_text = extract_text_from_tiptap(comment_update.content)
+        await search_backend.index(self.db, COMMENT, comment.id, "", comment.content_text)
         
         await self.db.commit()
         await self.db.refresh(comment)
@@ -183,22 +274,37 @@ class CommentService:
     
     async def delete(self, comment: Comment, soft: bool = True) -> None:
         """Delete a comment (soft delete by default)."""
+        removed_ids = [comment.id]
         if soft:
             # Soft delete - mark as deleted
             comment.is_deleted = True
             comment.content = {"type": "doc", "content": []}
             comment.content_text = "[已删除]"
         else:
-            # Hard delete
+            # Hard delete; the database cascades to the replies, whose
+            # search documents go with it
+            result = await self.db.execute(
+                select(Comment.id).where(descendants_of(comment.path))
+            )
+            removed_ids.extend(result.scalars().all())
             await self.db.delete(comment)
             
-            # Update post's comment_count
+            # Update post's comment_count for the whole subtree
             await self.db.execute(
                 update(Post)
                 .where(Post.id == comment.post_id)
-                .values(comment_count=Post.comment_count - 1)
+                .values(comment_count=Post.comment_count - len(removed_ids))
             )
+            
+            # Update parent's reply_count
+            if comment.parent_id:
+                await self.db.execute(
+                    update(Comment)
+                    .where(Comment.id == comment.parent_id)
+                    .values(reply_count=Comment.reply_count - 1)
+                )
         
+        await search_backend.remove(self.db, COMMENT, removed_ids)
         await self.db.commit()
     
     async def get_user_comments(
@@ -206,25 +312,23 @@ class CommentService:
         user_id: int,
         page: int = 1,
         size: int = 20,
-    ) -> Tuple[List[Comment], int]:
+        after: Optional[str] = None,
+        before: Optional[str] = None,
+        with_total: bool = True,
+    ) -> Page:
         """Get comments by a user."""
-        count_query = select(func.count()).where(
-            Comment.user_id == user_id,
-            Comment.is_deleted == False,
-        )
-        total = await self.db.scalar(count_query) or 0
-        
-        offset = (page - 1) * size
-        result = await self.db.execute(
+        return await paginate(
+            self.db,
             select(Comment)
             .options(selectinload(Comment.user))
-            .where(Comment.user_id == user_id, Comment.is_deleted == False)
-            .order_by(Comment.created_at.desc())
-            .offset(offset)
-            .limit(size)
+            .where(Comment.user_id == user_id, Comment.is_deleted == False),
+            Comment.created_at,
+            Comment.id,
+            size=size,
+            page=page,
+            after=after,
+            before=before,
+            with_total=with_total,
         )
-        comments = list(result.scalars().all())
-        
-        return comments, total
 
 
@@ -0,0 +1,152 @@
+"""
+Interaction status service: like counts and the viewer's likes/favorites
+for many posts and comments at once.
+"""
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import and_, literal, or_, select, union_all
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.comment import Comment
+from app.models.interaction import Favorite, Like
+from app.models.post import Post
+from app.schemas.interaction import InteractionStatus, ViewerState
+
+# (target_type, target_id)
+Target = Tuple[str, int]
+
+
+def _ids_by_type(targets: Iterable[Target]) -> Dict[str, List[int]]:
+    """Distinct target ids per type, in first-seen order."""
+    ids: Dict[str, Dict[int, None]] = {"post": {}, "comment": {}}
+    for target_type, target_id in targets:
+        ids[target_type].setdefault(target_id)
+    return {target_type: list(target_ids) for target_type, target_ids in ids.items()}
+
+
+class InteractionService:
+    """
+    Batch interaction lookups.
+    
+    Counts come from the denormalized like_count columns in one query, and
+    the viewer's likes and favorites from one more, both served by the
+    primary key and the uq_like_user_target / uq_favorite_user_post indexes.
+    """
+    
+    def __init__(self, db: AsyncSession):
+        self.db = db
+    
+    async def get_status(
+        self,
+        user_id: Optional[int],
+        targets: Iterable[Target],
+    ) -> List[InteractionStatus]:
+        """
+        Status of each existing target: posts, then comments, in request order.
+        
+        Args:
+            user_id: Viewer, or None for anonymous (flags stay false)
+            targets: (target_type, target_id) pairs
+        """
+        ids = _ids_by_type(targets)
+        
+        counts = []
+        if ids["post"]:
+            counts.append(
+                select(literal("post").label("target_type"), Post.id, Post.like_count)
+                .where(Post.id.in_(ids["post"]))
+            )
+        if ids["comment"]:
+            counts.append(
+                select(literal("comment").label("target_type"), Comment.id, Comment.like_count)
+                .where(Comment.id.in_(ids["comment"]))
+            )
+        if not counts:
+            return []
+        result = await self.db.execute(union_all(*counts))
+        statuses = {
+            (target_type, target_id): InteractionStatus(
+                target_type=target_type,
+                target_id=target_id,
+                like_count=like_count,
+            )
+            for target_type, target_id, like_count in result.all()
+        }
+        
+        if user_id is not None:
+            viewer_rows = await self._viewer_rows(user_id, ids)
+            for (kind, target_type, target_id), row_id in viewer_rows.items():
+                status = statuses.get((target_type, target_id))
+                if status is None:
+                    continue
+                if kind == "like":
+                    status.liked, status.like_id = True, row_id
+                else:
+                    status.favorited, status.favorite_id = True, row_id
+        
+        return [
+            statuses[(target_type, target_id)]
+            for target_type in ("post", "comment")
+            for target_id in ids[target_type]
+            if (target_type, target_id) in statuses
+        ]
+    
+    async def get_viewer_state(
+        self,
+        user_id: Optional[int],
+        targets: Iterable[Target],
+    ) -> Dict[Target, ViewerState]:
+        """The viewer's state for each target (all false when anonymous)."""
+        ids = _ids_by_type(targets)
+        states = {
+            (target_type, target_id): ViewerState()
+            for target_type, target_ids in ids.items()
+            for target_id in target_ids
+        }
+        if user_id is None or not states:
+            return states
+        
+        for kind, target_type, target_id in await self._viewer_rows(user_id, ids):
+            state = states[(target_type, target_id)]
+            if kind == "like":
+                state.liked = True
+            else:
+                state.favorited = True
+        return states
+    
+    async def _viewer_rows(
+        self,
+        user_id: int,
+        ids: Dict[str, List[int]],
+    ) -> Dict[Tuple[str, str, int], int]:
+        """The viewer's likes and favorites of ``ids``, keyed by (kind, type, id)."""
+        liked_targets = [
+            and_(Like.target_type == target_type, Like.target_id.in_(target_ids))
+            for target_type, target_ids in ids.items()
+            if target_ids
+        ]
+        if not liked_targets:
+            return {}
+        
+        rows = [
+            select(
+                literal("like").label("kind"),
+                Like.target_type,
+                Like.target_id,
+                Like.id,
+            ).where(Like.user_id == user_id, or_(*liked_targets))
+        ]
+        if ids["post"]:
+            rows.append(
+                select(
+                    literal("favorite").label("kind"),
+                    literal("post"),
+                    Favorite.post_id,
+                    Favorite.id,
+                ).where(Favorite.user_id == user_id, Favorite.post_id.in_(ids["post"]))
+            )
+        result = await self.db.execute(union_all(*rows))
+        return {
+            (kind, target_type, target_id): row_id
+            for kind, target_type, target_id, row_id in result.all()
+        }
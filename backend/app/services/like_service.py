@@ -0,0 +1,149 @@
+"""
+Like service for business logic.
+"""
+from datetime import datetime
+from typing import NamedTuple, Optional
+
+from sqlalchemy import delete, insert, literal, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.comment import Comment
+from app.models.interaction import Like
+from app.models.post import Post
+from app.schemas.interaction import LikeResponse, LikeStatusResponse
+
+# Likeable models by target_type; each has a like_count column
+TARGET_MODELS = {
+    "post": Post,
+    "comment": Comment,
+}
+
+
+class LikeResult(NamedTuple):
+    """Outcome of a like request."""
+    like: LikeResponse
+    created: bool  # False if the user had already liked the target
+
+
+class LikeService:
+    """
+    Service class for likes.
+    
+    Likes are written without reading first: the insert skips duplicates
+    and the delete reports whether a row went away, so concurrent requests
+    cannot violate uq_like_user_target, and like_count moves only when a
+    row was actually added or removed (in the same transaction).
+    """
+    
+    def __init__(self, db: AsyncSession):
+        self.db = db
+    
+    async def like(self, user_id: int, target_type: str, target_id: int) -> Optional[LikeResult]:
+        """
+        Like a target; liking it again returns the existing like.
+        
+        Returns:
+            The like and whether it is new, or None if the target does not exist
+        """
+        model = TARGET_MODELS[target_type]
+        created_at = datetime.utcnow()
+        
+        # Inserts only if the target exists, skips the row if already liked
+        result = await self.db.execute(
+            insert(Like)
+            .from_select(
+                ["user_id", "target_type", "target_id", "created_at"],
+                select(
+                    literal(user_id),
+                    literal(target_type),
+                    model.id,
+                    literal(created_at),
+                ).where(model.id == target_id),
+            )
+            .prefix_with("OR IGNORE", dialect="sqlite")
+            .prefix_with("IGNORE", dialect="mysql")
+        )
+        
+        if result.rowcount:
+            await self._add_to_count(target_type, target_id, 1)
+            await self.db.commit()
+            return LikeResult(
+                LikeResponse(
+                    id=result.lastrowid,
+                    user_id=user_id,
+                    target_type=target_type,
+                    target_id=target_id,
+                    created_at=created_at,
+                ),
+                created=True,
+            )
+        
+        existing = await self.get(user_id, target_type, target_id)
+        await self.db.commit()
+        if existing is None:
+            return None
+        return LikeResult(LikeResponse.model_validate(existing), created=False)
+    
+    async def unlike(self, user_id: int, target_type: str, target_id: int) -> bool:
+        """
+        Remove a user's like from a target; unliking twice is a no-op.
+        
+        Returns:
+            True if a like was removed
+        """
+        result = await self.db.execute(
+            delete(Like)
+            .where(
+                Like.user_id == user_id,
+                Like.target_type == target_type,
+                Like.target_id == target_id,
+            )
+            .execution_options(synchronize_session=False)
+        )
+        removed = result.rowcount > 0
+        if removed:
+            await self._add_to_count(target_type, target_id, -1)
+        await self.db.commit()
+        return removed
+    
+    async def toggle(
+        self,
+        user_id: int,
+        target_type: str,
+        target_id: int,
+    ) -> Optional[LikeStatusResponse]:
+        """
+        Unlike the target if liked, like it otherwise.
+        
+        Returns:
+            Whether the target is now liked, or None if it does not exist
+        """
+        if await self.unlike(user_id, target_type, target_id):
+            return LikeStatusResponse(liked=False)
+        result = await self.like(user_id, target_type, target_id)
+        if result is None:
+            return None
+        return LikeStatusResponse(liked=True, like_id=result.like.id)
+    
+    async def get(self, user_id: int, target_type: str, target_id: int) -> Optional[Like]:
+        """Get a user's like of a target."""
+        result = await self.db.execute(
+            select(Like).where(
+                Like.user_id == user_id,
+                Like.target_type == target_type,
+                Like.target_id == target_id,
+            )
+        )
+        return result.scalar_one_or_none()
+    
+    async def _add_to_count(self, target_type: str, target_id: int, delta: int) -> None:
+        """Move the target's like_count by ``delta``, never below zero."""
+        model = TARGET_MODELS[target_type]
+        query = update(model).where(model.id == target_id)
+        if delta < 0:
+            query = query.where(model.like_count >= -delta)
+        # Keep updated_at: a like is not an edit of the target
+        await self.db.execute(
+            query.values(like_count=model.like_count + delta, updated_at=model.updated_at)
+            .execution_options(synchronize_session=False)
+        )
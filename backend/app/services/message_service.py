@@ -2,14 +2,16 @@
 Message service for business logic.
 """
 from datetime import datetime
-from typing import Optional, Tuple, List
+from typing import Dict, Iterable, Optional
 
-from sqlalchemy import select, func, or_, and_, update
+from sqlalchemy import case, select, func, and_, update
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.orm import selectinload
+from sqlalchemy.orm import joinedload, selectinload
 
-from app.models.message import Conversation, Message
+from app.db.pagination import Page, paginate
+from app.models.message import Conversation, ConversationParticipant, Message
 from app.models.user import User
+from app.services.unread_counter import MESSAGES, unread_counter
 
 
 class MessageService:
@@ -45,12 +47,31 @@ class MessageService:
         if conversation:
             return conversation
         
-        # Create new conversation
+        # Create new conversation with an inbox entry for each participant.
+        # The timestamp is set here: a server default is expired after the
+        # flush where the database has no RETURNING (MySQL).
+        now = datetime.utcnow()
         conversation = Conversation(
             user1_id=user1_id,
             user2_id=user2_id,
+            last_message_at=now,
         )
         self.db.add(conversation)
+        await self.db.flush()
+        self.db.add_all([
+            ConversationParticipant(
+                conversation_id=conversation.id,
+                user_id=user1_id,
+                other_user_id=user2_id,
+                last_message_at=now,
+            ),
+            ConversationParticipant(
+                conversation_id=conversation.id,
+                user_id=user2_id,
+                other_user_id=user1_id,
+                last_message_at=now,
+            ),
+        ])
         await self.db.commit()
         await self.db.refresh(conversation)
         
@@ -70,46 +91,35 @@ class MessageService:
         user_id: int,
         page: int = 1,
         size: int = 20,
-    ) -> Tuple[List[Conversation], int, dict]:
-        """Get user's conversations with unread counts."""
-        # Get conversations where user is participant
-        query = (
-            select(Conversation)
+        after: Optional[str] = None,
+        before: Optional[str] = None,
+        with_total: bool = True,
+    ) -> Page:
+        """
+        Get user's inbox, most recent conversation first.
+        
+        Items are ConversationParticipant rows with the other user and the
+        conversation loaded; the unread count is stored on the row.
+        """
+        return await paginate(
+            self.db,
+            select(ConversationParticipant)
             .options(
-                selectinload(Conversation.user1),
-                selectinload(Conversation.user2),
+                joinedload(ConversationParticipant.other_user),
+                joinedload(ConversationParticipant.conversation).raiseload("*"),
             )
-            .where(
-                or_(
-                    Conversation.user1_id == user_id,
-                    Conversation.user2_id == user_id,
-                )
-            )
-            .order_by(Conversation.last_message_at.desc())
+            .where(ConversationParticipant.user_id == user_id),
+            ConversationParticipant.last_message_at,
+            ConversationParticipant.id,
+            size=size,
+            page=page,
+            after=after,
+            before=before,
+            with_total=with_total,
+            count_query=select(ConversationParticipant.id).where(
+                ConversationParticipant.user_id == user_id
+            ),
         )
-        
-        # Count total
-        count_query = select(func.count()).select_from(query.subquery())
-        total = await self.db.scalar(count_query) or 0
-        
-        # Paginate
-        offset = (page - 1) * size
-        result = await self.db.execute(query.offset(offset).limit(size))
-        conversations = list(result.scalars().all())
-        
-        # Get unread counts for each conversation
-        unread_counts = {}
-        for conv in conversations:
-            count_result = await self.db.execute(
-                select(func.count()).where(
-                    Message.conversation_id == conv.id,
-                    Message.sender_id != user_id,
-                    Message.is_read == False,
-                )
-            )
-            unread_counts[conv.id] = count_result.scalar() or 0
-        
-        return conversations, total, unread_counts
     
     async def get_messages(
         self,
@@ -117,35 +127,36 @@ class MessageService:
         user_id: int,
         page: int = 1,
         size: int = 50,
-    ) -> Tuple[List[Message], int]:
-        """Get messages in a conversation."""
+        after: Optional[str] = None,
+        before: Optional[str] = None,
+        with_total: bool = True,
+    ) -> Optional[Page]:
+        """
+        Get messages in a conversation, newest first.
+        Returns None if the user is not a participant.
+        """
         # Verify user is participant
         conv_result = await self.db.execute(
             select(Conversation).where(Conversation.id == conversation_id)
         )
         conv = conv_result.scalar_one_or_none()
         if not conv or (conv.user1_id != user_id and conv.user2_id != user_id):
-            return [], 0
-        
-        # Count total
-        count_result = await self.db.execute(
-            select(func.count()).where(Message.conversation_id == conversation_id)
-        )
-        total = count_result.scalar() or 0
+            return None
         
         # Get messages
-        offset = (page - 1) * size
-        result = await self.db.execute(
+        return await paginate(
+            self.db,
             select(Message)
             .options(selectinload(Message.sender))
-            .where(Message.conversation_id == conversation_id)
-            .order_by(Message.created_at.desc())
-            .offset(offset)
-            .limit(size)
+            .where(Message.conversation_id == conversation_id),
+            Message.created_at,
+            Message.id,
+            size=size,
+            page=page,
+            after=after,
+            before=before,
+            with_total=with_total,
         )
-        messages = list(result.scalars().all())
-        
-        return messages, total
     
     async def send_message(
         self,
@@ -164,13 +175,37 @@ class MessageService:
             content=content,
         )
         self.db.add(message)
+        await self.db.flush()
         
         # Update conversation
-        conversation.last_message_at = datetime.utcnow()
+        now = datetime.utcnow()
+        conversation.last_message_at = now
         conversation.last_message_preview = content[:100] if len(content) > 100 else content
         
+        # Move it to the top of both inboxes; the sender has read their own message
+        await self.db.execute(
+            update(ConversationParticipant)
+            .where(ConversationParticipant.conversation_id == conversation.id)
+            .values(
+                last_message_at=now,
+                unread_count=case(
+                    (
+                        ConversationParticipant.user_id == recipient_id,
+                        ConversationParticipant.unread_count + 1,
+                    ),
+                    else_=ConversationParticipant.unread_count,
+                ),
+                last_read_message_id=case(
+                    (ConversationParticipant.user_id == sender_id, message.id),
+                    else_=ConversationParticipant.last_read_message_id,
+                ),
+            )
+            .execution_options(synchronize_session=False)
+        )
+        
         await self.db.commit()
         await self.db.refresh(message)
+        await unread_counter.add(MESSAGES, recipient_id, 1)
         
         # Reload with sender
         result = await self.db.execute(
@@ -195,33 +230,40 @@ class MessageService:
             )
             .values(is_read=True, read_at=datetime.utcnow())
         )
+        last_message_id = (
+            select(func.max(Message.id))
+            .where(Message.conversation_id == conversation_id)
+            .scalar_subquery()
+        )
+        await self.db.execute(
+            update(ConversationParticipant)
+            .where(
+                ConversationParticipant.conversation_id == conversation_id,
+                ConversationParticipant.user_id == user_id,
+            )
+            .values(unread_count=0, last_read_message_id=last_message_id)
+            .execution_options(synchronize_session=False)
+        )
         await self.db.commit()
+        await unread_counter.add(MESSAGES, user_id, -result.rowcount)
         return result.rowcount
     
     async def get_unread_count(self, user_id: int) -> int:
-        """Get total unread message count for user."""
-        # Get all conversations for user
-        conv_result = await self.db.execute(
-            select(Conversation.id).where(
-                or_(
-                    Conversation.user1_id == user_id,
-                    Conversation.user2_id == user_id,
-                )
-            )
-        )
-        conv_ids = [c for c in conv_result.scalars().all()]
-        
-        if not conv_ids:
-            return 0
-        
-        # Count unread messages
-        count_result = await self.db.execute(
-            select(func.count()).where(
-                Message.conversation_id.in_(conv_ids),
-                Message.sender_id != user_id,
-                Message.is_read == False,
+        """Get total unread message count for user (cached counter)."""
+        return await unread_counter.get(MESSAGES, user_id, self.count_unread_many)
+    
+    async def get_unread_counts(self, user_ids: Iterable[int]) -> Dict[int, int]:
+        """Get total unread message counts for several users (cached counters)."""
+        return await unread_counter.get_many(MESSAGES, user_ids, self.count_unread_many)
+    
+    async def count_unread_many(self, user_ids: Iterable[int]) -> Dict[int, int]:
+        """Sum the users' per-conversation unread counts, one grouped query."""
+        result = await self.db.execute(
+            select(
+                ConversationParticipant.user_id,
+                func.sum(ConversationParticipant.unread_count),
             )
+            .where(ConversationParticipant.user_id.in_(list(user_ids)))
+            .group_by(ConversationParticipant.user_id)
         )
-        return count_result.scalar() or 0
-
-
+        return {user_id: int(count or 0) for user_id, count in result.all()}
@@ -2,14 +2,17 @@
 Notification service for business logic.
 """
 from datetime import datetime
-from typing import Optional, Tuple, List
+from collections import Counter
+from typing import Dict, Iterable, Optional, Tuple, List
 
 from sqlalchemy import select, func, update
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
 
+from app.db.pagination import Page, paginate
 from app.models.notification import Notification
 from app.schemas.notification import NotificationCreate
+from app.services.unread_counter import NOTIFICATIONS, unread_counter
 
 
 class NotificationService:
@@ -36,6 +39,7 @@ class NotificationService:
         self.db.add(notification)
         await self.db.commit()
         await self.db.refresh(notification)
+        await unread_counter.add(NOTIFICATIONS, notification.user_id, 1)
         
         # Reload with actor
         if notification_data.actor_id:
@@ -48,14 +52,40 @@ class NotificationService:
         
         return notification
     
+    async def create_many(
+        self,
+        notifications_data: List[NotificationCreate],
+    ) -> List[Notification]:
+        """Insert several notifications in one batch, returned with actors."""
+        # Through the unit of work rather than INSERT ... RETURNING, which
+        # MySQL lacks: the ORM then fetches each new id as the driver allows
+        notifications = [Notification(**data.model_dump()) for data in notifications_data]
+        self.db.add_all(notifications)
+        await self.db.flush()
+        ids = [notification.id for notification in notifications]
+        await self.db.commit()
+        await unread_counter.add_many(
+            NOTIFICATIONS, Counter(data.user_id for data in notifications_data)
+        )
+        
+        result = await self.db.execute(
+            select(Notification)
+            .where(Notification.id.in_(ids))
+            .order_by(Notification.id)
+        )
+        return list(result.scalars().all())
+    
     async def get_list(
         self,
         user_id: int,
         page: int = 1,
         size: int = 20,
         unread_only: bool = False,
-    ) -> Tuple[List[Notification], int, int]:
-        """Get user's notifications."""
+        after: Optional[str] = None,
+        before: Optional[str] = None,
+        with_total: bool = True,
+    ) -> Tuple[Page, int]:
+        """Get user's notifications and the unread count."""
         # Base query
         query = (
             select(Notification)
@@ -66,25 +96,23 @@ class NotificationService:
         if unread_only:
             query = query.where(Notification.is_read == False)
         
-        query = query.order_by(Notification.created_at.desc())
-        
-        # Count total
-        count_query = select(func.count()).select_from(query.subquery())
-        total = await self.db.scalar(count_query) or 0
-        
         # Count unread
-        unread_query = select(func.count()).where(
-            Notification.user_id == user_id,
-            Notification.is_read == False,
-        )
-        unread_count = await self.db.scalar(unread_query) or 0
+        unread_count = await self.get_unread_count(user_id)
         
         # Paginate
-        offset = (page - 1) * size
-        result = await self.db.execute(query.offset(offset).limit(size))
-        notifications = list(result.scalars().all())
+        page_result = await paginate(
+            self.db,
+            query,
+            Notification.created_at,
+            Notification.id,
+            size=size,
+            page=page,
+            after=after,
+            before=before,
+            with_total=with_total,
+        )
         
-        return notifications, total, unread_count
+        return page_result, unread_count
     
     async def get_by_id(self, notification_id: int) -> Optional[Notification]:
         """Get notification by ID."""
@@ -115,22 +143,39 @@ class NotificationService:
         
         result = await self.db.execute(query)
         await self.db.commit()
+        
+        if notification_ids:
+            await unread_counter.add(NOTIFICATIONS, user_id, -result.rowcount)
+        else:
+            await unread_counter.reset(NOTIFICATIONS, user_id)
         return result.rowcount
     
     async def get_unread_count(self, user_id: int) -> int:
-        """Get unread notification count."""
+        """Get unread notification count (cached counter)."""
+        return await unread_counter.get(NOTIFICATIONS, user_id, self.count_unread_many)
+    
+    async def get_unread_counts(self, user_ids: Iterable[int]) -> Dict[int, int]:
+        """Get unread notification counts for several users (cached counters)."""
+        return await unread_counter.get_many(NOTIFICATIONS, user_ids, self.count_unread_many)
+    
+    async def count_unread_many(self, user_ids: Iterable[int]) -> Dict[int, int]:
+        """Count unread notifications in the database, one grouped query."""
         result = await self.db.execute(
-            select(func.count()).where(
-                Notification.user_id == user_id,
+            select(Notification.user_id, func.count())
+            .where(
+                Notification.user_id.in_(list(user_ids)),
                 Notification.is_read == False,
             )
+            .group_by(Notification.user_id)
         )
-        return result.scalar() or 0
+        return dict(result.all())
     
     async def delete(self, notification: Notification) -> None:
         """Delete a notification."""
         await self.db.delete(notification)
         await self.db.commit()
+        if not notification.is_read:
+            await unread_counter.add(NOTIFICATIONS, notification.user_id, -1)
     
     async def delete_old(self, user_id: int, days: int = 30) -> int:
         """Delete notifications older than specified days."""
@@ -153,24 +198,23 @@ class NotificationService:
                 )
             )
             await self.db.commit()
+            await unread_counter.invalidate(NOTIFICATIONS, [user_id])
         
         return len(ids_to_delete)
 
 
-# Helper functions to create specific notifications
-async def notify_comment(
-    db: AsyncSession,
+# Builders for the notifications produced by domain events
+def comment_notification(
     post_author_id: int,
     commenter_id: int,
     post_id: int,
     post_title: str,
-) -> Optional[Notification]:
-    """Create notification for new comment on post."""
+) -> Optional[NotificationCreate]:
+    """Notification for new comment on post."""
     if post_author_id == commenter_id:
         return None  # Don't notify yourself
     
-    service = NotificationService(db)
-    return await service.create(NotificationCreate(
+    return NotificationCreate(
         user_id=post_author_id,
         type="comment",
         title="New comment on your post",
@@ -178,22 +222,20 @@ async def notify_comment(
         entity_type="post",
         entity_id=post_id,
         actor_id=commenter_id,
-    ))
+    )
 
 
-async def notify_reply(
-    db: AsyncSession,
+def reply_notification(
     parent_author_id: int,
     replier_id: int,
     post_id: int,
     comment_id: int,
-) -> Optional[Notification]:
-    """Create notification for reply to comment."""
+) -> Optional[NotificationCreate]:
+    """Notification for reply to comment."""
     if parent_author_id == replier_id:
         return None
     
-    service = NotificationService(db)
-    return await service.create(NotificationCreate(
+    return NotificationCreate(
         user_id=parent_author_id,
         type="reply",
         title="New reply to your comment",
@@ -202,29 +244,46 @@ async def notify_reply(
         entity_id=comment_id,
         actor_id=replier_id,
         data={"post_id": post_id},
-    ))
+    )
 
 
-async def notify_like(
-    db: AsyncSession,
+def like_notification(
     target_author_id: int,
     liker_id: int,
     target_type: str,
     target_id: int,
-) -> Optional[Notification]:
-    """Create notification for like."""
+) -> Optional[NotificationCreate]:
+    """Notification for like."""
     if target_author_id == liker_id:
         return None
     
-    service = NotificationService(db)
     notif_type = f"like_{target_type}"
-    return await service.create(NotificationCreate(
+    return NotificationCreate(
         user_id=target_author_id,
         type=notif_type,
         title=f"Someone liked your {target_type}",
         entity_type=target_type,
         entity_id=target_id,
         actor_id=liker_id,
-    ))
+    )
 
 
+def favorite_notification(
+    post_author_id: int,
+    user_id: int,
+    post_id: int,
+    post_title: str,
+) -> Optional[NotificationCreate]:
+    """Notification for a post added to favorites."""
+    if post_author_id == user_id:
+        return None
+    
+    return NotificationCreate(
+        user_id=post_author_id,
+        type="favorite",
+        title="Someone favorited your post",
+        content=f'Someone added "{post_title}" to their favorites',
+        entity_type="post",
+        entity_id=post_id,
+        actor_id=user_id,
+    )
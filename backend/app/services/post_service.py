@@ -3,17 +3,71 @@ Post service for business logic.
 """
 import re
 from datetime import datetime
-from typing import Optional, Tuple
+from typing import Iterable, Optional, Sequence
 from slugify import slugify as python_slugify
 
-from sqlalchemy import select, func, or_, and_
+from sqlalchemy import Row, Select, case, func, select, update, and_
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.orm import selectinload
-
-from app.models.post import Post
+from sqlalchemy.orm.util import identity_key
+from app.core.config import settings
+from app.db.pagination import Page, paginate
+from app.models.loading import POST_DETAIL
+from app.models.post import Post, reading_time
 from app.models.category import Category
-from app.models.tag import Tag
-from app.schemas.post import PostCreate, PostUpdate, PostSearchParams
+from app.models.tag import Tag, post_tags
+from app.models.search import SearchDocument
+from app.models.user import User
+from app.schemas.category import CategorySimple
+from app.schemas.post import (
+    AuthorResponse,
+    PostCreate,
+    PostListResponse,
+    PostSearchParams,
+    PostUpdate,
+    SearchHighlight,
+)
+from app.schemas.tag import TagListResponse
+from app.search import POST, highlight, query_terms, search_backend
+from app.services.post_text import apply_post_text, post_search_text
+from app.services.response_cache import POSTS, response_cache
+
+
+def _with_list_columns(query: Select) -> Select:
+    """Swap a filtered ``select(Post.id)`` to the columns PostListResponse needs."""
+    return query.with_only_columns(
+        Post.id,
+        Post.title,
+        Post.title_en,
+        Post.slug,
+        func.coalesce(Post.excerpt, Post.auto_excerpt).label("excerpt"),
+        Post.cover_image,
+        Post.status,
+        Post.is_featured,
+        Post.view_count,
+        Post.like_count,
+        Post.comment_count,
+        Post.word_count,
+        Post.created_at,
+        Post.updated_at,
+        Post.published_at,
+        User.id.label("author_id"),
+        User.username.label("author_username"),
+        User.nickname.label("author_nickname"),
+        User.avatar.label("author_avatar"),
+        Post.category_id,
+        Category.name.label("category_name"),
+        Category.name_en.label("category_name_en"),
+        Category.slug.label("category_slug"),
+        Category.icon.label("category_icon"),
+    ).join(User, User.id == Post.user_id).outerjoin(
+        Category, Category.id == Post.category_id
+    )
+
+
+# (published, category_id, tag_ids): what a post contributes to post_count
+CountState = tuple[bool, Optional[int], set[int]]
+
+UNCOUNTED: CountState = (False, None, set())
 
 
 def generate_slug(title: str) -> str:
@@ -42,11 +96,7 @@ class PostService:
         """Get post by ID with relationships."""
         result = await self.db.execute(
             select(Post)
-            .options(
-                selectinload(Post.user),
-                selectinload(Post.category),
-                selectinload(Post.tags),
-            )
+            .options(*POST_DETAIL)
             .where(Post.id == post_id)
         )
         return result.scalar_one_or_none()
@@ -55,11 +105,7 @@ class PostService:
         """Get post by slug with relationships."""
         result = await self.db.execute(
             select(Post)
-            .options(
-                selectinload(Post.user),
-                selectinload(Post.category),
-                selectinload(Post.tags),
-            )
+            .options(*POST_DETAIL)
             .where(Post.slug == slug)
         )
         return result.scalar_one_or_none()
@@ -68,14 +114,16 @@ class PostService:
         self,
         params: PostSearchParams,
         published_only: bool = True,
-    ) -> Tuple[list[Post], int]:
-        """Get paginated post list with filters."""
-        # Base query
-        query = select(Post).options(
-            selectinload(Post.user),
-            selectinload(Post.category),
-            selectinload(Post.tags),
-        )
+    ) -> Page:
+        """
+        Get paginated post list with filters.
+        
+        Selects only the list columns (never the TipTap bodies) and builds
+        PostListResponse items straight from the rows. Supports page numbers
+        and ``after``/``before`` cursors.
+        """
+        # Base query (filters only, columns are chosen below)
+        query = select(Post.id)
         
         # Apply filters
         conditions = []
@@ -85,15 +133,13 @@ class PostService:
         elif params.status:
             conditions.append(Post.status == params.status)
         
-        if params.q:
-            search_term = f"%{params.q}%"
-            conditions.append(
-                or_(
-                    Post.title.ilike(search_term),
-                    Post.title_en.ilike(search_term),
-                    Post.excerpt.ilike(search_term),
-                )
-            )
+        # Full-text matches, joined so filters and paging stay in one query
+        matches = None
+        if params.q and params.q.strip():
+            matches = search_backend.matches(POST, params.q)
+            if matches is None:
+                return Page([], 0 if params.with_total else None, None, None)
+            query = query.join(matches, matches.c.doc_id == Post.id)
         
         if params.category_id:
             conditions.append(Post.category_id == params.category_id)
@@ -105,33 +151,114 @@ class PostService:
             conditions.append(Post.is_featured == params.is_featured)
         
         if params.tag_id:
-            query = query.join(Post.tags).where(Tag.id == params.tag_id)
+            query = query.join(post_tags, post_tags.c.post_id == Post.id).where(
+                post_tags.c.tag_id == params.tag_id
+            )
         
         if conditions:
             query = query.where(and_(*conditions))
         
-        # Count total
-        count_query = select(func.count()).select_from(
-            query.with_only_columns(Post.id).subquery()
-        )
-        total = await self.db.scalar(count_query) or 0
-        
-        # Apply sorting
-        sort_column = getattr(Post, params.sort_by, Post.created_at)
-        if params.sort_order == "desc":
-            query = query.order_by(sort_column.desc())
+        # Search results rank by relevance unless another order is asked for
+        sort_by = params.sort_by or ("relevance" if matches is not None else "created_at")
+        list_query = _with_list_columns(query)
+        if sort_by == "relevance" and matches is not None:
+            sort_column = matches.c.score
+            list_query = list_query.add_columns(matches.c.score)
         else:
-            query = query.order_by(sort_column.asc())
+            sort_column = getattr(Post, sort_by, Post.created_at)
         
-        # Apply pagination
-        offset = (params.page - 1) * params.size
-        query = query.offset(offset).limit(params.size)
+        # Paginate over the list columns, counting the bare filtered ids
+        page = await paginate(
+            self.db,
+            list_query,
+            sort_column,
+            Post.id,
+            size=params.size,
+            page=params.page,
+            after=params.after,
+            before=params.before,
+            descending=params.sort_order == "desc",
+            with_total=params.with_total,
+            count_query=query,
+            scalars=False,
+        )
+        items = await self._build_list_items(page.items)
+        if matches is not None:
+            await self._add_highlights(items, params.q)
         
-        # Execute
-        result = await self.db.execute(query)
-        posts = list(result.scalars().all())
+        return page._replace(items=items)
+    
+    async def _add_highlights(self, items: list[PostListResponse], q: str) -> None:
+        """Mark the search terms in each item's title and a body snippet."""
+        if not items:
+            return
+        result = await self.db.execute(
+            select(SearchDocument.doc_id, SearchDocument.body).where(
+                SearchDocument.doc_type == POST,
+                SearchDocument.doc_id.in_([item.id for item in items]),
+            )
+        )
+        bodies = dict(result.all())
+        terms = query_terms(q)
+        for item in items:
+            item.highlight = SearchHighlight(
+                title=highlight(item.title, terms),
+                snippet=highlight(bodies.get(item.id, ""), terms, settings.SEARCH_SNIPPET_LENGTH),
+            )
+    
+    async def _build_list_items(self, rows: Sequence[Row]) -> list[PostListResponse]:
+        """Build list items from projected rows, loading tags in one query."""
+        if not rows:
+            return []
+        
+        tags_by_post: dict[int, list[TagListResponse]] = {row.id: [] for row in rows}
+        tag_result = await self.db.execute(
+            select(post_tags.c.post_id, Tag.id, Tag.name, Tag.name_en, Tag.slug, Tag.post_count)
+            .join(Tag, Tag.id == post_tags.c.tag_id)
+            .where(post_tags.c.post_id.in_(tags_by_post.keys()))
+            .order_by(Tag.name.asc())
+        )
+        for post_id, tag_id, name, name_en, slug, post_count in tag_result.all():
+            tags_by_post[post_id].append(
+                TagListResponse(
+                    id=tag_id, name=name, name_en=name_en, slug=slug, post_count=post_count
+                )
+            )
         
-        return posts, total
+        return [
+            PostListResponse(
+                id=row.id,
+                title=row.title,
+                title_en=row.title_en,
+                slug=row.slug,
+                excerpt=row.excerpt,
+                cover_image=row.cover_image,
+                status=row.status,
+                is_featured=row.is_featured,
+                view_count=row.view_count,
+                like_count=row.like_count,
+                comment_count=row.comment_count,
+                word_count=row.word_count,
+                reading_time=reading_time(row.word_count),
+                created_at=row.created_at,
+                published_at=row.published_at,
+                user=AuthorResponse(
+                    id=row.author_id,
+                    username=row.author_username,
+                    nickname=row.author_nickname,
+                    avatar=row.author_avatar,
+                ),
+                category=CategorySimple(
+                    id=row.category_id,
+                    name=row.category_name,
+                    name_en=row.category_name_en,
+                    slug=row.category_slug,
+                    icon=row.category_icon,
+                ) if row.category_id is not None else None,
+                tags=tags_by_post[row.id],
+            )
+            for row in rows
+        ]
     
     async def create(
         self,
@@ -154,7 +281,7 @@ class PostService:
             slug=slug,
             content=post_create.content,
             content_en=post_create.content_en,
-            excerpt=post_create.excerpt,
+            excerpt=post_create.excerpt or None,
             cover_image=post_create.cover_image,
             user_id=user_id,
             category_id=post_create.category_id,
@@ -165,6 +292,8 @@ class PostService:
         if post.status == "published":
             post.published_at = datetime.utcnow()
         
+        apply_post_text(post)
+        
         # Add tags
         if post_create.tag_ids:
             tags_result = await self.db.execute(
@@ -173,7 +302,11 @@ class PostService:
             post.tags = list(tags_result.scalars().all())
         
         self.db.add(post)
+        await self.db.flush()
+        await self._sync_post_counts(UNCOUNTED, await self._count_state(post))
+        await search_backend.index(self.db, POST, post.id, *post_search_text(post))
         await self.db.commit()
+        await response_cache.invalidate(POSTS)
         await self.db.refresh(post)
         
         # Reload with relationships
@@ -185,14 +318,19 @@ class PostService:
         post_update: PostUpdate,
     ) -> Post:
         """Update a post."""
+        before = await self._count_state(post)
         update_data = post_update.model_dump(exclude_unset=True)
         
         # Handle tag_ids separately
         tag_ids = update_data.pop("tag_ids", None)
         
         # Update fields
+        if "excerpt" in update_data:
+            update_data["excerpt"] = update_data["excerpt"] or None
         for field, value in update_data.items():
             setattr(post, field, value)
+        if "content" in update_data or "content_en" in update_data:
+            apply_post_text(post)
         
         # Handle status change to published
         if post_update.status == "published" and not post.published_at:
@@ -205,42 +343,141 @@ class PostService:
             )
             post.tags = list(tags_result.scalars().all())
         
+        await self.db.flush()
+        await self._sync_post_counts(before, await self._count_state(post))
+        await search_backend.index(self.db, POST, post.id, *post_search_text(post))
         await self.db.commit()
+        await response_cache.invalidate(POSTS)
         await self.db.refresh(post)
         
         return await self.get_by_id(post.id)
     
     async def delete(self, post: Post) -> None:
         """Delete a post."""
+        before = await self._count_state(post)
         await self.db.delete(post)
+        await self.db.flush()
+        await self._sync_post_counts(before, UNCOUNTED)
+        await search_backend.remove(self.db, POST, [post.id])
         await self.db.commit()
+        await response_cache.invalidate(POSTS)
     
-    async def increment_view_count(self, post: Post) -> Post:
-        """Increment post view count."""
-        post.view_count += 1
+    async def set_status(self, post: Post, status: str) -> Post:
+        """Publish, archive or unpublish a post."""
+        before = await self._count_state(post)
+        post.status = status
+        if status == "published" and not post.published_at:
+            post.published_at = datetime.utcnow()
+        await self.db.flush()
+        await self._sync_post_counts(before, await self._count_state(post))
         await self.db.commit()
-        await self.db.refresh(post)
+        await response_cache.invalidate(POSTS)
         return post
     
-    async def get_featured(self, limit: int = 5) -> list[Post]:
-        """Get featured posts."""
+    async def _count_state(self, post: Post) -> CountState:
+        """Snapshot which category and tags count this post as published."""
         result = await self.db.execute(
-            select(Post)
-            .options(
-                selectinload(Post.user),
-                selectinload(Post.category),
-                selectinload(Post.tags),
+            select(post_tags.c.tag_id).where(post_tags.c.post_id == post.id)
+        )
+        return post.status == "published", post.category_id, set(result.scalars().all())
+    
+    async def _sync_post_counts(self, before: CountState, after: CountState) -> None:
+        """Recount the categories and tags a post write moved in or out of."""
+        was_published, old_category_id, old_tag_ids = before
+        is_published, new_category_id, new_tag_ids = after
+        if was_published and is_published:
+            # Still published: only what was added or removed changes
+            category_ids = set() if old_category_id == new_category_id else {old_category_id, new_category_id}
+            tag_ids = old_tag_ids ^ new_tag_ids
+        elif was_published or is_published:
+            category_ids = {old_category_id, new_category_id}
+            tag_ids = old_tag_ids | new_tag_ids
+        else:
+            return
+        await self.refresh_post_counts(category_ids, tag_ids)
+    
+    async def refresh_post_counts(
+        self,
+        category_ids: Iterable[Optional[int]],
+        tag_ids: Iterable[int],
+    ) -> None:
+        """Recompute post_count of the given categories and tags from the posts table."""
+        category_ids = {c for c in category_ids if c is not None}
+        tag_ids = set(tag_ids)
+        
+        if category_ids:
+            published = (
+                select(func.count())
+                .where(Post.category_id == Category.id, Post.status == "published")
+                .correlate(Category)
+                .scalar_subquery()
+            )
+            await self.db.execute(
+                update(Category)
+                .where(Category.id.in_(category_ids))
+                .values(post_count=published)
+                .execution_options(synchronize_session=False)
             )
+        if tag_ids:
+            published = (
+                select(func.count())
+                .select_from(post_tags)
+                .join(Post, Post.id == post_tags.c.post_id)
+                .where(post_tags.c.tag_id == Tag.id, Post.status == "published")
+                .correlate(Tag)
+                .scalar_subquery()
+            )
+            await self.db.execute(
+                update(Tag)
+                .where(Tag.id.in_(tag_ids))
+                .values(post_count=published)
+                .execution_options(synchronize_session=False)
+            )
+        
+        # Rows already loaded in this session reload the new counts when next
+        # fetched (e.g. the post reloaded for the response)
+        self._expire_post_counts(Category, category_ids)
+        self._expire_post_counts(Tag, tag_ids)
+    
+    def _expire_post_counts(self, model: type, ids: Iterable[int]) -> None:
+        """Expire post_count of the given rows that are in the identity map."""
+        for row_id in ids:
+            row = self.db.identity_map.get(identity_key(model, row_id))
+            if row is not None:
+                self.db.expire(row, ["post_count"])
+    
+    async def increment_view_count(self, post_id: int, amount: int = 1) -> None:
+        """Increment post view count in place, without loading the row."""
+        await self.add_view_counts({post_id: amount})
+    
+    async def add_view_counts(self, deltas: dict[int, int]) -> None:
+        """Add buffered view deltas to several posts with one UPDATE."""
+        if not deltas:
+            return
+        await self.db.execute(
+            update(Post)
+            .where(Post.id.in_(deltas))
+            .values(view_count=Post.view_count + case(deltas, value=Post.id, else_=0))
+            .execution_options(synchronize_session=False)
+        )
+        await self.db.commit()
+    
+    async def get_featured(self, limit: int = 5) -> list[PostListResponse]:
+        """Get featured posts."""
+        query = _with_list_columns(
+            select(Post.id)
             .where(Post.status == "published", Post.is_featured == True)
-            .order_by(Post.published_at.desc())
-            .limit(limit)
         )
-        return list(result.scalars().all())
+        result = await self.db.execute(
+            query.order_by(Post.published_at.desc()).limit(limit)
+        )
+        return await self._build_list_items(result.all())
     
     async def set_featured(self, post: Post, is_featured: bool) -> Post:
         """Set post featured status."""
         post.is_featured = is_featured
         await self.db.commit()
+        await response_cache.invalidate(POSTS)
         await self.db.refresh(post)
         return post
 
@@ -0,0 +1,185 @@
+"""
+Plain text derived from post content when a post is saved.
+
+Posts store TipTap JSON. Its text, word and character counts and a fallback
+excerpt are extracted once on create/update and stored on the post, so
+lists, search and reading-time display never walk the JSON tree.
+
+Backfill existing posts (only those without stored text, or all with --all):
+
+    python -m app.services.post_text [--all]
+"""
+import asyncio
+import re
+import sys
+from typing import Dict, NamedTuple, Optional
+
+from sqlalchemy import select
+
+from app.core.config import settings
+from app.core.logging import get_logger, setup_logging
+from app.db.session import async_session_maker
+from app.models.post import Post
+from app.search import POST, search_backend, setup_search
+
+logger = get_logger("post_text")
+
+# TipTap nodes rendered as their own line
+BLOCK_NODES = {
+    "paragraph",
+    "heading",
+    "blockquote",
+    "codeBlock",
+    "listItem",
+    "taskItem",
+    "tableCell",
+    "tableHeader",
+    "horizontalRule",
+    "image",
+}
+
+# CJK ideographs, kana and hangul are read one character at a time
+WORD_PATTERN = re.compile(
+    r"[\u3040-\u30ff\u3400-\u4dbf\u4e00-\u9fff\uac00-\ud7af\uf900-\ufaff]"
+    r"|[^\s\u3000-\u303f\u3040-\u30ff\u3400-\u4dbf\u4e00-\u9fff\uac00-\ud7af\uf900-\ufaff\uff00-\uffef]+"
+)
+
+
+class PostText(NamedTuple):
+    """Values stored on a post from its content."""
+    content_text: str
+    content_text_en: Optional[str]
+    word_count: int
+    char_count: int
+    auto_excerpt: Optional[str]
+
+
+def tiptap_to_text(content: Optional[dict]) -> str:
+    """
+    Plain text of a TipTap document, one line per block.
+    
+    Walks the tree with an explicit stack, so deeply nested documents cannot
+    exhaust the recursion limit.
+    """
+    if not content:
+        return ""
+    
+    lines: list[str] = []
+    line: list[str] = []
+    stack: list = [content]
+    while stack:
+        node = stack.pop()
+        if node is None:
+            # End of a block
+            if line:
+                lines.append("".join(line).strip())
+                line = []
+            continue
+        if not isinstance(node, dict):
+            continue
+        node_type = node.get("type")
+        if node_type == "text":
+            line.append(node.get("text") or "")
+        elif node_type == "hardBreak":
+            line.append("\n")
+        if node_type in BLOCK_NODES:
+            stack.append(None)
+        children = node.get("content")
+        if isinstance(children, list):
+            stack.extend(reversed(children))
+    if line:
+        lines.append("".join(line).strip())
+    return "\n".join(line for line in lines if line)
+
+
+def count_words(text: str) -> int:
+    """Words in ``text``, counting each CJK character as a word."""
+    return len(WORD_PATTERN.findall(text))
+
+
+def make_excerpt(text: str, max_length: Optional[int] = None) -> Optional[str]:
+    """First ``max_length`` characters of ``text``, cut at a space where possible."""
+    max_length = max_length or settings.POST_EXCERPT_LENGTH
+    text = " ".join(text.split())
+    if not text:
+        return None
+    if len(text) <= max_length:
+        return text
+    cut = text[:max_length - 1]
+    # Prefer a word boundary unless that loses most of the excerpt (CJK has none)
+    space = cut.rfind(" ")
+    if space > max_length // 2:
+        cut = cut[:space]
+    return cut.rstrip() + "…"
+
+
+def derive_post_text(content: Optional[dict], content_en: Optional[dict]) -> PostText:
+    """Extract everything PostText holds from the two content documents."""
+    text = tiptap_to_text(content)
+    text_en = tiptap_to_text(content_en) if content_en else None
+    return PostText(
+        content_text=text,
+        content_text_en=text_en or None,
+        word_count=count_words(text),
+        char_count=sum(1 for c in text if not c.isspace()),
+        auto_excerpt=make_excerpt(text),
+    )
+
+
+def post_search_text(post: Post) -> tuple[str, str]:
+    """Title and body text a post is indexed under, from its stored text."""
+    title = " ".join(filter(None, [post.title, post.title_en]))
+    body = " ".join(filter(None, [
+        post.excerpt,
+        post.content_text,
+        post.content_text_en,
+    ]))
+    return title, body
+
+
+def apply_post_text(post: Post) -> None:
+    """Store the derived text fields on ``post``."""
+    for field, value in derive_post_text(post.content, post.content_en)._asdict().items():
+        setattr(post, field, value)
+
+
+async def backfill(only_missing: bool = True, batch_size: int = 200) -> Dict[str, int]:
+    """
+    Derive and store the text fields of existing posts, reindexing them.
+    
+    Args:
+        only_missing: Skip posts that already have content_text
+        batch_size: Posts loaded per transaction
+    
+    Returns:
+        Number of posts updated
+    """
+    await setup_search()
+    updated = 0
+    async with async_session_maker() as db:
+        last_id = 0
+        while True:
+            query = select(Post).where(Post.id > last_id).order_by(Post.id).limit(batch_size)
+            if only_missing:
+                query = query.where(Post.content_text.is_(None))
+            posts = list((await db.execute(query)).scalars().all())
+            if not posts:
+                break
+            for post in posts:
+                apply_post_text(post)
+            await db.flush()
+            for post in posts:
+                await search_backend.index(db, POST, post.id, *post_search_text(post))
+            await db.commit()
+            updated += len(posts)
+            last_id = posts[-1].id
+            # Drop the loaded documents before the next batch
+            db.expunge_all()
+    
+    return {"posts": updated}
+
+
+if __name__ == "__main__":
+    setup_logging()
+    result = asyncio.run(backfill(only_missing="--all" not in sys.argv[1:]))
+    logger.info(f"Post text backfilled: {result}")
@@ -0,0 +1,115 @@
+"""
+Cached authentication principal.
+
+Authenticating a request only needs the user's id, role and active flag.
+These are cached in Redis (``principal:<user_id>``) for PRINCIPAL_CACHE_TTL
+with a short-lived in-process copy in front, so most requests authenticate
+without touching the database. Changing a user's role or active flag must
+call ``principal_cache.invalidate``; other workers drop their in-process
+copy within PRINCIPAL_L1_TTL.
+"""
+import json
+import time
+from collections import OrderedDict
+from typing import Awaitable, Callable, NamedTuple, Optional, Tuple
+
+from redis.exceptions import RedisError
+
+from app.core.config import settings
+from app.core.deps import get_redis
+from app.core.logging import get_logger
+
+logger = get_logger("principal_cache")
+
+KEY_PREFIX = "principal:"
+
+
+class Principal(NamedTuple):
+    """The authenticated user as far as authorization is concerned."""
+    id: int
+    role: str
+    is_active: bool
+    
+    @property
+    def is_admin(self) -> bool:
+        return self.role == "admin"
+
+
+PrincipalLoader = Callable[[], Awaitable[Optional[Principal]]]
+
+
+def _key(user_id: int) -> str:
+    return f"{KEY_PREFIX}{user_id}"
+
+
+class PrincipalCache:
+    """Two-level (in-process, Redis) cache of principals by user id."""
+    
+    def __init__(self):
+        # user_id -> (L1 expiry, principal)
+        self._local: OrderedDict[int, Tuple[float, Principal]] = OrderedDict()
+    
+    async def get(self, user_id: int, loader: PrincipalLoader) -> Optional[Principal]:
+        """
+        Get a user's principal, loading and caching it on a miss.
+        
+        Args:
+            user_id: User ID
+            loader: Reads the principal from the database (None if no such user)
+        
+        Returns:
+            Principal, or None if the user does not exist
+        """
+        entry = self._local.get(user_id)
+        if entry is not None:
+            if entry[0] > time.monotonic():
+                return entry[1]
+            del self._local[user_id]
+        
+        redis = None
+        try:
+            redis = await get_redis()
+            raw = await redis.get(_key(user_id))
+            if raw:
+                principal = Principal(*json.loads(raw))
+                self._set_local(principal)
+                return principal
+        except RedisError as e:
+            logger.warning(f"Principal cache unavailable: {e}")
+            redis = None
+        
+        principal = await loader()
+        if principal is None:
+            return None
+        if redis is not None:
+            try:
+                await redis.set(
+                    _key(user_id), json.dumps(list(principal)), ex=settings.PRINCIPAL_CACHE_TTL
+                )
+            except RedisError as e:
+                logger.warning(f"Could not cache principal {user_id}: {e}")
+        self._set_local(principal)
+        return principal
+    
+    async def invalidate(self, user_id: int) -> None:
+        """Forget a user's principal after their role or active flag changed."""
+        self._local.pop(user_id, None)
+        try:
+            redis = await get_redis()
+            await redis.delete(_key(user_id))
+        except RedisError as e:
+            logger.warning(f"Principal invalidation for {user_id} failed: {e}")
+    
+    def clear_local(self) -> None:
+        """Drop this worker's in-process copies."""
+        self._local.clear()
+    
+    def _set_local(self, principal: Principal) -> None:
+        self._local[principal.id] = (time.monotonic() + settings.PRINCIPAL_L1_TTL, principal)
+        self._local.move_to_end(principal.id)
+        while len(self._local) > settings.PRINCIPAL_L1_MAX_ENTRIES:
+            self._local.popitem(last=False)
+
+
+# Global cache instance
+principal_cache = PrincipalCache()
@@ -0,0 +1,271 @@
+"""
+Tagged read-through cache for public, viewer-independent responses.
+
+Rendered JSON bodies are stored in Redis under a key built from the endpoint
+and its normalized query parameters, with a short-lived in-process copy (L1)
+in front. Each entry records the version of every tag it depends on
+(``posts``, ``categories``, ``tags``); invalidating a tag bumps its version,
+which retires all dependent entries at once without scanning for keys. L1
+copies are dropped in the invalidating worker right away and expire in the
+others within CACHE_L1_TTL.
+
+Entries are fresh for CACHE_TTL and kept CACHE_STALE_TTL longer. The first
+request to find a stale entry refreshes it under a Redis lock while everyone
+else keeps serving the old body, and concurrent misses for one key inside a
+worker share a single computation, so an expiring hot key is rebuilt once
+rather than by every request that arrives meanwhile.
+
+Loaders are given a primary database session the cache opens for the
+computation. A shared computation outlives the request that started it, so
+it must not use that request's session, which is closed if the client
+disconnects; and an entry every client will be served must not be built
+from a replica that may not have seen the write that retired the last one.
+"""
+import asyncio
+import hashlib
+import json
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional, Tuple
+
+from fastapi import Response
+from fastapi.encoders import jsonable_encoder
+from redis import asyncio as aioredis
+from redis.exceptions import RedisError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.deps import get_redis
+from app.core.logging import get_logger
+from app.db.session import async_session_maker
+
+logger = get_logger("response_cache")
+
+# Cache tags
+POSTS = "posts"
+CATEGORIES = "categories"
+TAGS = "tags"
+
+ENTRY_KEY = "cache:entry:{key}"
+LOCK_KEY = "cache:lock:{key}"
+TAG_KEY = "cache:tag:{tag}"
+
+# Produces the response value from a session opened by the cache
+Loader = Callable[[AsyncSession], Awaitable[Any]]
+
+
+def make_key(namespace: str, params: Dict[str, Any]) -> str:
+    """Build a cache key from an endpoint name and its query parameters."""
+    normalized = {name: value for name, value in params.items() if value is not None}
+    raw = json.dumps(normalized, sort_keys=True, separators=(",", ":"), default=str)
+    return f"{namespace}:{hashlib.sha1(raw.encode('utf-8')).hexdigest()}"
+
+
+def render(value: Any) -> str:
+    """Serialize a response value the way FastAPI's JSONResponse does."""
+    return json.dumps(
+        jsonable_encoder(value),
+        ensure_ascii=False,
+        allow_nan=False,
+        separators=(",", ":"),
+    )
+
+
+class ResponseCache:
+    """Two-level tagged response cache with single-flight refreshes."""
+    
+    def __init__(self):
+        # key -> (L1 expiry, tags, body)
+        self._l1: OrderedDict[str, Tuple[float, Tuple[str, ...], str]] = OrderedDict()
+        self._inflight: Dict[str, asyncio.Task] = {}
+    
+    async def get_or_set(
+        self,
+        namespace: str,
+        params: Dict[str, Any],
+        tags: Iterable[str],
+        loader: Loader,
+        ttl: Optional[int] = None,
+        bypass: bool = False,
+    ) -> str:
+        """
+        Get a cached body, computing and storing it on a miss.
+        
+        Clients that must see their own recent writes pass ``bypass``: the
+        body is then computed for them alone and neither read nor stored.
+        
+        Args:
+            namespace: Endpoint name, e.g. ``posts:list``
+            params: Query parameters the response depends on
+            tags: Tags whose invalidation must retire this entry
+            loader: Produces the response value (models, lists, dicts)
+                from the database session it is given
+            ttl: Seconds the entry is fresh (default CACHE_TTL)
+            bypass: Skip the cache and compute the body on the primary
+        
+        Returns:
+            JSON body
+        """
+        if bypass:
+            return await self._load(loader)
+        
+        key = make_key(namespace, params)
+        body = self._l1_get(key)
+        if body is not None:
+            return body
+        
+        # Concurrent misses in this worker wait for the same computation
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.create_task(
+                self._fetch(key, tuple(sorted(tags)), loader, ttl or settings.CACHE_TTL)
+            )
+            self._inflight[key] = task
+            task.add_done_callback(lambda done: self._forget(key, done))
+        return await asyncio.shield(task)
+    
+    async def invalidate(self, *tags: str) -> None:
+        """Retire every entry that depends on any of ``tags``."""
+        for key in [k for k, (_, entry_tags, _) in self._l1.items() if set(entry_tags) & set(tags)]:
+            del self._l1[key]
+        try:
+            redis = await get_redis()
+            async with redis.pipeline(transaction=False) as pipe:
+                for tag in tags:
+                    pipe.incr(TAG_KEY.format(tag=tag))
+                await pipe.execute()
+        except RedisError as e:
+            logger.warning(f"Cache invalidation of {tags} failed: {e}")
+    
+    def clear_local(self) -> None:
+        """Drop this worker's L1 copies."""
+        self._l1.clear()
+    
+    def _forget(self, key: str, task: asyncio.Task) -> None:
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+        # Mark the error retrieved when the requester that started it went away
+        if not task.cancelled():
+            task.exception()
+    
+    def _l1_get(self, key: str) -> Optional[str]:
+        entry = self._l1.get(key)
+        if entry is None:
+            return None
+        expires, _, body = entry
+        if expires <= time.monotonic():
+            del self._l1[key]
+            return None
+        return body
+    
+    def _l1_set(self, key: str, tags: Tuple[str, ...], body: str) -> None:
+        self._l1[key] = (time.monotonic() + settings.CACHE_L1_TTL, tags, body)
+        self._l1.move_to_end(key)
+        while len(self._l1) > settings.CACHE_L1_MAX_ENTRIES:
+            self._l1.popitem(last=False)
+    
+    async def _read(
+        self,
+        redis: aioredis.Redis,
+        key: str,
+        tags: Tuple[str, ...],
+    ) -> Tuple[Optional[dict], List[int]]:
+        """Fetch the stored entry and the current tag versions in one round trip."""
+        async with redis.pipeline(transaction=False) as pipe:
+            pipe.get(ENTRY_KEY.format(key=key))
+            pipe.mget([TAG_KEY.format(tag=tag) for tag in tags])
+            raw, versions = await pipe.execute()
+        versions = [int(v or 0) for v in versions]
+        entry = json.loads(raw) if raw else None
+        if entry is not None and entry["versions"] != versions:
+            entry = None
+        return entry, versions
+    
+    async def _fetch(
+        self,
+        key: str,
+        tags: Tuple[str, ...],
+        loader: Loader,
+        ttl: int,
+    ) -> str:
+        try:
+            redis = await get_redis()
+            entry, versions = await self._read(redis, key, tags)
+            lock_key = LOCK_KEY.format(key=key)
+            
+            if entry is not None and entry["expires"] > time.time():
+                self._l1_set(key, tags, entry["body"])
+                return entry["body"]
+            
+            locked = await redis.set(lock_key, "1", nx=True, ex=settings.CACHE_LOCK_TIMEOUT)
+            if not locked:
+                # Another worker is refreshing: serve stale, or wait for its result
+                if entry is not None:
+                    return entry["body"]
+                body = await self._wait_for(redis, key, tags)
+                if body is not None:
+                    return body
+        except RedisError as e:
+            logger.warning(f"Response cache unavailable, computing {key}: {e}")
+            return await self._load(loader)
+        
+        try:
+            body = await self._load(loader)
+            payload = json.dumps({
+                "versions": versions,
+                "expires": time.time() + ttl,
+                "body": body,
+            })
+            try:
+                await redis.set(
+                    ENTRY_KEY.format(key=key), payload, ex=ttl + settings.CACHE_STALE_TTL
+                )
+            except RedisError as e:
+                logger.warning(f"Could not store cached response {key}: {e}")
+                return body
+            self._l1_set(key, tags, body)
+            return body
+        finally:
+            if locked:
+                try:
+                    await redis.delete(lock_key)
+                except RedisError:
+                    pass
+    
+    async def _load(self, loader: Loader) -> str:
+        """Run a loader on its own primary session and render the result."""
+        async with async_session_maker() as db:
+            return render(await loader(db))
+    
+    async def _wait_for(
+        self,
+        redis: aioredis.Redis,
+        key: str,
+        tags: Tuple[str, ...],
+    ) -> Optional[str]:
+        """Poll for an entry another worker is computing, up to CACHE_LOCK_WAIT."""
+        deadline = time.monotonic() + settings.CACHE_LOCK_WAIT
+        while time.monotonic() < deadline:
+            await asyncio.sleep(0.05)
+            entry, _ = await self._read(redis, key, tags)
+            if entry is not None:
+                self._l1_set(key, tags, entry["body"])
+                return entry["body"]
+        return None
+
+
+# Global cache instance
+response_cache = ResponseCache()
+
+
+async def cached_response(
+    namespace: str,
+    params: Dict[str, Any],
+    tags: Iterable[str],
+    loader: Loader,
+    ttl: Optional[int] = None,
+    bypass: bool = False,
+) -> Response:
+    """Serve ``loader``'s result through the response cache as a JSON response."""
+    body = await response_cache.get_or_set(namespace, params, tags, loader, ttl, bypass)
+    return Response(content=body, media_type="application/json")
@@ -0,0 +1,293 @@
+"""
+Per-user unread counters for notifications and messages.
+
+Counts live in a Redis hash per user (``unread:<user_id>``) and are adjusted
+as notifications and messages are created or read, so reading them is a
+single HGET. A counter that is missing is computed from the database and
+stored; increments only touch counters that already exist, so a cold
+counter is never double-counted.
+
+A reader takes a lease (a ``<kind>:loading`` token) before counting in the
+database. An increment or invalidation that arrives while the counter is
+being loaded cancels the lease, and the loaded count, which may predate it,
+is then returned but not stored; the next read recounts. Anything that
+still drifts (a failed write, a cascade delete) is corrected by the
+periodic reconciliation.
+"""
+import asyncio
+import secrets
+from typing import Awaitable, Callable, Dict, Iterable, List
+
+from redis.exceptions import RedisError
+from sqlalchemy.exc import SQLAlchemyError
+
+from app.core.config import settings
+from app.core.deps import get_redis
+from app.core.logging import get_logger
+from app.db.session import async_session_maker
+
+logger = get_logger("unread_counter")
+
+NOTIFICATIONS = "notifications"
+MESSAGES = "messages"
+
+KEY_PREFIX = "unread:"
+RECONCILE_LOCK_KEY = "unread_reconcile_lock"
+
+# Loads exact counts from the database for users without a cached counter
+CountLoader = Callable[[List[int]], Awaitable[Dict[int, int]]]
+
+# KEYS: counter hash. ARGV: field, delta, ttl. Never goes below zero.
+# A missing counter is left alone, but a load in progress loses its lease.
+_ADD_SCRIPT = """
+if redis.call('HEXISTS', KEYS[1], ARGV[1]) == 0 then
+    redis.call('HDEL', KEYS[1], ARGV[1] .. ':loading')
+    return nil
+end
+local value = redis.call('HINCRBY', KEYS[1], ARGV[1], ARGV[2])
+if value < 0 then
+    redis.call('HSET', KEYS[1], ARGV[1], 0)
+    value = 0
+end
+redis.call('EXPIRE', KEYS[1], ARGV[3])
+return value
+"""
+
+# KEYS: counter hash. ARGV: field, lease token, count, ttl. Stores the
+# loaded count only if the lease is still held; returns 1 if stored.
+_STORE_SCRIPT = """
+local lease = ARGV[1] .. ':loading'
+if redis.call('HGET', KEYS[1], lease) ~= ARGV[2] then
+    return 0
+end
+redis.call('HDEL', KEYS[1], lease)
+redis.call('HSETNX', KEYS[1], ARGV[1], ARGV[3])
+redis.call('EXPIRE', KEYS[1], ARGV[4])
+return 1
+"""
+
+
+def _key(user_id: int) -> str:
+    return f"{KEY_PREFIX}{user_id}"
+
+
+def _lease(kind: str) -> str:
+    return f"{kind}:loading"
+
+
+class UnreadCounter:
+    """Redis-backed unread counters with a database fallback."""
+    
+    def __init__(self):
+        self._add_script = None
+        self._store_script = None
+    
+    async def _redis(self):
+        redis = await get_redis()
+        if self._add_script is None:
+            self._add_script = redis.register_script(_ADD_SCRIPT)
+            self._store_script = redis.register_script(_STORE_SCRIPT)
+        return redis
+    
+    async def get_many(
+        self,
+        kind: str,
+        user_ids: Iterable[int],
+        loader: CountLoader,
+    ) -> Dict[int, int]:
+        """
+        Get counters for several users.
+        
+        Args:
+            kind: NOTIFICATIONS or MESSAGES
+            user_ids: Users to read
+            loader: Computes exact counts for users without a cached value
+        
+        Returns:
+            Mapping of user ID to unread count (every requested user)
+        """
+        user_ids = list(dict.fromkeys(user_ids))
+        if not user_ids:
+            return {}
+        
+        try:
+            redis = await self._redis()
+            async with redis.pipeline(transaction=False) as pipe:
+                for user_id in user_ids:
+                    pipe.hget(_key(user_id), kind)
+                cached = await pipe.execute()
+        except RedisError as e:
+            logger.warning(f"Unread counters unavailable, counting in database: {e}")
+            loaded = await loader(user_ids)
+            return {user_id: loaded.get(user_id, 0) for user_id in user_ids}
+        
+        counts = {
+            user_id: int(value)
+            for user_id, value in zip(user_ids, cached)
+            if value is not None
+        }
+        missing = [user_id for user_id in user_ids if user_id not in counts]
+        if missing:
+            # Take the leases before counting, so a change committed while
+            # the loader runs keeps its result out of the cache
+            token = secrets.token_hex(8)
+            try:
+                async with redis.pipeline(transaction=False) as pipe:
+                    for user_id in missing:
+                        pipe.hset(_key(user_id), _lease(kind), token)
+                        pipe.expire(_key(user_id), settings.UNREAD_COUNTER_TTL)
+                    await pipe.execute()
+                leased = True
+            except RedisError as e:
+                logger.warning(f"Could not cache unread counters: {e}")
+                leased = False
+            
+            loaded = await loader(missing)
+            for user_id in missing:
+                counts[user_id] = loaded.get(user_id, 0)
+            
+            if leased:
+                try:
+                    async with redis.pipeline(transaction=False) as pipe:
+                        for user_id in missing:
+                            await self._store_script(
+                                keys=[_key(user_id)],
+                                args=[kind, token, counts[user_id], settings.UNREAD_COUNTER_TTL],
+                                client=pipe,
+                            )
+                        await pipe.execute()
+                except RedisError as e:
+                    logger.warning(f"Could not cache unread counters: {e}")
+        return counts
+    
+    async def get(self, kind: str, user_id: int, loader: CountLoader) -> int:
+        """Get one user's counter."""
+        counts = await self.get_many(kind, [user_id], loader)
+        return counts[user_id]
+    
+    async def add_many(self, kind: str, deltas: Dict[int, int]) -> None:
+        """Adjust counters of several users; missing counters are left to load lazily."""
+        deltas = {user_id: delta for user_id, delta in deltas.items() if delta}
+        if not deltas:
+            return
+        try:
+            redis = await self._redis()
+            async with redis.pipeline(transaction=False) as pipe:
+                for user_id, delta in deltas.items():
+                    await self._add_script(
+                        keys=[_key(user_id)],
+                        args=[kind, delta, settings.UNREAD_COUNTER_TTL],
+                        client=pipe,
+                    )
+                await pipe.execute()
+        except RedisError as e:
+            # The stale counters are dropped so the next read recounts
+            logger.warning(f"Unread counter update failed: {e}")
+            await self.invalidate(kind, deltas.keys())
+    
+    async def add(self, kind: str, user_id: int, delta: int) -> None:
+        """Adjust one user's counter."""
+        await self.add_many(kind, {user_id: delta})
+    
+    async def reset(self, kind: str, user_id: int) -> None:
+        """Set a counter to zero (everything was marked read)."""
+        try:
+            redis = await self._redis()
+            async with redis.pipeline(transaction=False) as pipe:
+                pipe.hset(_key(user_id), kind, 0)
+                pipe.expire(_key(user_id), settings.UNREAD_COUNTER_TTL)
+                await pipe.execute()
+        except RedisError as e:
+            logger.warning(f"Unread counter reset failed: {e}")
+            await self.invalidate(kind, [user_id])
+    
+    async def invalidate(self, kind: str, user_ids: Iterable[int]) -> None:
+        """Drop counters so they are recounted on the next read."""
+        try:
+            redis = await self._redis()
+            async with redis.pipeline(transaction=False) as pipe:
+                for user_id in user_ids:
+                    pipe.hdel(_key(user_id), kind, _lease(kind))
+                await pipe.execute()
+        except RedisError as e:
+            logger.warning(f"Unread counter invalidation failed: {e}")
+    
+    async def reconcile(self, loaders: Dict[str, CountLoader], batch_size: int = 500) -> int:
+        """
+        Recount every cached counter from the database.
+        
+        Args:
+            loaders: Loader for each counter kind
+            batch_size: Users recounted per round of queries
+        
+        Returns:
+            Number of counters corrected
+        """
+        redis = await self._redis()
+        corrected = 0
+        batch: List[int] = []
+        
+        async def flush_batch() -> int:
+            fixed = 0
+            async with redis.pipeline(transaction=False) as pipe:
+                for user_id in batch:
+                    pipe.hgetall(_key(user_id))
+                cached = dict(zip(batch, await pipe.execute()))
+            for kind, loader in loaders.items():
+                users = [user_id for user_id in batch if kind in cached[user_id]]
+                if not users:
+                    continue
+                actual = await loader(users)
+                async with redis.pipeline(transaction=False) as pipe:
+                    for user_id in users:
+                        count = actual.get(user_id, 0)
+                        if int(cached[user_id][kind]) != count:
+                            pipe.hset(_key(user_id), kind, count)
+                            fixed += 1
+                    await pipe.execute()
+            return fixed
+        
+        async for key in redis.scan_iter(match=f"{KEY_PREFIX}*", count=batch_size):
+            batch.append(int(key[len(KEY_PREFIX):]))
+            if len(batch) >= batch_size:
+                corrected += await flush_batch()
+                batch = []
+        if batch:
+            corrected += await flush_batch()
+        return corrected
+
+
+# Global counter instance
+unread_counter = UnreadCounter()
+
+
+async def reconcile_unread_counters() -> int:
+    """Recount all cached counters; one worker at a time. Returns counters corrected."""
+    # Imported here because both services import this module
+    from app.services.message_service import MessageService
+    from app.services.notification_service import NotificationService
+    
+    redis = await get_redis()
+    lock_ttl = max(settings.UNREAD_RECONCILE_INTERVAL, 60)
+    if not await redis.set(RECONCILE_LOCK_KEY, "1", nx=True, ex=lock_ttl):
+        return 0
+    try:
+        async with async_session_maker() as db:
+            return await unread_counter.reconcile({
+                NOTIFICATIONS: NotificationService(db).count_unread_many,
+                MESSAGES: MessageService(db).count_unread_many,
+            })
+    finally:
+        await redis.delete(RECONCILE_LOCK_KEY)
+
+
+async def run_unread_reconciler() -> None:
+    """Reconcile counters every UNREAD_RECONCILE_INTERVAL seconds until cancelled."""
+    while True:
+        await asyncio.sleep(settings.UNREAD_RECONCILE_INTERVAL)
+        try:
+            corrected = await reconcile_unread_counters()
+            if corrected:
+                logger.info(f"Corrected {corrected} drifted unread counters")
+        except (RedisError, SQLAlchemyError) as e:
+            logger.warning(f"Unread counter reconciliation failed: {e}")
@@ -3,12 +3,28 @@ User service for business logic.
 """
 from typing import Optional
 
+from redis.exceptions import RedisError
 from sqlalchemy import select, or_
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.models.user import User
 from app.schemas.user import UserCreate, UserUpdate
-from app.core.security import get_password_hash, verify_password
+from app.core.deps import get_redis
+from app.core.logging import get_logger
+from app.core.security import password_hasher, password_needs_rehash
+from app.core.tokens import revoke_user_tokens
+from app.search import USER, search_backend
+from app.services.principal_cache import Principal, principal_cache
+
+logger = get_logger("user_service")
+
+# Profile fields the admin user search matches
+SEARCHABLE_FIELDS = {"username", "email", "nickname"}
+
+
+def user_search_text(user) -> tuple[str, str]:
+    """Title and body of a user's search document (username; nickname and email)."""
+    return user.username, " ".join(filter(None, (user.nickname, user.email)))
 
 
 class UserService:
@@ -24,6 +40,14 @@ class UserService:
         )
         return result.scalar_one_or_none()
     
+    async def get_principal(self, user_id: int) -> Optional[Principal]:
+        """Get just the fields authorization needs, without the full row."""
+        result = await self.db.execute(
+            select(User.id, User.role, User.is_active).where(User.id == user_id)
+        )
+        row = result.one_or_none()
+        return Principal(*row) if row else None
+    
     async def get_by_username(self, username: str) -> Optional[User]:
         """Get user by username."""
         result = await self.db.execute(
@@ -56,10 +80,12 @@ class UserService:
         user = User(
             username=user_create.username.lower(),
             email=user_create.email.lower(),
-            password_hash=get_password_hash(user_create.password),
+            password_hash=await password_hasher.hash(user_create.password),
             nickname=user_create.username,  # Default nickname to username
         )
         self.db.add(user)
+        await self.db.flush()
+        await search_backend.index(self.db, USER, user.id, *user_search_text(user))
         await self.db.commit()
         await self.db.refresh(user)
         return user
@@ -70,6 +96,8 @@ class UserService:
         
         for field, value in update_data.items():
             setattr(user, field, value)
+        if SEARCHABLE_FIELDS & update_data.keys():
+            await search_backend.index(self.db, USER, user.id, *user_search_text(user))
         
         await self.db.commit()
         await self.db.refresh(user)
@@ -89,10 +117,10 @@ class UserService:
         new_password: str
     ) -> bool:
         """Update user password."""
-        if not verify_password(current_password, user.password_hash):
+        if not await password_hasher.verify(current_password, user.password_hash):
             return False
         
-        user.password_hash = get_password_hash(new_password)
+        user.password_hash = await password_hasher.hash(new_password)
         await self.db.commit()
         return True
     
@@ -101,7 +129,12 @@ class UserService:
         username: str, 
         password: str
     ) -> Optional[User]:
-        """Authenticate user by username/email and password."""
+        """
+        Authenticate user by username/email and password.
+        
+        A password hashed with a different cost than BCRYPT_ROUNDS is
+        rehashed while the plain text is at hand.
+        """
         user = await self.get_by_username_or_email(username)
         
         if not user:
@@ -110,9 +143,13 @@ class UserService:
         if not user.is_active:
             return None
         
-        if not verify_password(password, user.password_hash):
+        if not await password_hasher.verify(password, user.password_hash):
             return None
         
+        if password_needs_rehash(user.password_hash):
+            user.password_hash = await password_hasher.hash(password)
+            await self.db.commit()
+        
         return user
     
     async def check_username_exists(self, username: str) -> bool:
@@ -129,13 +166,24 @@ class UserService:
         """Deactivate user account."""
         user.is_active = False
         await self.db.commit()
+        await principal_cache.invalidate(user.id)
+        await self.revoke_sessions(user.id)
         await self.db.refresh(user)
         return user
     
+    async def revoke_sessions(self, user_id: int) -> None:
+        """Revoke every access token issued to the user so far."""
+        try:
+            await revoke_user_tokens(await get_redis(), user_id)
+        except RedisError as e:
+            # The principal's active flag still locks a deactivated user out
+            logger.warning(f"Token revocation for user {user_id} failed: {e}")
+    
     async def activate(self, user: User) -> User:
         """Activate user account."""
         user.is_active = True
         await self.db.commit()
+        await principal_cache.invalidate(user.id)
         await self.db.refresh(user)
         return user
     
@@ -146,6 +194,7 @@ class UserService:
         
         user.role = role
         await self.db.commit()
+        await principal_cache.invalidate(user.id)
         await self.db.refresh(user)
         return user
 
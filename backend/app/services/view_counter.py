@@ -0,0 +1,107 @@
+"""
+Buffered post view counter.
+
+Views are accumulated in Redis and written to ``posts.view_count`` in
+batches, so reading a post never takes a row lock. A viewer is counted at
+most once per post every VIEW_COUNT_DEDUP_SECONDS.
+"""
+import asyncio
+
+from redis import asyncio as aioredis
+from redis.exceptions import RedisError
+from sqlalchemy.exc import SQLAlchemyError
+
+from app.core.config import settings
+from app.core.logging import get_logger
+from app.db.session import async_session_maker
+from app.services.post_service import PostService
+
+logger = get_logger("view_counter")
+
+PENDING_KEY = "post_views:pending"
+FLUSHING_KEY = "post_views:flushing"
+FLUSH_LOCK_KEY = "post_views:flush_lock"
+SEEN_KEY = "post_views:seen:{post_id}:{viewer}"
+
+# Count the view unless the viewer is still inside its window, then return
+# the post's unflushed delta. KEYS: seen key, pending hash.
+# ARGV: post id, window seconds.
+_RECORD_SCRIPT = """
+if redis.call('SET', KEYS[1], '1', 'NX', 'EX', ARGV[2]) then
+    return redis.call('HINCRBY', KEYS[2], ARGV[1], 1)
+end
+return tonumber(redis.call('HGET', KEYS[2], ARGV[1]) or '0')
+"""
+
+
+class ViewCounter:
+    """Redis-side view buffer with a bulk flush into the posts table."""
+
+    def __init__(self, redis: aioredis.Redis):
+        self.redis = redis
+        self._record = redis.register_script(_RECORD_SCRIPT)
+
+    async def record(self, post_id: int, viewer: str) -> int:
+        """
+        Count a view of a post.
+
+        Args:
+            post_id: Post ID
+            viewer: Stable viewer key (user ID or client address)
+
+        Returns:
+            Views of this post not yet flushed to the database
+        """
+        pending = await self._record(
+            keys=[SEEN_KEY.format(post_id=post_id, viewer=viewer), PENDING_KEY],
+            args=[post_id, settings.VIEW_COUNT_DEDUP_SECONDS],
+        )
+        return int(pending)
+
+    async def flush(self) -> int:
+        """
+        Write pending view deltas to the database.
+
+        The pending hash is renamed away atomically, so views recorded during
+        the flush land in a fresh hash. A leftover flushing hash from a failed
+        run is retried before new deltas are taken.
+
+        Returns:
+            Number of posts updated
+        """
+        # Only one worker flushes at a time
+        lock_ttl = max(settings.VIEW_COUNT_FLUSH_INTERVAL, 10)
+        if not await self.redis.set(FLUSH_LOCK_KEY, "1", nx=True, ex=lock_ttl):
+            return 0
+        try:
+            if not await self.redis.exists(FLUSHING_KEY):
+                if not await self.redis.exists(PENDING_KEY):
+                    return 0
+                await self.redis.rename(PENDING_KEY, FLUSHING_KEY)
+
+            raw = await self.redis.hgetall(FLUSHING_KEY)
+            deltas = {int(post_id): int(count) for post_id, count in raw.items()}
+            async with async_session_maker() as db:
+                await PostService(db).add_view_counts(deltas)
+            await self.redis.delete(FLUSHING_KEY)
+            return len(deltas)
+        finally:
+            await self.redis.delete(FLUSH_LOCK_KEY)
+
+    async def pending_views(self) -> int:
+        """Views recorded but not yet written to the database."""
+        total = 0
+        for key in (FLUSHING_KEY, PENDING_KEY):
+            total += sum(int(count) for count in await self.redis.hvals(key))
+        return total
+
+
+async def run_view_flusher(redis: aioredis.Redis) -> None:
+    """Flush buffered views every VIEW_COUNT_FLUSH_INTERVAL seconds until cancelled."""
+    counter = ViewCounter(redis)
+    while True:
+        await asyncio.sleep(settings.VIEW_COUNT_FLUSH_INTERVAL)
+        try:
+            await counter.flush()
+        except (RedisError, SQLAlchemyError) as e:
+            logger.warning(f"View count flush failed: {e}")
@@ -0,0 +1,258 @@
+"""
+Message brokers for WebSocket fan-out.
+
+Each worker process only holds its own sockets, so messages are published
+to a per-user channel and every worker subscribed to that channel delivers
+them locally. Presence (who is online anywhere) lives in the broker too.
+"""
+import asyncio
+import uuid
+from abc import ABC, abstractmethod
+from collections import Counter
+from typing import Awaitable, Callable, Dict, Iterable, Optional, Set
+
+from redis import asyncio as aioredis
+from redis.exceptions import RedisError
+
+from app.core.config import settings
+from app.core.logging import get_logger
+
+logger = get_logger("websocket")
+
+# Called with (channel, payload) for every message on a subscribed channel
+MessageHandler = Callable[[str, str], Awaitable[None]]
+
+BROADCAST_CHANNEL = "ws:broadcast"
+
+
+def user_channel(user_id: int) -> str:
+    """Channel carrying messages for one user."""
+    return f"ws:user:{user_id}"
+
+
+class Broker(ABC):
+    """Pub/sub and presence backend shared by all workers."""
+    
+    async def start(self) -> None:
+        """Open connections and start background tasks."""
+    
+    async def close(self) -> None:
+        """Stop background tasks and release connections."""
+    
+    @abstractmethod
+    async def publish(self, channel: str, payload: str) -> None:
+        """Publish a serialized message to a channel."""
+    
+    @abstractmethod
+    async def subscribe(self, channel: str, handler: MessageHandler) -> None:
+        """Deliver messages on ``channel`` to ``handler``."""
+    
+    @abstractmethod
+    async def unsubscribe(self, channel: str, handler: MessageHandler) -> None:
+        """Stop delivering ``channel`` to ``handler``."""
+    
+    @abstractmethod
+    async def mark_online(self, user_id: int) -> None:
+        """Record that this worker holds a connection for the user."""
+    
+    @abstractmethod
+    async def mark_offline(self, user_id: int) -> None:
+        """Record that this worker no longer holds a connection for the user."""
+    
+    async def refresh_presence(self, user_ids: Iterable[int]) -> None:
+        """Keep this worker's presence entries from expiring."""
+    
+    @abstractmethod
+    async def is_online(self, user_id: int) -> bool:
+        """Check if the user is connected to any worker."""
+    
+    @abstractmethod
+    async def online_count(self) -> int:
+        """Number of distinct users connected to any worker."""
+
+
+class InMemoryBroker(Broker):
+    """
+    Single-process broker.
+    
+    Several ConnectionManagers sharing one instance behave like workers
+    sharing a Redis, which is what tests use it for.
+    """
+    
+    def __init__(self):
+        self._handlers: Dict[str, Set[MessageHandler]] = {}
+        self._presence: Counter[int] = Counter()
+    
+    async def publish(self, channel: str, payload: str) -> None:
+        for handler in list(self._handlers.get(channel, ())):
+            await handler(channel, payload)
+    
+    async def subscribe(self, channel: str, handler: MessageHandler) -> None:
+        self._handlers.setdefault(channel, set()).add(handler)
+    
+    async def unsubscribe(self, channel: str, handler: MessageHandler) -> None:
+        handlers = self._handlers.get(channel)
+        if handlers is not None:
+            handlers.discard(handler)
+            if not handlers:
+                del self._handlers[channel]
+    
+    async def mark_online(self, user_id: int) -> None:
+        self._presence[user_id] += 1
+    
+    async def mark_offline(self, user_id: int) -> None:
+        self._presence[user_id] -= 1
+        if self._presence[user_id] <= 0:
+            del self._presence[user_id]
+    
+    async def is_online(self, user_id: int) -> bool:
+        return user_id in self._presence
+    
+    async def online_count(self) -> int:
+        return len(self._presence)
+
+
+# Presence layout: ws:presence:<user_id> is a sorted set of worker ids and
+# ws:online a sorted set of user ids, both scored by expiry time. Entries of
+# a worker that dies without cleaning up simply expire.
+PRESENCE_USER_KEY = "ws:presence:{user_id}"
+ONLINE_KEY = "ws:online"
+
+# KEYS: user presence key, online key. ARGV: worker id, user id, expiry, ttl
+_MARK_ONLINE_SCRIPT = """
+redis.call('ZADD', KEYS[1], ARGV[3], ARGV[1])
+redis.call('EXPIRE', KEYS[1], ARGV[4])
+local current = tonumber(redis.call('ZSCORE', KEYS[2], ARGV[2]) or '0')
+if current < tonumber(ARGV[3]) then
+    redis.call('ZADD', KEYS[2], ARGV[3], ARGV[2])
+end
+return 1
+"""
+
+# KEYS: user presence key, online key. ARGV: worker id, user id, now
+_MARK_OFFLINE_SCRIPT = """
+redis.call('ZREM', KEYS[1], ARGV[1])
+redis.call('ZREMRANGEBYSCORE', KEYS[1], '-inf', ARGV[3])
+if redis.call('ZCARD', KEYS[1]) == 0 then
+    redis.call('DEL', KEYS[1])
+    redis.call('ZREM', KEYS[2], ARGV[2])
+end
+return 1
+"""
+
+
+class RedisBroker(Broker):
+    """Broker backed by Redis pub/sub, shared by every worker."""
+    
+    def __init__(self, redis: aioredis.Redis, presence_ttl: Optional[int] = None):
+        self.redis = redis
+        self.worker_id = uuid.uuid4().hex
+        self.presence_ttl = presence_ttl or settings.WS_PRESENCE_TTL
+        self._pubsub = redis.pubsub()
+        self._handlers: Dict[str, Set[MessageHandler]] = {}
+        self._local_users: Set[int] = set()
+        self._reader: Optional[asyncio.Task] = None
+        self._heartbeat: Optional[asyncio.Task] = None
+        self._mark_online = redis.register_script(_MARK_ONLINE_SCRIPT)
+        self._mark_offline = redis.register_script(_MARK_OFFLINE_SCRIPT)
+    
+    async def start(self) -> None:
+        # The reader needs at least one subscription before it can poll
+        await self._pubsub.subscribe(BROADCAST_CHANNEL)
+        self._reader = asyncio.create_task(self._read_loop())
+        self._heartbeat = asyncio.create_task(self._heartbeat_loop())
+    
+    async def close(self) -> None:
+        for task in (self._reader, self._heartbeat):
+            if task is not None:
+                task.cancel()
+        for user_id in list(self._local_users):
+            await self.mark_offline(user_id)
+        await self._pubsub.aclose()
+    
+    async def publish(self, channel: str, payload: str) -> None:
+        await self.redis.publish(channel, payload)
+    
+    async def subscribe(self, channel: str, handler: MessageHandler) -> None:
+        handlers = self._handlers.setdefault(channel, set())
+        if not handlers and channel != BROADCAST_CHANNEL:
+            await self._pubsub.subscribe(channel)
+        handlers.add(handler)
+    
+    async def unsubscribe(self, channel: str, handler: MessageHandler) -> None:
+        handlers = self._handlers.get(channel)
+        if handlers is None:
+            return
+        handlers.discard(handler)
+        if not handlers:
+            del self._handlers[channel]
+            if channel != BROADCAST_CHANNEL:
+                await self._pubsub.unsubscribe(channel)
+    
+    async def _now(self) -> float:
+        # Redis time, so presence scores agree across hosts
+        seconds, micros = await self.redis.time()
+        return seconds + micros / 1_000_000
+    
+    async def mark_online(self, user_id: int) -> None:
+        self._local_users.add(user_id)
+        now = await self._now()
+        await self._mark_online(
+            keys=[PRESENCE_USER_KEY.format(user_id=user_id), ONLINE_KEY],
+            args=[self.worker_id, user_id, now + self.presence_ttl, self.presence_ttl],
+        )
+    
+    async def mark_offline(self, user_id: int) -> None:
+        self._local_users.discard(user_id)
+        now = await self._now()
+        await self._mark_offline(
+            keys=[PRESENCE_USER_KEY.format(user_id=user_id), ONLINE_KEY],
+            args=[self.worker_id, user_id, now],
+        )
+    
+    async def refresh_presence(self, user_ids: Iterable[int]) -> None:
+        now = await self._now()
+        expiry = now + self.presence_ttl
+        async with self.redis.pipeline(transaction=False) as pipe:
+            for user_id in user_ids:
+                await self._mark_online(
+                    keys=[PRESENCE_USER_KEY.format(user_id=user_id), ONLINE_KEY],
+                    args=[self.worker_id, user_id, expiry, self.presence_ttl],
+                    client=pipe,
+                )
+            pipe.zremrangebyscore(ONLINE_KEY, "-inf", now)
+            await pipe.execute()
+    
+    async def is_online(self, user_id: int) -> bool:
+        score = await self.redis.zscore(ONLINE_KEY, user_id)
+        return score is not None and score > await self._now()
+    
+    async def online_count(self) -> int:
+        return await self.redis.zcount(ONLINE_KEY, f"({await self._now()}", "+inf")
+    
+    async def _read_loop(self) -> None:
+        while True:
+            try:
+                message = await self._pubsub.get_message(
+                    ignore_subscribe_messages=True, timeout=1.0
+                )
+            except RedisError as e:
+                logger.warning(f"WebSocket broker read failed: {e}")
+                await asyncio.sleep(1)
+                continue
+            if message is None:
+                continue
+            channel = message["channel"]
+            for handler in list(self._handlers.get(channel, ())):
+                try:
+                    await handler(channel, message["data"])
+                except Exception:
+                    logger.exception(f"WebSocket delivery failed on {channel}")
+    
+    async def _heartbeat_loop(self) -> None:
+        while True:
+            await asyncio.sleep(self.presence_ttl / 3)
+            try:
+                await self.refresh_presence(list(self._local_users))
+            except RedisError as e:
+                logger.warning(f"WebSocket presence refresh failed: {e}")
@@ -0,0 +1,115 @@
+"""
+Outbound side of a single WebSocket connection.
+"""
+import asyncio
+from collections import deque
+from typing import Awaitable, Callable, Deque, Dict, Optional, Tuple
+
+from fastapi import WebSocket
+
+from app.core.config import settings
+from app.core.logging import get_logger
+
+logger = get_logger("websocket")
+
+# Close code for clients that cannot keep up ("try again later")
+SLOW_CONSUMER_CLOSE_CODE = 1013
+
+
+class ClientConnection:
+    """
+    A socket with a bounded outbound queue drained by its own writer task.
+    
+    Senders only enqueue, so a slow client never holds up delivery to
+    anyone else. Messages with a coalesce key (state snapshots such as
+    unread counts) replace the queued message with the same key instead of
+    queueing behind it. A client whose queue is full is disconnected.
+    """
+    
+    def __init__(
+        self,
+        websocket: WebSocket,
+        user_id: int,
+        on_close: Callable[["ClientConnection"], Awaitable[None]],
+        max_queue: Optional[int] = None,
+    ):
+        self.websocket = websocket
+        self.user_id = user_id
+        self.max_queue = max_queue or settings.WS_SEND_QUEUE_SIZE
+        self.closed = False
+        self._on_close = on_close
+        self._queue: Deque[Tuple[Optional[str], str]] = deque()
+        self._latest: Dict[str, str] = {}
+        self._ready = asyncio.Event()
+        self._closer: Optional[asyncio.Task] = None
+        self._writer = asyncio.create_task(self._write_loop())
+    
+    def enqueue(self, payload: str, coalesce_key: Optional[str] = None) -> bool:
+        """
+        Queue a serialized message without waiting for the client.
+        
+        Returns:
+            False if the connection is closed or was dropped as too slow
+        """
+        if self.closed:
+            return False
+        
+        if coalesce_key is not None and coalesce_key in self._latest:
+            self._latest[coalesce_key] = payload
+            return True
+        
+        if len(self._queue) >= self.max_queue:
+            logger.warning(f"Dropping slow WebSocket client for user {self.user_id}")
+            self._drop()
+            return False
+        
+        if coalesce_key is not None:
+            self._latest[coalesce_key] = payload
+            payload = ""
+        self._queue.append((coalesce_key, payload))
+        self._ready.set()
+        return True
+    
+    async def close(self):
+        """Stop the writer without closing the socket."""
+        self.closed = True
+        self._writer.cancel()
+    
+    async def _write_loop(self):
+        try:
+            while True:
+                if not self._queue:
+                    self._ready.clear()
+                    await self._ready.wait()
+                    continue
+                
+                coalesce_key, payload = self._queue.popleft()
+                if coalesce_key is not None:
+                    payload = self._latest.pop(coalesce_key)
+                await asyncio.wait_for(
+                    self.websocket.send_text(payload),
+                    timeout=settings.WS_SEND_TIMEOUT,
+                )
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            # Send failed or timed out: the client is gone or stuck
+            self._drop()
+    
+    def _drop(self):
+        """Stop sending, then close the socket and tell the manager."""
+        if self.closed:
+            return
+        self.closed = True
+        self._queue.clear()
+        self._latest.clear()
+        if asyncio.current_task() is not self._writer:
+            self._writer.cancel()
+        self._closer = asyncio.create_task(self._close_socket())
+    
+    async def _close_socket(self):
+        try:
+            await self.websocket.close(code=SLOW_CONSUMER_CLOSE_CODE)
+        except Exception:
+            pass
+        await self._on_close(self)
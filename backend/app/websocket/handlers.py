@@ -1,27 +1,18 @@
 """
 WebSocket route handlers.
 """
+import json
+
 from fastapi import WebSocket, WebSocketDisconnect, Depends, Query
-from jose import JWTError, jwt
 
-from app.core.config import settings
+from app.core.deps import authenticate_token
 from app.websocket.manager import manager
 
 
 async def get_user_id_from_token(token: str) -> int | None:
     """Extract user_id from JWT token."""
-    try:
-        payload = jwt.decode(
-            token,
-            settings.SECRET_KEY,
-            algorithms=[settings.ALGORITHM],
-        )
-        user_id = payload.get("sub")
-        if user_id:
-            return int(user_id)
-    except (JWTError, ValueError):
-        pass
-    return None
+    verified = await authenticate_token(token)
+    return verified.user_id if verified is not None else None
 
 
 async def websocket_endpoint(
@@ -44,15 +35,15 @@ async def websocket_endpoint(
         await websocket.close(code=4001, reason="Unauthorized")
         return
     
-    # Connect
-    await manager.connect(websocket, user_id)
+    # Connect; all writes go through the connection's outbound queue
+    connection = await manager.connect(websocket, user_id)
     
     try:
         # Send initial connection success
-        await websocket.send_json({
+        connection.enqueue(json.dumps({
             "type": "connected",
             "data": {"user_id": user_id},
-        })
+        }))
         
         # Keep connection alive and handle incoming messages
         while True:
@@ -60,11 +51,11 @@ async def websocket_endpoint(
             
             # Handle ping/pong for keeping connection alive
             if data == "ping":
-                await websocket.send_text("pong")
-            
+                connection.enqueue("pong")
+    
     except WebSocketDisconnect:
-        manager.disconnect(websocket, user_id)
+        await manager.disconnect(websocket, user_id)
     except Exception:
-        manager.disconnect(websocket, user_id)
+        await manager.disconnect(websocket, user_id)
 
 
@@ -2,59 +2,122 @@
 WebSocket connection manager.
 """
 import json
-from typing import Dict, Set
+from typing import Dict, Optional
 from fastapi import WebSocket
 
+from app.core.metrics import WEBSOCKET_CONNECTIONS
+from app.websocket.broker import (
+    BROADCAST_CHANNEL,
+    Broker,
+    InMemoryBroker,
+    user_channel,
+)
+from app.websocket.connection import ClientConnection
+
+# Message types that are snapshots of state: only the newest queued one
+# per connection needs to be sent.
+COALESCED_TYPES = {"unread_count"}
+
+
+def encode_message(message: dict) -> str:
+    """
+    Serialize a message for the broker.
+    
+    The first line carries the coalesce key (empty if none) so receiving
+    workers can route the payload without parsing the JSON.
+    """
+    message_type = message.get("type")
+    coalesce_key = message_type if message_type in COALESCED_TYPES else ""
+    return f"{coalesce_key}\n{json.dumps(message)}"
+
 
 class ConnectionManager:
     """
     Manages WebSocket connections for real-time notifications.
+    
+    Sockets are held per worker; messages go through the broker so that
+    whichever worker holds a user's sockets delivers them. Delivery only
+    enqueues onto each connection's outbound queue.
     """
     
-    def __init__(self):
-        # Map of user_id to set of WebSocket connections
-        self.active_connections: Dict[int, Set[WebSocket]] = {}
+    def __init__(self, broker: Optional[Broker] = None):
+        # Map of user_id to the connections on this worker, keyed by socket
+        self.active_connections: Dict[int, Dict[WebSocket, ClientConnection]] = {}
+        self.broker: Broker = broker or InMemoryBroker()
     
-    async def connect(self, websocket: WebSocket, user_id: int):
+    async def start(self, broker: Optional[Broker] = None):
+        """Switch to ``broker`` (if given) and start listening for broadcasts."""
+        broker = broker or self.broker
+        await broker.start()
+        self.broker = broker
+        await self.broker.subscribe(BROADCAST_CHANNEL, self._deliver_broadcast)
+    
+    async def close(self):
+        """Stop all writers and the broker."""
+        for connections in list(self.active_connections.values()):
+            for connection in list(connections.values()):
+                await connection.close()
+        await self.broker.unsubscribe(BROADCAST_CHANNEL, self._deliver_broadcast)
+        await self.broker.close()
+    
+    async def connect(self, websocket: WebSocket, user_id: int) -> ClientConnection:
         """Accept and register a new WebSocket connection."""
         await websocket.accept()
         if user_id not in self.active_connections:
-            self.active_connections[user_id] = set()
-        self.active_connections[user_id].add(websocket)
+            self.active_connections[user_id] = {}
+            await self.broker.subscribe(user_channel(user_id), self._deliver_to_user)
+            await self.broker.mark_online(user_id)
+        connection = ClientConnection(websocket, user_id, self._on_connection_closed)
+        self.active_connections[user_id][websocket] = connection
+        WEBSOCKET_CONNECTIONS.inc()
+        return connection
     
-    def disconnect(self, websocket: WebSocket, user_id: int):
+    async def disconnect(self, websocket: WebSocket, user_id: int):
         """Remove a WebSocket connection."""
         if user_id in self.active_connections:
-            self.active_connections[user_id].discard(websocket)
+            connection = self.active_connections[user_id].pop(websocket, None)
+            if connection is not None:
+                WEBSOCKET_CONNECTIONS.dec()
+                await connection.close()
             if not self.active_connections[user_id]:
                 del self.active_connections[user_id]
+                await self.broker.unsubscribe(user_channel(user_id), self._deliver_to_user)
+                await self.broker.mark_offline(user_id)
+    
+    async def _on_connection_closed(self, connection: ClientConnection):
+        await self.disconnect(connection.websocket, connection.user_id)
     
     async def send_personal_message(self, message: dict, user_id: int):
-        """Send a message to a specific user's connections."""
-        if user_id in self.active_connections:
-            disconnected = set()
-            for connection in self.active_connections[user_id]:
-                try:
-                    await connection.send_json(message)
-                except Exception:
-                    disconnected.add(connection)
-            
-            # Clean up disconnected
-            for conn in disconnected:
-                self.active_connections[user_id].discard(conn)
+        """Send a message to a specific user's connections on any worker."""
+        await self.broker.publish(user_channel(user_id), encode_message(message))
     
     async def broadcast(self, message: dict):
-        """Broadcast a message to all connected users."""
+        """Broadcast a message to all connected users on every worker."""
+        await self.broker.publish(BROADCAST_CHANNEL, encode_message(message))
+    
+    async def _deliver_to_user(self, channel: str, payload: str):
+        """Deliver a published message to the local sockets of its user."""
+        user_id = int(channel.rsplit(":", 1)[1])
+        self._enqueue_local(user_id, payload)
+    
+    async def _deliver_broadcast(self, channel: str, payload: str):
+        """Deliver a broadcast to every local socket."""
         for user_id in list(self.active_connections.keys()):
-            await self.send_personal_message(message, user_id)
+            self._enqueue_local(user_id, payload)
+    
+    def _enqueue_local(self, user_id: int, payload: str):
+        """Queue the same serialized message on each of the user's local sockets."""
+        coalesce_key, _, data = payload.partition("\n")
+        for connection in list(self.active_connections.get(user_id, {}).values()):
+            connection.enqueue(data, coalesce_key or None)
     
-    def is_user_online(self, user_id: int) -> bool:
-        """Check if a user has active connections."""
-        return user_id in self.active_connections and len(self.active_connections[user_id]) > 0
+    async def is_user_online(self, user_id: int) -> bool:
+        """Check if a user has active connections on any worker."""
+        return await self.broker.is_online(user_id)
     
-    def get_online_count(self) -> int:
-        """Get the number of online users."""
-        return len(self.active_connections)
+    async def get_online_count(self) -> int:
+        """Get the number of online users across all workers."""
+        return await self.broker.online_count()
 
 
 # Global connection manager instance
@@ -0,0 +1,63 @@
+"""Add conversation participants
+
+Revision ID: 5b8e2f6c1a93
+Revises: d62dbc39f819
+Create Date: 2026-10-17 09:30:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5b8e2f6c1a93'
+down_revision: Union[str, None] = 'd62dbc39f819'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# One inbox row per side of every existing conversation
+BACKFILL = """
+INSERT INTO conversation_participants
+    (conversation_id, user_id, other_user_id, unread_count, last_read_message_id, last_message_at)
+SELECT
+    c.id,
+    c.{me},
+    c.{other},
+    (SELECT COUNT(*) FROM messages m
+     WHERE m.conversation_id = c.id AND m.sender_id <> c.{me} AND m.is_read = 0),
+    (SELECT MAX(m.id) FROM messages m
+     WHERE m.conversation_id = c.id AND (m.sender_id = c.{me} OR m.is_read = 1)),
+    c.last_message_at
+FROM conversations c
+"""
+
+
+def upgrade() -> None:
+    """Upgrade database schema."""
+    op.create_table('conversation_participants',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('conversation_id', sa.Integer(), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('other_user_id', sa.Integer(), nullable=False),
+    sa.Column('unread_count', sa.Integer(), nullable=False),
+    sa.Column('last_read_message_id', sa.Integer(), nullable=True),
+    sa.Column('last_message_at', sa.DateTime(), nullable=False),
+    sa.ForeignKeyConstraint(['conversation_id'], ['conversations.id'], name=op.f('fk_conversation_participants_conversation_id_conversations'), ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['other_user_id'], ['users.id'], name=op.f('fk_conversation_participants_other_user_id_users'), ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], name=op.f('fk_conversation_participants_user_id_users'), ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id', name=op.f('pk_conversation_participants')),
+    sa.UniqueConstraint('conversation_id', 'user_id', name='uq_conversation_participant')
+    )
+    op.create_index('ix_conversation_participant_inbox', 'conversation_participants', ['user_id', 'last_message_at'], unique=False)
+    
+    op.execute(BACKFILL.format(me='user1_id', other='user2_id'))
+    op.execute(BACKFILL.format(me='user2_id', other='user1_id'))
+
+
+def downgrade() -> None:
+    """Downgrade database schema."""
+    op.drop_index('ix_conversation_participant_inbox', table_name='conversation_participants')
+    op.drop_table('conversation_participants')
@@ -0,0 +1,47 @@
+"""Add post_count to tags and categories
+
+Revision ID: 8c41d7e2b5fa
+Revises: 5b8e2f6c1a93
+Create Date: 2026-10-17 11:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8c41d7e2b5fa'
+down_revision: Union[str, None] = '5b8e2f6c1a93'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade database schema."""
+    op.add_column('categories', sa.Column('post_count', sa.Integer(), server_default='0', nullable=False))
+    op.add_column('tags', sa.Column('post_count', sa.Integer(), server_default='0', nullable=False))
+    op.create_index(op.f('ix_tags_post_count'), 'tags', ['post_count'], unique=False)
+    
+    # Count the posts that are published today
+    op.execute("""
+        UPDATE categories SET post_count = (
+            SELECT COUNT(*) FROM posts
+            WHERE posts.category_id = categories.id AND posts.status = 'published'
+        )
+    """)
+    op.execute("""
+        UPDATE tags SET post_count = (
+            SELECT COUNT(*) FROM post_tags
+            JOIN posts ON posts.id = post_tags.post_id
+            WHERE post_tags.tag_id = tags.id AND posts.status = 'published'
+        )
+    """)
+
+
+def downgrade() -> None:
+    """Downgrade database schema."""
+    op.drop_index(op.f('ix_tags_post_count'), table_name='tags')
+    op.drop_column('tags', 'post_count')
+    op.drop_column('categories', 'post_count')
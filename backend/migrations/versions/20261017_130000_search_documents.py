@@ -0,0 +1,59 @@
+"""Add search documents
+
+Revision ID: 2f9a6d3c8e41
+Revises: 8c41d7e2b5fa
+Create Date: 2026-10-17 13:00:00.000000
+
+Documents are filled by ``python -m app.search.reindex``.
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '2f9a6d3c8e41'
+down_revision: Union[str, None] = '8c41d7e2b5fa'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade database schema."""
+    op.create_table('search_documents',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('doc_type', sa.String(length=20), nullable=False),
+    sa.Column('doc_id', sa.Integer(), nullable=False),
+    sa.Column('title', sa.Text(), nullable=False),
+    sa.Column('body', sa.Text(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('id', name=op.f('pk_search_documents')),
+    sa.UniqueConstraint('doc_type', 'doc_id', name='uq_search_document')
+    )
+    
+    dialect = op.get_bind().dialect.name
+    if dialect == 'mysql':
+        op.create_index(
+            'ix_search_documents_fulltext',
+            'search_documents',
+            ['title', 'body'],
+            mysql_prefix='FULLTEXT',
+            mysql_with_parser='ngram',
+        )
+    elif dialect == 'sqlite':
+        op.execute(
+            "CREATE VIRTUAL TABLE IF NOT EXISTS search_documents_fts "
+            "USING fts5(title, body, tokenize='trigram')"
+        )
+
+
+def downgrade() -> None:
+    """Downgrade database schema."""
+    dialect = op.get_bind().dialect.name
+    if dialect == 'mysql':
+        op.drop_index('ix_search_documents_fulltext', table_name='search_documents')
+    elif dialect == 'sqlite':
+        op.execute("DROP TABLE IF EXISTS search_documents_fts")
+    op.drop_table('search_documents')
@@ -0,0 +1,38 @@
+"""Add derived plain text columns to posts
+
+Revision ID: 7d3b9e5a1c62
+Revises: 2f9a6d3c8e41
+Create Date: 2026-10-17 15:00:00.000000
+
+Existing posts are filled by ``python -m app.services.post_text``.
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7d3b9e5a1c62'
+down_revision: Union[str, None] = '2f9a6d3c8e41'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade database schema."""
+    op.add_column('posts', sa.Column('content_text', sa.Text(), nullable=True))
+    op.add_column('posts', sa.Column('content_text_en', sa.Text(), nullable=True))
+    op.add_column('posts', sa.Column('word_count', sa.Integer(), server_default='0', nullable=False))
+    op.add_column('posts', sa.Column('char_count', sa.Integer(), server_default='0', nullable=False))
+    op.add_column('posts', sa.Column('auto_excerpt', sa.String(length=500), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade database schema."""
+    op.drop_column('posts', 'auto_excerpt')
+    op.drop_column('posts', 'char_count')
+    op.drop_column('posts', 'word_count')
+    op.drop_column('posts', 'content_text_en')
+    op.drop_column('posts', 'content_text')
@@ -0,0 +1,111 @@
+"""Encode comment paths as fixed-width base-36 segments
+
+Revision ID: a4e7c1f09b38
+Revises: 7d3b9e5a1c62
+Create Date: 2026-10-17 17:00:00.000000
+
+Paths change from dotted decimal ids ("1.3.7") to one six-character
+base-36 segment per level ("000001000003000007"), so string order is tree
+order. Existing paths are rebuilt from parent_id.
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import mysql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a4e7c1f09b38'
+down_revision: Union[str, None] = '7d3b9e5a1c62'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+OLD_COMMENT = "Materialized path like '1.3.7' for tree queries"
+NEW_COMMENT = "Materialized path of fixed-width base-36 ids, see path_segment"
+ALPHABET = "0123456789abcdefghijklmnopqrstuvwxyz"
+WIDTH = 6
+BATCH_SIZE = 1000
+
+comments = sa.table(
+    'comments',
+    sa.column('id', sa.Integer),
+    sa.column('parent_id', sa.Integer),
+    sa.column('path', sa.String),
+)
+
+
+def encode(comment_id: int) -> str:
+    digits = []
+    while comment_id:
+        comment_id, digit = divmod(comment_id, len(ALPHABET))
+        digits.append(ALPHABET[digit])
+    return "".join(reversed(digits)).rjust(WIDTH, "0")
+
+
+def rebuild_paths(segment, separator: str) -> None:
+    """Recompute every path from parent_id; parents always have smaller ids."""
+    bind = op.get_bind()
+    paths = {}
+    rows = bind.execute(
+        sa.select(comments.c.id, comments.c.parent_id).order_by(comments.c.id)
+    ).all()
+    updates = []
+    for comment_id, parent_id in rows:
+        if parent_id is None:
+            paths[comment_id] = segment(comment_id)
+        else:
+            paths[comment_id] = paths[parent_id] + separator + segment(comment_id)
+        updates.append({"comment_id": comment_id, "new_path": paths[comment_id]})
+    
+    statement = (
+        comments.update()
+        .where(comments.c.id == sa.bindparam("comment_id"))
+        .values(path=sa.bindparam("new_path"))
+    )
+    for start in range(0, len(updates), BATCH_SIZE):
+        bind.execute(statement, updates[start:start + BATCH_SIZE])
+
+
+def upgrade() -> None:
+    """Upgrade database schema."""
+    dialect = op.get_bind().dialect.name
+    if dialect == 'mysql':
+        op.alter_column(
+            'comments',
+            'path',
+            existing_type=sa.String(length=255),
+            type_=mysql.VARCHAR(600, charset='ascii', collation='ascii_bin'),
+            existing_nullable=False,
+            comment=NEW_COMMENT,
+            existing_comment=OLD_COMMENT,
+        )
+    elif dialect != 'sqlite':
+        op.alter_column(
+            'comments',
+            'path',
+            existing_type=sa.String(length=255),
+            type_=sa.String(length=600),
+            existing_nullable=False,
+            comment=NEW_COMMENT,
+            existing_comment=OLD_COMMENT,
+        )
+    rebuild_paths(encode, "")
+    op.create_index('ix_comments_post_path', 'comments', ['post_id', 'path'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade database schema."""
+    op.drop_index('ix_comments_post_path', table_name='comments')
+    rebuild_paths(str, ".")
+    if op.get_bind().dialect.name != 'sqlite':
+        op.alter_column(
+            'comments',
+            'path',
+            existing_type=sa.String(length=600),
+            type_=sa.String(length=255),
+            existing_nullable=False,
+            comment=OLD_COMMENT,
+            existing_comment=NEW_COMMENT,
+        )
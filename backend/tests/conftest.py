@@ -0,0 +1,250 @@
+"""
+Test harness: the app on a fresh aiosqlite database with seeded data.
+
+Settings are read when the app is imported, so the environment is set up
+before anything from ``app`` is imported. Redis is replaced by fakeredis.
+Requests carry the profiling token, so every response reports its SQL
+statement count in X-Query-Count (see app.core.profiling).
+"""
+import os
+import tempfile
+from dataclasses import dataclass, field
+from typing import Dict, Optional, Tuple
+
+_tmp = tempfile.mkdtemp(prefix="portal-tests-")
+os.environ["DATABASE_URL"] = f"sqlite+aiosqlite:///{_tmp}/test.db"
+os.environ["LOG_DIR"] = os.path.join(_tmp, "logs")
+os.environ["UPLOAD_DIR"] = os.path.join(_tmp, "uploads")
+os.environ["DEBUG"] = "false"
+os.environ["BCRYPT_ROUNDS"] = "4"
+os.environ["PROFILING_TOKEN"] = "test-profiling-token"
+os.environ["WS_BROKER"] = "memory"
+os.environ.pop("DATABASE_REPLICA_URL", None)
+os.environ.pop("PROMETHEUS_MULTIPROC_DIR", None)
+os.makedirs(os.environ["UPLOAD_DIR"], exist_ok=True)
+
+import fakeredis  # noqa: E402
+import httpx  # noqa: E402
+import pytest  # noqa: E402
+from sqlalchemy import update  # noqa: E402
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine  # noqa: E402
+
+import app.core.deps as deps  # noqa: E402
+import app.db.routing as routing  # noqa: E402
+from app.core.profiling import PROFILE_TOKEN_HEADER  # noqa: E402
+from app.core.tokens import token_verifier  # noqa: E402
+from app.db.base import Base  # noqa: E402
+from app.db.session import async_session_maker, engine  # noqa: E402
+from app.events import dispatcher  # noqa: E402
+from app.events.notifications import handle_notification_events  # noqa: E402
+from app.main import app  # noqa: E402
+from app.models import Category, Post, Tag, User  # noqa: E402
+from app.search import setup_search  # noqa: E402
+from app.services.principal_cache import principal_cache  # noqa: E402
+from app.services.response_cache import response_cache  # noqa: E402
+
+PASSWORD = "secret123"
+
+POSTS = 12
+FEATURED_POSTS = 6
+ROOT_COMMENTS = 4
+REPLIES_PER_ROOT = 5
+
+
+def tiptap(text: str) -> dict:
+    return {
+        "type": "doc",
+        "content": [{"type": "paragraph", "content": [{"type": "text", "text": text}]}],
+    }
+
+
+@dataclass
+class Seed:
+    """Ids and auth headers of the seeded data."""
+    admin: Dict[str, str]
+    member: Dict[str, str]
+    admin_id: int
+    member_id: int
+    post_ids: list = field(default_factory=list)
+    comment_ids: list = field(default_factory=list)
+    conversation_id: Optional[int] = None
+
+
+@pytest.fixture(scope="session")
+async def client():
+    """HTTP client for the app (lifespan not run; background tasks stay off)."""
+    deps._redis_pool = fakeredis.aioredis.FakeRedis(decode_responses=True)
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    await setup_search()
+    dispatcher.subscribe(handle_notification_events)
+    
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        yield client
+    
+    await engine.dispose()
+
+
+async def _login(client: httpx.AsyncClient, username: str) -> Dict[str, str]:
+    response = await client.post(
+        "/api/v1/auth/login/json", json={"username": username, "password": PASSWORD}
+    )
+    assert response.status_code == 200, response.text
+    return {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+
+@pytest.fixture(scope="session")
+async def seed(client: httpx.AsyncClient) -> Seed:
+    """
+    Two users (an admin and a member), posts with tags (some featured), a
+    threaded comment section with likes, favorites, a conversation and
+    notifications.
+    """
+    for username in ("admin", "member"):
+        response = await client.post("/api/v1/auth/register", json={
+            "username": username,
+            "email": f"{username}@example.com",
+            "password": PASSWORD,
+        })
+        assert response.status_code == 201, response.text
+    
+    async with async_session_maker() as db:
+        await db.execute(update(User).where(User.username == "admin").values(role="admin"))
+        db.add_all([
+            Category(name="Tech", name_en="Tech", slug="tech"),
+            Tag(name="python", slug="python"),
+            Tag(name="web", slug="web"),
+        ])
+        await db.commit()
+    
+    admin = await _login(client, "admin")
+    member = await _login(client, "member")
+    admin_id = (await client.get("/api/v1/users/me", headers=admin)).json()["id"]
+    member_id = (await client.get("/api/v1/users/me", headers=member)).json()["id"]
+    seed = Seed(admin=admin, member=member, admin_id=admin_id, member_id=member_id)
+    
+    for i in range(POSTS):
+        response = await client.post("/api/v1/posts", headers=admin, json={
+            "title": f"Post {i}",
+            "content": tiptap(f"Body of post {i} " * 20),
+            "status": "published",
+            "category_id": 1,
+            "tag_ids": [1, 2],
+        })
+        assert response.status_code == 201, response.text
+        seed.post_ids.append(response.json()["id"])
+    
+    async with async_session_maker() as db:
+        await db.execute(
+            update(Post)
+            .where(Post.id.in_(seed.post_ids[:FEATURED_POSTS]))
+            .values(is_featured=True)
+        )
+        await db.commit()
+    
+    post_id = seed.post_ids[0]
+    for i in range(ROOT_COMMENTS):
+        response = await client.post("/api/v1/comments", headers=member, json={
+            "post_id": post_id, "content": tiptap(f"Comment {i}"),
+        })
+        root_id = response.json()["id"]
+        seed.comment_ids.append(root_id)
+        parent_id = root_id
+        for j in range(REPLIES_PER_ROOT):
+            response = await client.post("/api/v1/comments", headers=admin, json={
+                "post_id": post_id, "content": tiptap(f"Reply {i}.{j}"), "parent_id": parent_id,
+            })
+            assert response.status_code == 201, response.text
+            # Alternate between replying to the root and to the last reply
+            parent_id = response.json()["id"] if j % 2 == 0 else root_id
+    
+    for target_id in seed.post_ids[:3]:
+        await client.post("/api/v1/likes", headers=member, json={"target_type": "post", "target_id": target_id})
+        await client.post("/api/v1/favorites", headers=member, json={"post_id": target_id})
+    for target_id in seed.comment_ids:
+        await client.post("/api/v1/likes", headers=admin, json={"target_type": "comment", "target_id": target_id})
+    
+    for content in ("hi", "hello", "how are you?"):
+        response = await client.post("/api/v1/messages", headers=member, json={
+            "recipient_id": admin_id, "content": content,
+        })
+        assert response.status_code == 201, response.text
+        seed.conversation_id = response.json()["conversation_id"]
+    
+    # Write the notifications the events above produced
+    await dispatcher.stop()
+    return seed
+
+
+# Dialect flags that make SQLite execute statements the way MySQL does
+_RETURNING_FLAGS = (
+    "insert_returning",
+    "insert_executemany_returning",
+    "insert_executemany_returning_sort_by_parameter_order",
+    "update_returning",
+    "delete_returning",
+)
+
+
+@pytest.fixture
+def without_returning(monkeypatch):
+    """
+    Run the test without INSERT/UPDATE/DELETE ... RETURNING, as on MySQL.
+    
+    Server-side defaults are then expired after a flush and new ids come
+    from the cursor's lastrowid, so code relying on RETURNING fails here.
+    """
+    dialect = engine.sync_engine.dialect
+    for flag in _RETURNING_FLAGS:
+        monkeypatch.setattr(dialect, flag, False)
+
+
+@pytest.fixture
+async def replica(monkeypatch, tmp_path):
+    """
+    Route read-only endpoints to a replica that has not caught up at all.
+    
+    The replica is a second SQLite file with the schema and no rows, so a
+    read that reaches it finds nothing the test wrote.
+    """
+    replica_engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path}/replica.db")
+    async with replica_engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    monkeypatch.setattr(routing, "replica_engine", replica_engine)
+    monkeypatch.setattr(
+        deps, "replica_session_maker", async_sessionmaker(replica_engine, expire_on_commit=False)
+    )
+    yield replica_engine
+    await replica_engine.dispose()
+
+
+async def reset_caches() -> None:
+    """Forget everything cached, so a request takes its cold path."""
+    await deps._redis_pool.flushall()
+    response_cache.clear_local()
+    principal_cache.clear_local()
+    token_verifier.clear()
+
+
+async def count_queries(
+    client: httpx.AsyncClient,
+    method: str,
+    url: str,
+    headers: Optional[Dict[str, str]] = None,
+    **kwargs,
+) -> Tuple[httpx.Response, int]:
+    """
+    Make a request with cold caches.
+    
+    Returns:
+        The response and the number of SQL statements it executed
+    """
+    await reset_caches()
+    response = await client.request(
+        method,
+        url,
+        headers={**(headers or {}), PROFILE_TOKEN_HEADER: os.environ["PROFILING_TOKEN"]},
+        **kwargs,
+    )
+    return response, int(response.headers["X-Query-Count"])
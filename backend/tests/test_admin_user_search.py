@@ -0,0 +1,40 @@
+"""
+Admin user search over usernames, nicknames and emails.
+"""
+import pytest
+
+from tests.conftest import Seed
+
+
+@pytest.fixture(scope="module")
+async def searchable_user(client, seed: Seed) -> int:
+    response = await client.post("/api/v1/auth/register", json={
+        "username": "searchable",
+        "email": "searchable@portal-example.org",
+        "password": "secret123",
+    })
+    assert response.status_code == 201, response.text
+    user_id = response.json()["id"]
+    
+    login = await client.post(
+        "/api/v1/auth/login/json", json={"username": "searchable", "password": "secret123"}
+    )
+    headers = {"Authorization": f"Bearer {login.json()['access_token']}"}
+    response = await client.put("/api/v1/users/me", headers=headers, json={"nickname": "小明同学"})
+    assert response.status_code == 200, response.text
+    return user_id
+
+
+@pytest.mark.parametrize("search", [
+    "search",  # username prefix
+    "chab",  # middle of the username
+    "明同学",  # middle of a CJK nickname
+    "portal-example",  # email domain
+])
+async def test_search_matches_substrings(client, seed: Seed, searchable_user, search):
+    response = await client.get(
+        "/api/v1/admin/users", headers=seed.admin, params={"search": search}
+    )
+    
+    assert response.status_code == 200, response.text
+    assert [user["id"] for user in response.json()["items"]] == [searchable_user]
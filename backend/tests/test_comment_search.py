@@ -0,0 +1,36 @@
+"""
+Search documents of deleted comments.
+"""
+from sqlalchemy import select
+
+from app.db.session import async_session_maker
+from app.models.search import SearchDocument
+from app.search import COMMENT
+from tests.conftest import Seed, tiptap
+
+
+async def test_hard_delete_removes_thread_from_search(client, seed: Seed):
+    post_id = seed.post_ids[-1]
+    response = await client.post("/api/v1/comments", headers=seed.member, json={
+        "post_id": post_id, "content": tiptap("Doomed thread"),
+    })
+    assert response.status_code == 201, response.text
+    thread = [response.json()["id"]]
+    for _ in range(2):
+        response = await client.post("/api/v1/comments", headers=seed.admin, json={
+            "post_id": post_id, "content": tiptap("Doomed reply"), "parent_id": thread[-1],
+        })
+        assert response.status_code == 201, response.text
+        thread.append(response.json()["id"])
+    
+    response = await client.delete(
+        f"/api/v1/comments/{thread[0]}", headers=seed.admin, params={"hard": True}
+    )
+    
+    assert response.status_code == 204, response.text
+    async with async_session_maker() as db:
+        remaining = await db.scalars(
+            select(SearchDocument.doc_id)
+            .where(SearchDocument.doc_type == COMMENT, SearchDocument.doc_id.in_(thread))
+        )
+        assert list(remaining) == []
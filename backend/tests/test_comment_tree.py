@@ -0,0 +1,84 @@
+"""
+Comment tree paging, and the counts kept on posts and comments.
+"""
+import pytest
+
+from tests.conftest import REPLIES_PER_ROOT, ROOT_COMMENTS, Seed, reset_caches, tiptap
+
+
+@pytest.mark.parametrize("nested", [0, 2])
+async def test_replies_cursor_continues_thread(client, seed: Seed, nested):
+    response = await client.get(
+        f"/api/v1/comments/post/{seed.post_ids[0]}", params={"replies": nested}
+    )
+    assert response.status_code == 200, response.text
+    roots = response.json()["comments"]
+    assert [root["id"] for root in roots] == seed.comment_ids
+    
+    for root in roots:
+        shown = []
+        stack = list(root["replies"])
+        while stack:
+            node = stack.pop()
+            shown.append(node["id"])
+            stack.extend(node["replies"])
+        assert len(shown) == nested
+        assert root["replies_cursor"] is not None
+        
+        response = await client.get(
+            f"/api/v1/comments/{root['id']}/replies",
+            params={"after": root["replies_cursor"], "size": 50},
+        )
+        assert response.status_code == 200, response.text
+        rest = [reply["id"] for reply in response.json()["items"]]
+        assert len(rest) == REPLIES_PER_ROOT - nested
+        assert not set(rest) & set(shown)
+
+
+async def test_tree_totals(client, seed: Seed):
+    post_id = seed.post_ids[0]
+    response = await client.get(
+        f"/api/v1/comments/post/{post_id}", params={"size": 2, "with_total": True}
+    )
+    
+    assert response.status_code == 200, response.text
+    body = response.json()
+    assert body["root_total"] == ROOT_COMMENTS
+    assert body["pages"] == 2
+    assert body["total"] == ROOT_COMMENTS * (1 + REPLIES_PER_ROOT)
+
+
+async def _comment(client, comment_id: int) -> dict:
+    response = await client.get(f"/api/v1/comments/{comment_id}")
+    assert response.status_code == 200, response.text
+    return response.json()
+
+
+async def _comment_count(client, post_id: int) -> int:
+    await reset_caches()
+    response = await client.get(f"/api/v1/posts/{post_id}")
+    return response.json()["comment_count"]
+
+
+@pytest.mark.parametrize("path", ["/api/v1/comments/{id}", "/api/v1/admin/comments/{id}"])
+async def test_hard_delete_updates_counts(client, seed: Seed, path):
+    post_id = seed.post_ids[-2]
+    thread = []
+    for _ in range(3):
+        response = await client.post("/api/v1/comments", headers=seed.member, json={
+            "post_id": post_id,
+            "content": tiptap("Counted"),
+            "parent_id": thread[-1] if thread else None,
+        })
+        assert response.status_code == 201, response.text
+        thread.append(response.json()["id"])
+    before = await _comment_count(client, post_id)
+    
+    # Removes the middle comment and its reply
+    response = await client.delete(
+        path.format(id=thread[1]), headers=seed.admin, params={"hard": True}
+    )
+    
+    assert response.status_code in (200, 204), response.text
+    assert await _comment_count(client, post_id) == before - 2
+    assert (await _comment(client, thread[0]))["reply_count"] == 0
@@ -0,0 +1,86 @@
+"""
+Cursor pagination over nullable sort columns, and malformed cursors.
+"""
+import base64
+import json
+
+import pytest
+from sqlalchemy import select
+
+from app.db.pagination import InvalidCursorError, decode_cursor, encode_cursor, paginate
+from app.db.session import async_session_maker
+from app.models import Post
+from tests.conftest import Seed, tiptap
+
+
+def _cursor(key) -> str:
+    raw = json.dumps(key).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def test_null_sort_value_round_trips():
+    assert decode_cursor(encode_cursor(None, 7)) == (None, 7)
+
+
+@pytest.mark.parametrize("key", [
+    ["v", [1, 2], 1],
+    ["v", {"a": 1}, 1],
+    ["v", True, 1],
+    ["v", 1, "1"],
+    ["x", 1, 1],
+    ["d", 5, 1],
+])
+def test_unsupported_cursor_values_are_rejected(key):
+    with pytest.raises(InvalidCursorError):
+        decode_cursor(_cursor(key))
+
+
+@pytest.mark.parametrize("key", [
+    ["v", [1], 1],
+    ["v", "yesterday", 1],
+    ["v", 5, 1],
+])
+async def test_malformed_cursor_is_a_client_error(client, seed: Seed, key):
+    # /posts sorts by created_at, a datetime column
+    response = await client.get("/api/v1/posts", params={"after": _cursor(key)})
+    
+    assert response.status_code == 400, response.text
+
+
+@pytest.mark.parametrize("descending", [True, False])
+async def test_cursor_walk_includes_null_sort_values(client, seed: Seed, descending):
+    for i in range(3):
+        response = await client.post("/api/v1/posts", headers=seed.admin, json={
+            "title": f"Draft {descending} {i}",
+            "content": tiptap("Unpublished"),
+            "status": "draft",
+        })
+        assert response.status_code == 201, response.text
+    
+    query = select(Post).where(Post.user_id == seed.admin_id)
+    async with async_session_maker() as db:
+        expected = set((await db.scalars(query)).all())
+        assert any(post.published_at is None for post in expected)
+        
+        seen = []
+        after = None
+        while True:
+            page = await paginate(
+                db, query, Post.published_at, Post.id,
+                size=2, after=after, descending=descending, with_total=False,
+            )
+            seen.extend(page.items)
+            if page.next_cursor is None:
+                break
+            after = page.next_cursor
+        
+        # Walking back from the last page returns the rows before it
+        before = await paginate(
+            db, query, Post.published_at, Post.id,
+            size=len(seen), before=encode_cursor(seen[-1].published_at, seen[-1].id),
+            descending=descending, with_total=False,
+        )
+    
+    assert len(seen) == len(expected)
+    assert set(seen) == expected
+    assert before.items == seen[:-1]
@@ -0,0 +1,52 @@
+"""
+Published post counts of tags, as returned with a post.
+"""
+from tests.conftest import Seed, tiptap
+
+
+async def _tag_counts(client) -> dict:
+    response = await client.get("/api/v1/tags")
+    return {tag["id"]: tag["post_count"] for tag in response.json()}
+
+
+async def test_post_response_shows_recounted_tags(client, seed: Seed):
+    response = await client.post("/api/v1/posts", headers=seed.admin, json={
+        "title": "Counted",
+        "content": tiptap("Counted post"),
+        "status": "published",
+        "category_id": 1,
+        "tag_ids": [1],
+    })
+    assert response.status_code == 201, response.text
+    post = response.json()
+    counts = await _tag_counts(client)
+    assert {tag["id"]: tag["post_count"] for tag in post["tags"]} == {1: counts[1]}
+    
+    response = await client.put(
+        f"/api/v1/posts/{post['id']}", headers=seed.admin, json={"tag_ids": [1, 2]}
+    )
+    
+    assert response.status_code == 200, response.text
+    counts = await _tag_counts(client)
+    assert {tag["id"]: tag["post_count"] for tag in response.json()["tags"]} == {1: counts[1], 2: counts[2]}
+    
+    response = await client.put(
+        f"/api/v1/posts/{post['id']}", headers=seed.admin, json={"status": "draft"}
+    )
+    
+    assert response.status_code == 200, response.text
+    counts = await _tag_counts(client)
+    assert {tag["id"]: tag["post_count"] for tag in response.json()["tags"]} == {1: counts[1], 2: counts[2]}
+
+
+async def test_post_lists_show_tag_counts(client, seed: Seed):
+    counts = await _tag_counts(client)
+    
+    for path in ("/api/v1/posts", "/api/v1/posts/featured", "/api/v1/posts/my"):
+        response = await client.get(path, headers=seed.admin)
+        assert response.status_code == 200, response.text
+        body = response.json()
+        items = body if isinstance(body, list) else body["items"]
+        tags = [tag for item in items for tag in item["tags"]]
+        assert tags, path
+        assert all(tag["post_count"] == counts[tag["id"]] for tag in tags), path
@@ -0,0 +1,137 @@
+"""
+SQL statement budgets per route.
+
+Every route below is called with cold caches against the seeded database
+and may not execute more statements than its budget. A request that starts
+loading relationships lazily, or issues one query per row, goes over budget
+and fails the build. When a change legitimately needs another query, raise
+the budget in the same commit and say why.
+"""
+import pytest
+
+from tests.conftest import Seed, count_queries
+
+# (method, path, user, budget); paths are formatted with the seed's ids
+BUDGETS = [
+    # Posts
+    ("GET", "/api/v1/posts", None, 3),
+    ("GET", "/api/v1/posts?with_viewer_state=true", "member", 4),
+    ("GET", "/api/v1/posts?q=post", None, 4),
+    ("GET", "/api/v1/posts/featured", None, 2),
+    ("GET", "/api/v1/posts/my", "admin", 4),
+    ("GET", "/api/v1/posts/{post_id}", None, 4),
+    ("GET", "/api/v1/posts/slug/post-0", None, 4),
+    # Comments
+    ("GET", "/api/v1/comments/post/{post_id}", None, 5),
+    ("GET", "/api/v1/comments/post/{post_id}?with_viewer_state=true", "admin", 6),
+    ("GET", "/api/v1/comments/post/{post_id}/flat", None, 3),
+    ("GET", "/api/v1/comments/{comment_id}/replies", None, 4),
+    ("GET", "/api/v1/comments/user/{member_id}", None, 3),
+    # Taxonomy
+    ("GET", "/api/v1/categories", None, 1),
+    ("GET", "/api/v1/categories/tech", None, 1),
+    ("GET", "/api/v1/tags", None, 1),
+    ("GET", "/api/v1/tags/popular", None, 1),
+    ("GET", "/api/v1/tags/python", None, 1),
+    # Users and interactions
+    ("GET", "/api/v1/users/me", "member", 2),
+    ("GET", "/api/v1/users/{member_id}", None, 1),
+    ("GET", "/api/v1/users/username/member", None, 1),
+    ("GET", "/api/v1/favorites", "member", 3),
+    ("GET", "/api/v1/likes/status/post/{post_id}", "member", 1),
+    # Messages and notifications
+    ("GET", "/api/v1/messages/conversations", "admin", 3),
+    ("GET", "/api/v1/messages/conversations/{conversation_id}", "admin", 5),
+    ("GET", "/api/v1/messages/unread-count", "admin", 2),
+    ("GET", "/api/v1/notifications", "admin", 5),
+    ("GET", "/api/v1/notifications/unread-count", "admin", 2),
+    # Admin
+    ("GET", "/api/v1/admin/stats", "admin", 10),
+    ("GET", "/api/v1/admin/users", "admin", 3),
+    ("GET", "/api/v1/admin/posts", "admin", 3),
+    ("GET", "/api/v1/admin/comments", "admin", 5),
+    ("GET", "/api/v1/admin/tags", "admin", 3),
+]
+
+# List routes whose statement count must not depend on the page size:
+# (path, user, query string of a small page, query string of a large page)
+PAGINATED = [
+    ("/api/v1/posts", None, "size=1", "size=50"),
+    ("/api/v1/posts?with_viewer_state=true", "member", "size=1", "size=50"),
+    ("/api/v1/posts/my", "admin", "size=1", "size=50"),
+    ("/api/v1/posts/featured", None, "limit=1", "limit=20"),
+    ("/api/v1/comments/post/{post_id}", None, "size=1&replies=1", "size=50&replies=10"),
+    ("/api/v1/comments/post/{post_id}/flat", None, "size=1", "size=50"),
+    ("/api/v1/comments/user/{member_id}", None, "size=1", "size=50"),
+    ("/api/v1/favorites", "member", "size=1", "size=50"),
+    ("/api/v1/notifications", "admin", "size=1", "size=50"),
+    ("/api/v1/admin/posts", "admin", "size=1", "size=50"),
+    ("/api/v1/admin/comments", "admin", "size=1", "size=50"),
+]
+
+
+def _url(path: str, seed: Seed) -> str:
+    return path.format(
+        post_id=seed.post_ids[0],
+        comment_id=seed.comment_ids[0],
+        member_id=seed.member_id,
+        conversation_id=seed.conversation_id,
+    )
+
+
+def _with_query(url: str, query: str) -> str:
+    return f"{url}{'&' if '?' in url else '?'}{query}"
+
+
+def _page_items(body) -> list:
+    # Featured posts are a plain list; the comment tree names its page "comments"
+    if isinstance(body, list):
+        return body
+    return body["items"] if "items" in body else body["comments"]
+
+
+@pytest.mark.parametrize(
+    "method, path, user, budget",
+    BUDGETS,
+    ids=[f"{method} {path}" for method, path, _, _ in BUDGETS],
+)
+async def test_route_within_query_budget(client, seed, method, path, user, budget):
+    headers = getattr(seed, user) if user else None
+    response, statements = await count_queries(client, method, _url(path, seed), headers)
+    
+    assert response.status_code == 200, response.text
+    assert statements <= budget, (
+        f"{method} {path} executed {statements} SQL statements (budget {budget})"
+    )
+
+
+async def test_interaction_status_within_query_budget(client, seed):
+    targets = [{"target_type": "post", "target_id": post_id} for post_id in seed.post_ids]
+    targets += [{"target_type": "comment", "target_id": comment_id} for comment_id in seed.comment_ids]
+    response, statements = await count_queries(
+        client, "POST", "/api/v1/interactions/status", seed.member, json={"targets": targets}
+    )
+    
+    assert response.status_code == 200, response.text
+    assert statements <= 2
+
+
+@pytest.mark.parametrize(
+    "path, user, small, large",
+    PAGINATED,
+    ids=[path for path, _, _, _ in PAGINATED],
+)
+async def test_list_route_has_no_n_plus_one(client, seed, path, user, small, large):
+    headers = getattr(seed, user) if user else None
+    url = _url(path, seed)
+    
+    small_response, small_statements = await count_queries(client, "GET", _with_query(url, small), headers)
+    large_response, large_statements = await count_queries(client, "GET", _with_query(url, large), headers)
+    
+    assert small_response.status_code == 200, small_response.text
+    assert large_response.status_code == 200, large_response.text
+    assert len(_page_items(large_response.json())) > len(_page_items(small_response.json()))
+    assert large_statements == small_statements, (
+        f"{path} executed {small_statements} statements for a small page and "
+        f"{large_statements} for a large one"
+    )
@@ -0,0 +1,57 @@
+"""
+Reading cached endpoints right after a write, with a lagging replica.
+"""
+import os
+
+import httpx
+
+from app.core.profiling import PROFILE_TOKEN_HEADER
+from app.db.routing import PRIMARY_COOKIE
+from tests.conftest import Seed, reset_caches, tiptap
+
+
+async def _get(client: httpx.AsyncClient, url: str, cookie=None) -> httpx.Response:
+    headers = {PROFILE_TOKEN_HEADER: os.environ["PROFILING_TOKEN"]}
+    if cookie is not None:
+        headers["Cookie"] = f"{PRIMARY_COOKIE}={cookie}"
+    return await client.get(url, headers=headers)
+
+
+def _titles(response: httpx.Response) -> list:
+    assert response.status_code == 200, response.text
+    return [item["title"] for item in response.json()["items"]]
+
+
+async def test_new_post_is_listed_with_and_without_cookie(client, seed: Seed, replica):
+    await reset_caches()
+    try:
+        response = await client.post("/api/v1/posts", headers=seed.admin, json={
+            "title": "Fresh post",
+            "content": tiptap("Just written"),
+            "status": "published",
+            "category_id": 1,
+        })
+        assert response.status_code == 201, response.text
+        post_id = response.json()["id"]
+        cookie = response.cookies.get(PRIMARY_COOKIE)
+        assert cookie
+    finally:
+        # The session-wide client keeps response cookies; send them explicitly
+        client.cookies.clear()
+    
+    # The replica has not seen the post yet
+    assert (await _get(client, f"/api/v1/posts/{post_id}")).status_code == 404
+    assert (await _get(client, f"/api/v1/posts/{post_id}", cookie)).status_code == 200
+    
+    # Without the cookie the shared entry is filled from the primary, not the replica
+    response = await _get(client, "/api/v1/posts")
+    assert "Fresh post" in _titles(response)
+    response = await _get(client, "/api/v1/posts")
+    assert "Fresh post" in _titles(response)
+    assert response.headers["X-Query-Count"] == "0"
+    
+    # With the cookie the cache is bypassed and the primary is read every time
+    for _ in range(2):
+        response = await _get(client, "/api/v1/posts", cookie)
+        assert "Fresh post" in _titles(response)
+        assert int(response.headers["X-Query-Count"]) > 0
@@ -0,0 +1,35 @@
+"""
+Shared response cache computations.
+"""
+import asyncio
+
+from sqlalchemy import select
+
+from app.models import Post
+from app.services.response_cache import POSTS, response_cache
+from tests.conftest import reset_caches
+
+
+async def test_cancelled_requester_does_not_fail_waiters(client, seed):
+    await reset_caches()
+    started = asyncio.Event()
+    release = asyncio.Event()
+    
+    async def load(db):
+        started.set()
+        await release.wait()
+        return {"title": await db.scalar(select(Post.title).where(Post.id == seed.post_ids[0]))}
+    
+    # The first request starts the computation, a second waits for it
+    first = asyncio.create_task(response_cache.get_or_set("test:shared", {}, [POSTS], load))
+    await started.wait()
+    second = asyncio.create_task(response_cache.get_or_set("test:shared", {}, [POSTS], load))
+    await asyncio.sleep(0)
+    
+    # The client of the first request disconnects before the result is ready
+    first.cancel()
+    await asyncio.sleep(0)
+    release.set()
+    
+    assert await second == '{"title":"Post 0"}'
+    assert first.cancelled()
@@ -0,0 +1,48 @@
+"""
+Loading unread counters that change while they are counted.
+"""
+from app.services.unread_counter import NOTIFICATIONS, unread_counter
+
+
+class CountingLoader:
+    """Loader returning fixed counts, recording how often it ran."""
+    
+    def __init__(self, count: int, during_load=None):
+        self.count = count
+        self.calls = 0
+        self.during_load = during_load
+    
+    async def __call__(self, user_ids):
+        self.calls += 1
+        if self.during_load is not None:
+            await self.during_load()
+        return {user_id: self.count for user_id in user_ids}
+
+
+async def test_loaded_counter_is_cached(client):
+    user_id = 900001
+    loader = CountingLoader(4)
+    
+    assert await unread_counter.get(NOTIFICATIONS, user_id, loader) == 4
+    assert await unread_counter.get(NOTIFICATIONS, user_id, loader) == 4
+    assert loader.calls == 1
+    
+    await unread_counter.add(NOTIFICATIONS, user_id, 1)
+    assert await unread_counter.get(NOTIFICATIONS, user_id, loader) == 5
+
+
+async def test_change_during_load_is_not_lost(client):
+    user_id = 900002
+    
+    # A notification committed after the count was taken, before it is stored
+    async def notify():
+        await unread_counter.add(NOTIFICATIONS, user_id, 1)
+    
+    stale = CountingLoader(2, during_load=notify)
+    assert await unread_counter.get(NOTIFICATIONS, user_id, stale) == 2
+    
+    fresh = CountingLoader(3)
+    assert await unread_counter.get(NOTIFICATIONS, user_id, fresh) == 3
+    assert fresh.calls == 1
+    assert await unread_counter.get(NOTIFICATIONS, user_id, fresh) == 3
+    assert fresh.calls == 1
@@ -0,0 +1,39 @@
+"""
+Buffered view counts when the database write fails.
+"""
+import pytest
+from sqlalchemy import select
+from sqlalchemy.exc import OperationalError
+
+import app.core.deps as deps
+from app.db.session import async_session_maker
+from app.models import Post
+from app.services.post_service import PostService
+from app.services.view_counter import ViewCounter
+from tests.conftest import Seed
+
+
+async def _view_count(post_id: int) -> int:
+    async with async_session_maker() as db:
+        return await db.scalar(select(Post.view_count).where(Post.id == post_id))
+
+
+async def test_failed_flush_keeps_views_for_next_flush(client, seed: Seed, monkeypatch):
+    counter = ViewCounter(deps._redis_pool)
+    post_id = seed.post_ids[1]
+    before = await _view_count(post_id)
+    for viewer in ("a", "b", "c"):
+        await counter.record(post_id, viewer)
+    
+    async def fail(self, deltas):
+        raise OperationalError("UPDATE posts", {}, Exception("database is gone"))
+    
+    with monkeypatch.context() as patch:
+        patch.setattr(PostService, "add_view_counts", fail)
+        with pytest.raises(OperationalError):
+            await counter.flush()
+    
+    assert await counter.pending_views() == 3
+    assert await counter.flush() == 1
+    assert await counter.pending_views() == 0
+    assert await _view_count(post_id) == before + 3
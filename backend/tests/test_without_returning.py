@@ -0,0 +1,50 @@
+"""
+Writes on a database without RETURNING (MySQL), see ``without_returning``.
+"""
+import httpx
+
+from app.db.session import async_session_maker
+from app.schemas.notification import NotificationCreate
+from app.services.notification_service import NotificationService
+from tests.conftest import PASSWORD, Seed
+
+
+async def _register(client: httpx.AsyncClient, username: str) -> int:
+    response = await client.post("/api/v1/auth/register", json={
+        "username": username,
+        "email": f"{username}@example.com",
+        "password": PASSWORD,
+    })
+    assert response.status_code == 201, response.text
+    return response.json()["id"]
+
+
+async def test_first_message_starts_conversation(client, seed: Seed, without_returning):
+    recipient_id = await _register(client, "newcomer")
+    
+    response = await client.post("/api/v1/messages", headers=seed.member, json={
+        "recipient_id": recipient_id, "content": "welcome",
+    })
+    
+    assert response.status_code == 201, response.text
+    conversation_id = response.json()["conversation_id"]
+    response = await client.get("/api/v1/messages/conversations", headers=seed.member)
+    assert conversation_id in [item["id"] for item in response.json()["items"]]
+
+
+async def test_notification_batch_is_inserted(client, seed: Seed, without_returning):
+    batch = [
+        NotificationCreate(
+            user_id=seed.admin_id,
+            type="system",
+            title=f"Batch {i}",
+            actor_id=seed.member_id,
+        )
+        for i in range(3)
+    ]
+    
+    async with async_session_maker() as db:
+        notifications = await NotificationService(db).create_many(batch)
+    
+    assert [notification.title for notification in notifications] == ["Batch 0", "Batch 1", "Batch 2"]
+    assert all(notification.actor.id == seed.member_id for notification in notifications)